@@ -0,0 +1,109 @@
+"""
+Замер сжатия ответов gzip, brotli и zstd.
+
+На страницах по 50 и 500 вопросов и на потоковой выгрузке 10 000 вопросов
+сравнивает время сжатия и размер ответа. Вопросы берутся из
+quiz/static/data и повторяются до нужного количества, поэтому на больших
+ответах степень сжатия выше, чем на реальных данных. Кодировки без
+установленного пакета пропускаются.
+
+Запуск: uv run python -m benchmarks.compression
+"""
+import io
+import sys
+from functools import partial
+from pathlib import Path
+
+from benchmarks.utils import measure, percentile, report, setup_django
+
+ROWS = 10000
+REPEAT = 20
+DATA_DIR = Path(__file__).resolve().parent.parent / 'quiz' / 'static' / 'data'
+
+
+def fill() -> None:
+    """Загружает вопросы из CSV и повторяет их до ROWS строк"""
+    from django.core.management import call_command
+
+    from quiz.models import Question
+
+    call_command('import_csv', str(DATA_DIR), stdout=io.StringIO(),
+                 stderr=io.StringIO())
+    questions = list(Question.objects.all())
+    copies = [questions[index % len(questions)]
+              for index in range(ROWS - len(questions))]
+    Question.objects.bulk_create(
+        Question(quiz_id_id=question.quiz_id_id,
+                 category_id_id=question.category_id_id,
+                 text=f'{question.text} ({index})',
+                 description=question.description, options=question.options,
+                 correct_answer=question.correct_answer,
+                 explanation=question.explanation,
+                 difficulty=question.difficulty)
+        for index, question in enumerate(copies))
+
+
+def compress_chunks(compressor_class: type, chunks: list[bytes]) -> bytes:
+    """
+    Сжимает потоковый ответ так же, как CompressionMiddleware.
+
+    :param compressor_class: Класс сжатия
+    :param chunks: Куски ответа
+    :return: Сжатый ответ
+    """
+    from quiz.middleware import compress_sequence
+
+    return b''.join(compress_sequence(compressor_class(), chunks))
+
+
+def compress_content(compressor_class: type, content: bytes) -> bytes:
+    """
+    Сжимает обычный ответ так же, как CompressionMiddleware.
+
+    :param compressor_class: Класс сжатия
+    :param content: Тело ответа
+    :return: Сжатое тело
+    """
+    return compressor_class().compress_all(content)
+
+
+def main() -> None:
+    """Печатает размер и время сжатия для каждой кодировки"""
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from quiz.middleware import COMPRESSORS, INSTALLED_COMPRESSORS
+    from quiz.serializers import QuestionSerializer, values_fields
+    from quiz.services.export import iter_ndjson
+    from quiz.services.question import QuestionService
+
+    fill()
+    service = QuestionService()
+    fields = values_fields(QuestionSerializer)
+    chunks = [chunk.encode()
+              for chunk in iter_ndjson(service.iter_question_rows())]
+    cases = [
+        (f'страница {limit}', compress_content, JSONRenderer().render(
+            service.list_questions_page(limit=limit, values=fields).items))
+        for limit in (50, 500)
+    ]
+    cases.append(('выгрузка NDJSON', compress_chunks, chunks))
+    for name, compress, payload in cases:
+        size = sum(map(len, chunks)) if payload is chunks else len(payload)
+        for encoding, compressor_class in COMPRESSORS.items():
+            if not INSTALLED_COMPRESSORS[encoding]:
+                sys.stdout.write(f'{name}, {encoding}: пакет не установлен\n')
+                continue
+            func = partial(compress, compressor_class, payload)
+            compressed = len(func())
+            timings = measure(func, REPEAT)
+            speed = size / percentile(timings, 0.5) / 2 ** 20
+            sys.stdout.write(
+                f'{report(f"{name}, {encoding}", timings)}, '
+                f'{size} -> {compressed} байт '
+                f'(-{100 - compressed * 100 / size:.0f}%), '
+                f'{speed:.0f} МБ в секунду\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Замер пула соединений PostgreSQL под нагрузкой из нескольких потоков.
+
+Потоки отправляют запросы списка вопросов через тестовый клиент Django, кэш
+ответов выключен, поэтому каждый запрос берет соединение из пула и
+возвращает его в конце запроса. Число потоков растет от одного до
+четырехкратного размера пула: когда потоков больше, чем соединений, запросы
+ждут свободное соединение, и это видно по p99 и статистике пула.
+
+Режим соединений берется из настроек, для сравнения замер запускается с
+разными переменными окружения: без QUIZ_DB_POOL_MAX_SIZE - пул,
+QUIZ_DB_POOL_MAX_SIZE=0 - постоянные соединения,
+QUIZ_DB_POOL_MAX_SIZE=0 QUIZ_DB_CONN_MAX_AGE=0 - новое соединение на каждый
+запрос.
+
+Запуск: QUIZ_DB_BACKEND=postgresql uv run python -m benchmarks.db_pool
+"""
+import sys
+import threading
+import time
+
+from benchmarks.read_path import fill
+from benchmarks.utils import report, setup_django
+
+REQUESTS = 400
+URL = '/api/questions/?limit=50'
+# число потоков без пула, когда размер пула не задан
+DEFAULT_THREADS = 10
+
+
+def worker(requests: int, timings: list[float], errors: list[int]) -> None:
+    """
+    Отправляет запросы из одного потока.
+
+    :param requests: Количество запросов
+    :param timings: Список, куда пишется время каждого запроса
+    :param errors: Список, куда пишется количество ошибок
+    """
+    from django.db import connections
+    from django.test import Client
+
+    client = Client(raise_request_exception=False)
+    failed = 0
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            if client.get(URL).status_code != 200:
+                failed += 1
+            timings.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+    errors.append(failed)
+
+
+def run(threads: int) -> tuple[list[float], int, float]:
+    """
+    Запускает потоки и ждет их завершения.
+
+    :param threads: Количество потоков
+    :return: Время запросов, количество ошибок и общее время в секундах
+    """
+    timings, errors = [], []
+    requests = REQUESTS // threads or 1
+    workers = [threading.Thread(target=worker,
+                                args=(requests, timings, errors))
+               for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return timings, sum(errors), time.perf_counter() - started
+
+
+def describe(settings_dict: dict) -> str:
+    """
+    Описывает режим соединений из настроек БД.
+
+    :param settings_dict: Настройки БД
+    :return: Строка с режимом
+    """
+    pool = settings_dict['OPTIONS'].get('pool')
+    if pool:
+        return (f'пул: min_size {pool.get("min_size", 4)}, '
+                f'max_size {pool.get("max_size")}, '
+                f'timeout {pool.get("timeout", 30)} сек.')
+    if settings_dict['CONN_MAX_AGE']:
+        return f'постоянные соединения на {settings_dict["CONN_MAX_AGE"]} сек.'
+    return 'новое соединение на каждый запрос'
+
+
+def main() -> None:
+    """Печатает время запросов и статистику пула для разного числа потоков"""
+    setup_django()
+    from django.db import connection
+    from django.test import override_settings
+
+    if connection.vendor != 'postgresql':
+        sys.exit('Замер нужен для PostgreSQL: QUIZ_DB_BACKEND=postgresql')
+
+    fill()
+    connection.close()
+    sys.stdout.write(f'{describe(connection.settings_dict)}\n')
+    pool = connection.pool
+    size = (connection.settings_dict['OPTIONS']['pool'].get('max_size')
+            if pool else None) or DEFAULT_THREADS
+    with override_settings(QUIZ_RESPONSE_CACHE=None):
+        for threads in sorted({1, size, size * 2, size * 4}):
+            if pool:
+                pool.pop_stats()
+            timings, errors, elapsed = run(threads)
+            line = (f'{report(f"потоков {threads}", timings)}, '
+                    f'{len(timings) / elapsed:.0f} запросов в секунду, '
+                    f'ошибок {errors}')
+            if pool:
+                stats = pool.pop_stats()
+                line += (f', ждали соединение '
+                         f'{stats.get("requests_queued", 0)} раз '
+                         f'({stats.get("requests_wait_ms", 0)} мс), '
+                         f'таймаутов {stats.get("requests_errors", 0)}, '
+                         f'соединений {stats.get("pool_size", 0)}')
+            sys.stdout.write(f'{line}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Замер JSONRenderer и ORJSONRenderer на списке из 10 000 вопросов.
+
+Сравнивает рендеринг страницы вопросов и разбор того же JSON парсерами
+JSONParser и ORJSONParser и проверяет, что результаты совпадают.
+
+Запуск: uv run python -m benchmarks.json_render
+"""
+import io
+import sys
+from collections.abc import Callable
+from functools import partial
+
+from benchmarks.read_path import ROWS, fill
+from benchmarks.utils import measure, percentile, report, setup_django
+
+REPEAT = 20
+
+
+def parse(parser: object, content: bytes) -> object:
+    """
+    Разбирает JSON парсером DRF.
+
+    :param parser: Парсер
+    :param content: JSON
+    :return: Разобранные данные
+    """
+    return parser.parse(io.BytesIO(content))
+
+
+def compare(name: str, slow: Callable[[], object],
+            fast: Callable[[], object]) -> None:
+    """
+    Проверяет совпадение результатов и печатает время и ускорение.
+
+    :param name: Название замера
+    :param slow: Вызов на стандартном json
+    :param fast: Вызов на orjson
+    """
+    if slow() != fast():
+        raise AssertionError(f'{name}: результаты отличаются')
+    slow_timings = measure(slow, REPEAT)
+    fast_timings = measure(fast, REPEAT)
+    speedup = percentile(slow_timings, 0.5) / percentile(fast_timings, 0.5)
+    sys.stdout.write(f'{report(name + ", json", slow_timings)}\n'
+                     f'{report(name + ", orjson", fast_timings)}\n'
+                     f'{name}: ускорение в {speedup:.1f} раза\n')
+
+
+def main() -> None:
+    """Печатает время рендеринга и разбора на json и orjson"""
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from quiz.parsers import ORJSONParser
+    from quiz.renderers import ORJSONRenderer
+    from quiz.serializers import QuestionSerializer, values_fields
+    from quiz.services.question import QuestionService
+
+    fill()
+    items = QuestionService().list_questions_page(
+        limit=ROWS, values=values_fields(QuestionSerializer)).items
+    content = JSONRenderer().render(items)
+    compare('рендеринг', partial(JSONRenderer().render, items),
+            partial(ORJSONRenderer().render, items))
+    compare('разбор', partial(parse, JSONParser(), content),
+            partial(parse, ORJSONParser(), content))
+
+
+if __name__ == '__main__':
+    main()
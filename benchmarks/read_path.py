@@ -0,0 +1,100 @@
+"""
+Замер быстрого пути чтения списков на 10 000 строк.
+
+Сравнивает объекты модели с ModelSerializer и словари из .values() для
+категорий, квизов и вопросов и проверяет, что JSON совпадает байт в байт.
+
+Запуск: uv run python -m benchmarks.read_path
+"""
+import sys
+from collections.abc import Callable
+from functools import partial
+
+from benchmarks.utils import measure, percentile, report, setup_django
+
+ROWS = 10000
+REPEAT = 5
+
+
+def fill() -> None:
+    """Заполняет тестовую БД квизами, категориями и вопросами"""
+    from quiz.models import Category, Question, Quiz
+
+    Quiz.objects.bulk_create(
+        Quiz(title=f'Квиз {index}', title_normalized=f'квиз {index}',
+             description=None if index % 2 else 'Описание')
+        for index in range(ROWS))
+    Category.objects.bulk_create(
+        Category(title=f'Категория {index}',
+                 title_normalized=f'категория {index}')
+        for index in range(ROWS))
+    quiz = Quiz.objects.first()
+    category = Category.objects.first()
+    Question.objects.bulk_create(
+        Question(quiz_id=quiz, category_id=category, text=f'Вопрос {index}?',
+                 description='Описание', options=['Да', 'Возможно', 'Никогда'],
+                 correct_answer='Да', difficulty='easy',
+                 explanation=None if index % 3 else 'Объяснение')
+        for index in range(ROWS))
+
+
+def render_models(list_page: Callable, serializer_class: type) -> bytes:
+    """
+    Старый путь: объекты модели и ModelSerializer.
+
+    :param list_page: Метод сервиса для страницы списка
+    :param serializer_class: Сериализатор
+    :return: JSON списка
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    page = list_page(limit=ROWS)
+    return JSONRenderer().render(serializer_class(page.items, many=True).data)
+
+
+def render_values(list_page: Callable, fields: tuple[str, ...]) -> bytes:
+    """
+    Быстрый путь: словари из .values().
+
+    :param list_page: Метод сервиса для страницы списка
+    :param fields: Поля сериализатора
+    :return: JSON списка
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    return JSONRenderer().render(list_page(limit=ROWS, values=fields).items)
+
+
+def main() -> None:
+    """Печатает время обоих путей и ускорение"""
+    setup_django()
+    from quiz.serializers import (CategorySerializer, QuestionSerializer,
+                                  QuizSerializer, values_fields)
+    from quiz.services.category import CategoryService
+    from quiz.services.question import QuestionService
+    from quiz.services.quiz import QuizService
+
+    fill()
+    cases = (
+        ('категории', CategoryService().list_categories_page,
+         CategorySerializer),
+        ('квизы', QuizService().list_quizzes_page, QuizSerializer),
+        ('вопросы', QuestionService().list_questions_page,
+         QuestionSerializer),
+    )
+    for name, list_page, serializer_class in cases:
+        models = partial(render_models, list_page, serializer_class)
+        values = partial(render_values, list_page,
+                         values_fields(serializer_class))
+        if models() != values():
+            raise AssertionError(f'{name}: JSON отличается')
+        slow = measure(models, REPEAT)
+        fast = measure(values, REPEAT)
+        speedup = percentile(slow, 0.5) / percentile(fast, 0.5)
+        sys.stdout.write(f'{report(name + ", ModelSerializer", slow)}\n'
+                         f'{report(name + ", .values()", fast)}\n'
+                         f'{name}: ускорение в {speedup:.1f} раза\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Нагрузка SQLite записью и чтением из нескольких потоков.
+
+Потоки записи создают вопрос, переносят его в другой квиз и удаляют через
+сервис, потоки чтения в это время читают страницы вопросов. Замер идет на
+тестовой БД в файле, три раза:
+
+- настройки SQLite по умолчанию: журнал отката, отложенные транзакции и
+  таймаут блокировки 5 секунд из модуля sqlite3;
+- WAL, synchronous=NORMAL, busy_timeout и транзакции IMMEDIATE из
+  настроек проекта;
+- то же с очередью записи QUIZ_SQLITE_WRITE_QUEUE.
+
+Для каждого режима печатаются p50/p99 записи и чтения и число ошибок
+database is locked.
+
+Запуск: uv run python -m benchmarks.sqlite_writes
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.utils import report, setup_django
+
+WRITERS = 8
+READERS = 4
+OPERATIONS = 50
+# PRAGMA по умолчанию SQLite, таймаут 5 секунд ставит модуль sqlite3
+DEFAULT_PRAGMAS = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+def fill() -> tuple[int, int, int]:
+    """
+    Создает два квиза, категорию и вопросы для чтения.
+
+    :return: Идентификаторы двух квизов и категории
+    """
+    from quiz.models import Category, Question, Quiz
+
+    first, second = Quiz.objects.bulk_create(
+        Quiz(title=f'Квиз {index}', title_normalized=f'квиз {index}')
+        for index in range(2))
+    category = Category.objects.create(title='Категория')
+    Question.objects.bulk_create(
+        Question(quiz_id=first, category_id=category, text=f'Вопрос {index}?',
+                 options=['Да', 'Нет'], correct_answer='Да',
+                 difficulty='easy')
+        for index in range(1000))
+    return first.id, second.id, category.id
+
+
+def write(ids: tuple[int, int, int], timings: list[float],
+          errors: list[str]) -> None:
+    """
+    Создает, переносит и удаляет вопросы из одного потока.
+
+    :param ids: Идентификаторы двух квизов и категории
+    :param timings: Список, куда пишется время каждой операции
+    :param errors: Список, куда пишутся ошибки
+    """
+    from django.db import OperationalError, connections
+
+    from quiz.services.question import QuestionService
+
+    service = QuestionService()
+    first, second, category = ids
+    data = {'category_id_id': category, 'text': 'Новый вопрос?',
+            'options': ['Да', 'Нет'], 'correct_answer': 'Да',
+            'difficulty': 'easy'}
+    try:
+        for _ in range(OPERATIONS):
+            started = time.perf_counter()
+            try:
+                question = service.create_question(first, dict(data))
+                service.update_questions({'quiz_id': second},
+                                         ids=[question.id])
+                service.delete_question(question.id)
+            except OperationalError as error:
+                errors.append(str(error))
+            timings.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+
+
+def read(timings: list[float], done: threading.Event) -> None:
+    """
+    Читает страницы вопросов, пока идет запись.
+
+    :param timings: Список, куда пишется время каждого чтения
+    :param done: Событие окончания записи
+    """
+    from django.db import connections
+
+    from quiz.services.question import QuestionService
+
+    service = QuestionService()
+    try:
+        while not done.is_set():
+            started = time.perf_counter()
+            service.list_questions_page(limit=50, values=('id', 'text'))
+            timings.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+
+
+def run(ids: tuple[int, int, int]) -> str:
+    """
+    Запускает потоки записи и чтения.
+
+    :param ids: Идентификаторы двух квизов и категории
+    :return: Строки отчета
+    """
+    writes, reads, errors = [], [], []
+    done = threading.Event()
+    writers = [threading.Thread(target=write, args=(ids, writes, errors))
+               for _ in range(WRITERS)]
+    readers = [threading.Thread(target=read, args=(reads, done))
+               for _ in range(READERS)]
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    kinds = sorted(set(errors))
+    return (f'{report("  запись", writes)}, ошибок {len(errors)}'
+            f'{" (" + ", ".join(kinds) + ")" if kinds else ""}\n'
+            f'{report("  чтение", reads)}, чтений {len(reads)}\n')
+
+
+def main() -> None:
+    """Печатает время записи, чтения и число ошибок для каждого режима"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    from django.conf import settings
+
+    if settings.DATABASES['default']['ENGINE'] != (
+            'django.db.backends.sqlite3'):
+        sys.exit('Замер нужен для SQLite: уберите QUIZ_DB_BACKEND')
+
+    with tempfile.TemporaryDirectory() as directory:
+        options = settings.DATABASES['default']['OPTIONS']
+        settings.DATABASES['default']['TEST'] = {
+            'NAME': str(Path(directory) / 'bench.sqlite3')}
+        transaction_mode = options.pop('transaction_mode', None)
+        setup_django()
+        from django.db import connection
+        from django.test import override_settings
+
+        from quiz.services.writes import write_queue
+
+        # новые соединения переводят файл БД в журнал отката
+        connection.close()
+        with override_settings(QUIZ_SQLITE_PRAGMAS=DEFAULT_PRAGMAS):
+            ids = fill()
+            connection.close()
+            sys.stdout.write('настройки SQLite по умолчанию\n'
+                             f'{run(ids)}')
+
+        options['transaction_mode'] = transaction_mode
+        sys.stdout.write(f'WAL и транзакции {transaction_mode}\n{run(ids)}')
+
+        with override_settings(QUIZ_SQLITE_WRITE_QUEUE=True):
+            try:
+                sys.stdout.write(f'WAL и очередь записи\n{run(ids)}')
+            finally:
+                write_queue.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
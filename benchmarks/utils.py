@@ -0,0 +1,65 @@
+"""Общие функции замеров производительности"""
+import os
+import statistics
+import time
+from collections.abc import Callable
+
+import django
+
+
+def setup_django() -> None:
+    """
+    Настраивает Django и создает тестовую БД.
+
+    Замеры не трогают рабочую БД: для SQLite тестовая БД создается в памяти
+    со всеми миграциями, для PostgreSQL тестовая БД, оставшаяся от
+    прерванного замера, пересоздается без вопроса.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def measure(func: Callable[[], object], repeat: int) -> list[float]:
+    """
+    Замеряет время нескольких вызовов функции.
+
+    :param func: Замеряемая функция
+    :param repeat: Количество вызовов
+    :return: Время каждого вызова в секундах
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def percentile(timings: list[float], share: float) -> float:
+    """
+    Перцентиль времени вызова.
+
+    :param timings: Время вызовов
+    :param share: Доля от 0 до 1
+    :return: Время в секундах
+    """
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def report(name: str, timings: list[float]) -> str:
+    """
+    Строка отчета о замере.
+
+    :param name: Название замера
+    :param timings: Время вызовов
+    :return: Строка с p50, p99 и средним в миллисекундах
+    """
+    return (f'{name}: p50 {percentile(timings, 0.5) * 1000:.1f} мс, '
+            f'p99 {percentile(timings, 0.99) * 1000:.1f} мс, '
+            f'среднее {statistics.mean(timings) * 1000:.1f} мс')
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -35,6 +36,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'quiz.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -66,12 +68,53 @@ WSGI_APPLICATION = 'project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# sqlite - файл db.sqlite3 (по умолчанию), postgresql - сервер PostgreSQL
+# из переменных QUIZ_DB_* (нужен пакет psycopg, для пула - psycopg[pool])
+QUIZ_DB_BACKEND = os.environ.get('QUIZ_DB_BACKEND', 'sqlite')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # транзакция сразу берет блокировку записи: отложенная транзакция,
+            # которая сначала читает, получает database is locked без
+            # ожидания busy_timeout, если другой поток уже пишет
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
+if QUIZ_DB_BACKEND == 'postgresql':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('QUIZ_DB_NAME', 'quiz'),
+        'USER': os.environ.get('QUIZ_DB_USER', 'quiz'),
+        'PASSWORD': os.environ.get('QUIZ_DB_PASSWORD', ''),
+        'HOST': os.environ.get('QUIZ_DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('QUIZ_DB_PORT', '5432'),
+        # выгрузка читает строки серверным курсором через .iterator();
+        # за PgBouncer в режиме transaction курсоры нужно выключить
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get(
+            'QUIZ_DB_DISABLE_SERVER_SIDE_CURSORS', '') == '1',
+        # соединение из пула или постоянное соединение проверяется перед
+        # использованием, после перезапуска сервера запросы не падают
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    # пул создается в каждом процессе: всего соединений до
+    # QUIZ_DB_POOL_MAX_SIZE на процесс; 0 - постоянные соединения без пула
+    QUIZ_DB_POOL_MAX_SIZE = int(os.environ.get('QUIZ_DB_POOL_MAX_SIZE', 10))
+    if QUIZ_DB_POOL_MAX_SIZE:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('QUIZ_DB_POOL_MIN_SIZE', 2)),
+            'max_size': QUIZ_DB_POOL_MAX_SIZE,
+            # сколько секунд запрос ждет свободное соединение
+            'timeout': float(os.environ.get('QUIZ_DB_POOL_TIMEOUT', 10)),
+            'max_lifetime': 30 * 60,
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(
+            os.environ.get('QUIZ_DB_CONN_MAX_AGE', 60))
 
 
 # Password validation
@@ -110,7 +153,81 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# locmem - кэш внутри процесса, file - общий для процессов на одной машине,
+# redis - общий для всех машин (нужен пакет redis и совместимый сервер)
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_LOCATIONS = {
+    'locmem': 'quiz',
+    'file': str(BASE_DIR / 'cache'),
+    'redis': 'redis://127.0.0.1:6379/1',
+}
+QUIZ_CACHE_BACKEND = os.environ.get('QUIZ_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[QUIZ_CACHE_BACKEND],
+        'LOCATION': os.environ.get('QUIZ_CACHE_LOCATION',
+                                   CACHE_LOCATIONS[QUIZ_CACHE_BACKEND]),
+        'TIMEOUT': 24 * 60 * 60,
+    },
+}
+if QUIZ_CACHE_BACKEND != 'redis':
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Quiz API
+
+QUIZ_PAGE_SIZE = 50
+
+QUIZ_MAX_PAGE_SIZE = 500
+
+# Размер LRU правильных ответов в процессе
+QUIZ_ANSWER_CACHE_SIZE = 10000
+
+# Сколько секунд ответ живет в LRU: записи в других процессах LRU не сбросят
+QUIZ_ANSWER_CACHE_TTL = 5
+
+# Алиас кэша из CACHES для общих между процессами ответов, None - только LRU;
+# кэш locmem есть в каждом процессе свой, поэтому для него выбран LRU
+QUIZ_ANSWER_CACHE = None if QUIZ_CACHE_BACKEND == 'locmem' else 'default'
+
+# Сколько квизов держит в процессе выбор случайного вопроса и сколько секунд
+# живет список id вопросов, если кэш не общий для процессов
+QUIZ_SAMPLER_CACHE_SIZE = 1000
+QUIZ_SAMPLER_TTL = 5
+
+# Алиас кэша из CACHES для ответов API на чтение, None - без кэша. Кэш
+# включен только для общих между процессами бэкендов: записи в другом
+# процессе и import_csv не сбросят кэш locmem этого процесса
+QUIZ_RESPONSE_CACHE = None if QUIZ_CACHE_BACKEND == 'locmem' else 'default'
+
+# Ответы меньше этого размера в байтах отдаются без сжатия
+QUIZ_COMPRESSION_MIN_SIZE = 1024
+
+# Кодировки сжатия в порядке предпочтения; br нужен пакет brotli, zstd - zstandard
+QUIZ_COMPRESSION_ENCODINGS = ('zstd', 'br', 'gzip')
+
+# PRAGMA для каждого соединения SQLite: busy_timeout в миллисекундах,
+# mmap_size в байтах, отрицательный cache_size - в кибибайтах
+QUIZ_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 2 ** 20,
+    'cache_size': -64 * 2 ** 10,
+}
+
+# Записи сервисов в SQLite выполняются по очереди в одном потоке
+QUIZ_SQLITE_WRITE_QUEUE = os.environ.get('QUIZ_SQLITE_WRITE_QUEUE', '') == '1'
@@ -1,9 +1,19 @@
 """Модуль с описанием приложения"""
 
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+from quiz.sqlite import apply_pragmas, register_functions
 
 
 class QuizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz'
     verbose_name = 'Квиз'
+
+    def ready(self) -> None:
+        """Подключает настройку соединений SQLite"""
+        connection_created.connect(apply_pragmas,
+                                   dispatch_uid='quiz_sqlite_pragmas')
+        connection_created.connect(register_functions,
+                                   dispatch_uid='quiz_sqlite_functions')
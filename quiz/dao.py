@@ -1,6 +1,12 @@
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
+
+from django.db.models import QuerySet
 
 from quiz.models import Category, Question, Quiz
+from quiz.services.export import EXPORT_CHUNK_SIZE
+from quiz.services.utils import Cursor, Page
+from quiz.utils import PAGE_SIZE
 
 
 class AbstractCategoryService(ABC):
@@ -11,11 +17,26 @@ class AbstractCategoryService(ABC):
         """Метод для получения списка категорий"""
 
     @abstractmethod
-    def get_category(self, category_id: int) -> Category:
+    def list_categories_page(self, cursor: Cursor | None = None,
+                             limit: int = PAGE_SIZE,
+                             values: tuple[str, ...] | None = None) -> Page:
+        """
+        Возвращает страницу категорий в порядке (title, id).
+
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :param values: Поля для словарей вместо объектов модели.
+        :return: Страница категорий с курсорами и версией.
+        """
+
+    @abstractmethod
+    def get_category(self, category_id: int,
+                     fields: tuple[str, ...] | None = None) -> Category:
         """
         Метод для получения категории по идентификатору.
 
         :param category_id: Идентификатор категории.
+        :param fields: Поля для загрузки или None для всех полей.
         :return: Категория из БД.
         """
 
@@ -55,20 +76,37 @@ class AbstractQuizService(ABC):
         """Возвращает список всех квизов."""
 
     @abstractmethod
-    def get_quiz(self, quiz_id: int) -> Quiz:
+    def list_quizzes_page(self, cursor: Cursor | None = None,
+                          limit: int = PAGE_SIZE,
+                          values: tuple[str, ...] | None = None) -> Page:
+        """
+        Возвращает страницу квизов в порядке (title, id).
+
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :param values: Поля для словарей вместо объектов модели.
+        :return: Страница квизов с курсорами и версией.
+        """
+
+    @abstractmethod
+    def get_quiz(self, quiz_id: int,
+                 fields: tuple[str, ...] | None = None) -> Quiz:
         """
         Возвращает квиз по его идентификатору.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля для загрузки или None для всех полей.
         :return: Квиз из БД.
         """
 
     @abstractmethod
-    def get_quizes_by_title(self, title: str) -> list[Quiz]:
+    def get_quizes_by_title(self, title: str,
+                            mode: str = 'substring') -> list[Quiz]:
         """
         Возвращает список квизов по названию.
 
         :param title: Название квиза.
+        :param mode: Режим поиска: substring или prefix.
         :return: Список квизов с подходящими названиями.
         """
 
@@ -112,11 +150,34 @@ class AbstractQuestionService(ABC):
         """
 
     @abstractmethod
-    def get_question(self, question_id: int) -> Question:
+    def list_questions_page(self, cursor: Cursor | None = None,
+                            limit: int = PAGE_SIZE,
+                            values: tuple[str, ...] | None = None,
+                            quiz_id: int | None = None,
+                            category_id: int | None = None,
+                            difficulty: str | None = None,
+                            ordering: str = 'id') -> Page:
+        """
+        Возвращает страницу вопросов, отобранных по квизу, категории и сложности.
+
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :param values: Поля для словарей вместо объектов модели.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :param ordering: Порядок: id или -id.
+        :return: Страница вопросов с курсорами и версией.
+        """
+
+    @abstractmethod
+    def get_question(self, question_id: int,
+                     fields: tuple[str, ...] | None = None) -> Question:
         """
         Возвращает вопрос по его идентификатору.
 
         :param question_id: Идентификатор вопроса.
+        :param fields: Поля для загрузки или None для всех полей.
         :return: Вопрос из БД.
         """
 
@@ -129,6 +190,19 @@ class AbstractQuestionService(ABC):
         :return: Вопрос из БД.
         """
 
+    @abstractmethod
+    def get_questions_by_text_page(self, text: str,
+                                   cursor: Cursor | None = None,
+                                   limit: int = PAGE_SIZE) -> Page:
+        """
+        Ищет вопросы по тексту, описанию и объяснению.
+
+        :param text: Строка поиска.
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :return: Страница вопросов, самые релевантные первыми.
+        """
+
     @abstractmethod
     def get_questions_for_quiz(self, quiz_id: int) -> list[Question]:
         """
@@ -138,6 +212,35 @@ class AbstractQuestionService(ABC):
         :return: Список вопросов квиза.
         """
 
+    @abstractmethod
+    def filter_questions(self, quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> QuerySet:
+        """
+        Возвращает вопросы, отобранные по квизу, категории и сложности.
+
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Выборка вопросов.
+        """
+
+    @abstractmethod
+    def iter_question_rows(self, quiz_id: int | None = None,
+                           category_id: int | None = None,
+                           difficulty: str | None = None,
+                           chunk_size: int = EXPORT_CHUNK_SIZE,
+                           ) -> Iterator[dict]:
+        """
+        Построчно отдает вопросы словарями, не загружая всю таблицу.
+
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :param chunk_size: Сколько строк читать из БД за раз.
+        :return: Итератор словарей с полями вопроса.
+        """
+
     @abstractmethod
     def create_question(self, quiz_id: int, data: dict) -> Question:
         """
@@ -176,6 +279,59 @@ class AbstractQuestionService(ABC):
         :return: True, если ответ правильный, False - в противном случае.
         """
 
+    @abstractmethod
+    def create_questions(self, items: list[dict],
+                         ) -> tuple[list[Question], dict[int, list[str]]]:
+        """
+        Создает несколько вопросов одной транзакцией.
+
+        :param items: Проверенные данные вопросов с quiz_id и category_id.
+        :return: Созданные вопросы в порядке items и поля с
+            несуществующими объектами по номеру элемента.
+        """
+
+    @abstractmethod
+    def update_questions(self, data: dict, ids: list[int] | None = None,
+                         quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> int:
+        """
+        Обновляет вопросы, отобранные по id и фильтрам, одним UPDATE.
+
+        :param data: Новые значения полей.
+        :param ids: Идентификаторы вопросов.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Количество обновленных вопросов.
+        """
+
+    @abstractmethod
+    def delete_questions(self, ids: list[int] | None = None,
+                         quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> int:
+        """
+        Удаляет вопросы, отобранные по id и фильтрам, одним DELETE.
+
+        :param ids: Идентификаторы вопросов.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Количество удаленных вопросов.
+        """
+
+    @abstractmethod
+    def check_answers(self,
+                      answers: list[tuple[int, str]]) -> list[bool | None]:
+        """
+        Проверяет ответы на несколько вопросов одним запросом.
+
+        :param answers: Пары (идентификатор вопроса, ответ пользователя).
+        :return: Результат для каждой пары: True, False или None,
+            если вопроса нет.
+        """
+
     @abstractmethod
     def random_question_from_quiz(self, quiz_id: int) -> Question:
         """
@@ -183,4 +339,5 @@ class AbstractQuestionService(ABC):
 
         :param quiz_id: Идентификатор квиза.
         :return: Случайный вопрос из квиза.
+        :raises Question.DoesNotExist: Если в квизе нет вопросов.
         """
@@ -0,0 +1,79 @@
+import os
+import time
+from argparse import ArgumentParser
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Category, Question, Quiz
+from quiz.services.export import (EXPORT_CHUNK_SIZE, EXPORT_COMPRESSIONS,
+                                  EXPORT_FORMATS, iter_value_chunks,
+                                  open_export, write_csv, write_jsonl,
+                                  write_parquet)
+from quiz.services.importer import (CATEGORY_COLUMNS, QUESTION_COLUMNS,
+                                    QUIZ_COLUMNS)
+
+
+class Command(BaseCommand):
+    help = 'Выгружает категории, квизы и вопросы в CSV, JSONL или Parquet'
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        """
+        Аргументы команды.
+
+        :param parser: разбор аргументов
+        """
+        parser.add_argument('path', type=str)
+        parser.add_argument(
+            '--format', dest='output', choices=EXPORT_FORMATS, default='csv',
+            help='Формат файлов; CSV в формате import_csv')
+        parser.add_argument(
+            '--compress', choices=tuple(EXPORT_COMPRESSIONS), default=None,
+            help='Сжатие файлов; для Parquet доступен только gzip')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из БД за один раз')
+
+    def handle(self, *args: list, **kwargs: dict) -> None:
+        """
+        Выгружает таблицы в каталог path.
+        """
+        directory_path = kwargs['path']
+        output = kwargs['output']
+        compression = kwargs['compress']
+        chunk_size = kwargs['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть положительным')
+        if output == 'parquet' and compression not in (None, 'gzip'):
+            raise CommandError('Parquet поддерживает только сжатие gzip')
+        if output == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as error:
+                raise CommandError('Для выгрузки в Parquet нужен pyarrow'
+                                   ) from error
+        os.makedirs(directory_path, exist_ok=True)
+
+        tables = (
+            ('quizzes', Quiz, QUIZ_COLUMNS),
+            ('categories', Category, CATEGORY_COLUMNS),
+            ('questions', Question, QUESTION_COLUMNS),
+        )
+        for name, model, columns in tables:
+            filename = f'{name}.{output}'
+            if output != 'parquet' and compression:
+                filename += EXPORT_COMPRESSIONS[compression]
+            file_path = os.path.join(directory_path, filename)
+            chunks = iter_value_chunks(model.objects.all(), columns,
+                                       chunk_size)
+            started = time.perf_counter()
+            if output == 'parquet':
+                count = write_parquet(file_path, columns, chunks, compression)
+            else:
+                write = write_csv if output == 'csv' else write_jsonl
+                with open_export(file_path, compression) as file:
+                    count = write(file, columns, chunks)
+            elapsed = time.perf_counter() - started
+            rate = count / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{filename}: выгружено {count} строк за {elapsed:.2f} сек '
+                f'({rate:.0f} строк/сек)')
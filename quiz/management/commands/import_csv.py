@@ -1,14 +1,36 @@
-import ast
+import json
 import os
+import sys
+import time
 from argparse import ArgumentParser
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import TextIO
 
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import (DataError, IntegrityError, connection, connections,
+                       transaction)
+from django.db.models import Model
 
 from quiz.models import Category, Question, Quiz
+from quiz.services.answers import answer_keys
+from quiz.services.importer import (CATEGORY_COLUMNS, IMPORT_BATCH_SIZE,
+                                    ImportCheckpoint,
+                                    PARALLEL_CHUNK_BYTES, QUESTION_COLUMNS,
+                                    QUIZ_COLUMNS, init_worker,
+                                    parse_byte_range, plan_byte_ranges,
+                                    read_chunks, validate_categories,
+                                    validate_questions, validate_quizzes)
+from quiz.services.responses import response_cache
+from quiz.services.sampling import sampler
 
 
 class Command(BaseCommand):
+    help = 'Загружает категории, квизы и вопросы из CSV-файлов каталога'
 
     def add_arguments(self, parser: ArgumentParser) -> None:
         """
@@ -17,79 +39,331 @@ class Command(BaseCommand):
         :param parser: аргумент
         """
         parser.add_argument('path', type=str)
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Сколько строк читать и вставлять в одной транзакции')
+        parser.add_argument(
+            '--rejects', type=str, default=None,
+            help='Файл JSONL для отклоненных строк, по умолчанию stderr')
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Сколько процессов разбирают файл параллельно; '
+                 'каждая запись CSV должна занимать одну строку')
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='Обновлять существующие строки по id и пропускать '
+                 'не изменившиеся')
+        parser.add_argument(
+            '--checkpoint', type=str, default=None,
+            help='Файл прогресса, чтобы продолжить прерванный импорт')
 
     def handle(self, *args: list, **kwargs: dict) -> None:
         """
         Docstring для handle
         """
         directory_path = kwargs['path']
+        self.batch_size = kwargs['batch_size']
+        if self.batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        self.workers = kwargs['workers']
+        if self.workers < 1:
+            raise CommandError('--workers должен быть положительным')
+        self.incremental = kwargs['incremental']
+        checkpoint = ImportCheckpoint(kwargs['checkpoint'])
 
-        files = {
-            'quizzes.csv': self.import_quizzes,
-            'categories.csv': self.import_categories,
-            'questions.csv': self.import_questions,
-        }
+        files = (
+            ('quizzes.csv', Quiz, QUIZ_COLUMNS, validate_quizzes,
+             self.write_quizzes),
+            ('categories.csv', Category, CATEGORY_COLUMNS, validate_categories,
+             self.write_categories),
+            ('questions.csv', Question, QUESTION_COLUMNS, validate_questions,
+             self.write_questions),
+        )
 
-        for filename, func in files.items():
-            file_path = os.path.join(directory_path, filename)
+        rejects_path = kwargs['rejects']
+        rejects_file = (open(rejects_path, 'w', encoding='utf-8')
+                        if rejects_path else sys.stderr)
+        try:
+            for filename, model, columns, validate, write in files:
+                file_path = os.path.join(directory_path, filename)
+                if not os.path.exists(file_path):
+                    self.stderr.write(f'{filename}: файл не найден, пропущен')
+                    continue
+                self.import_file(file_path, model, columns, validate, write,
+                                 rejects_file, checkpoint)
+        finally:
+            if rejects_path:
+                rejects_file.close()
+        self.reset_sequences()
+        checkpoint.clear()
 
-            if os.path.exists(file_path):
-                try:
-                    func(file_path)
-                except Exception:
-                    pass
-            else:
-                pass
-
-    def import_categories(self, file_path: str) -> None:
+    def import_file(self, file_path: str, model: type[Model],
+                    columns: tuple[str, ...], validate: Callable,
+                    write: Callable, rejects_file: TextIO,
+                    checkpoint: ImportCheckpoint) -> None:
         """
-        Docstring для import_categories
+        Загружает один файл пачками и печатает скорость загрузки.
+
+        После каждой записанной пачки сохраняется прогресс, и повторный
+        запуск продолжает файл со следующей пачки.
 
         :param file_path: путь к файлу
+        :param model: модель строк файла
+        :param columns: ожидаемые столбцы
+        :param validate: проверка пачки
+        :param write: запись корректных строк пачки в БД
+        :param rejects_file: куда писать отклоненные строки
+        :param checkpoint: прогресс импорта
         """
-        df = pd.read_csv(file_path)
-        categories = []
-        for _, row in df.iterrows():
-            categories.append(Category(
-                id=row['id'],
-                title=row['title'],
-            ))
-        Category.objects.bulk_create(categories)
+        filename = os.path.basename(file_path)
+        started = time.perf_counter()
+        imported = rejected = unchanged = 0
+        skip_rows = checkpoint.rows_done(file_path)
+        if skip_rows:
+            self.stdout.write(f'{filename}: продолжение после строки {skip_rows}')
+        try:
+            for valid, rejects, rows_done in self.parse(
+                    file_path, columns, validate, skip_rows):
+                if self.incremental:
+                    valid, skipped = self.drop_unchanged(model, valid)
+                    unchanged += skipped
+                written, write_rejects = write(valid, filename)
+                rejects += write_rejects
+                imported += written
+                rejected += len(rejects)
+                self.write_rejects(rejects, rejects_file)
+                checkpoint.save(file_path, rows_done)
+        except (ValueError, pd.errors.ParserError) as error:
+            rejected += 1
+            self.write_rejects([{'file': filename, 'row': None, 'id': None,
+                                 'error': str(error)}], rejects_file)
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0
+        summary = (f'{filename}: загружено {imported} строк за {elapsed:.2f} '
+                   f'сек ({rate:.0f} строк/сек), отклонено {rejected}')
+        if self.incremental:
+            summary += f', без изменений {unchanged}'
+        self.stdout.write(summary)
 
-    def import_quizzes(self, file_path: str) -> None:
+    def drop_unchanged(self, model: type[Model], chunk: pd.DataFrame,
+                       ) -> tuple[pd.DataFrame, int]:
         """
-        Docstring для import_categories
+        Убирает строки, хэш которых совпадает с сохраненным в БД.
+
+        :param model: модель строк пачки
+        :param chunk: пачка проверенных строк
+        :return: измененные и новые строки и число пропущенных
+        """
+        stored = dict(model.objects.filter(
+            id__in=chunk['id'].tolist()
+        ).values_list('id', 'import_hash'))
+        unchanged = chunk['import_hash'] == chunk['id'].map(stored)
+        return chunk.loc[~unchanged], int(unchanged.sum())
+
+    def parse(self, file_path: str, columns: tuple[str, ...],
+              validate: Callable, skip_rows: int = 0,
+              ) -> Iterator[tuple[pd.DataFrame, list[dict], int]]:
+        """
+        Читает и проверяет файл пачками в порядке строк.
 
         :param file_path: путь к файлу
+        :param columns: ожидаемые столбцы
+        :param validate: проверка пачки
+        :param skip_rows: сколько первых строк данных пропустить
+        :return: итератор корректных строк, записей об ошибках и числа
+            прочитанных строк файла после каждой пачки
         """
-        df = pd.read_csv(file_path)
-        quizzes = []
-        for _, row in df.iterrows():
-            quizzes.append(Quiz(**row))
-        Quiz.objects.bulk_create(quizzes)
+        filename = os.path.basename(file_path)
+        if self.workers == 1:
+            for chunk in read_chunks(file_path, columns, self.batch_size,
+                                     skip_rows):
+                valid, rejects = validate(chunk, filename)
+                yield valid, rejects, int(chunk['row'].iloc[-1])
+            return
+        yield from self.parse_parallel(file_path, columns, validate, skip_rows)
 
-    def import_questions(self, file_path: str) -> None:
+    def parse_parallel(self, file_path: str, columns: tuple[str, ...],
+                       validate: Callable, skip_rows: int = 0,
+                       ) -> Iterator[tuple[pd.DataFrame, list[dict], int]]:
         """
-        Docstring для import_categories
+        Разбирает куски файла в пуле процессов и отдает их по порядку.
+
+        Одновременно в работе не больше двух кусков на процесс, чтобы
+        разобранные данные не копились в памяти быстрее, чем их пишут в БД.
 
         :param file_path: путь к файлу
+        :param columns: ожидаемые столбцы
+        :param validate: проверка пачки
+        :param skip_rows: сколько первых строк данных пропустить
+        :return: итератор корректных строк, записей об ошибках и числа
+            прочитанных строк файла после каждого куска
         """
-        df = pd.read_csv(file_path)
-        questions = []
-
-        for _, row in df.iterrows():
-            quiz = Quiz.objects.get(id=row['quiz_id'])
-            category = Category.objects.get(id=row['category_id'])
-            questions.append(Question(
-                id=row['id'],
-                category_id=category,
-                quiz_id=quiz,
-                text=row['text'],
-                description=row['description'],
-                options=ast.literal_eval(row['options'].replace('""', '"')),
-                correct_answer=row['correct_answer'],
-                explanation=row['explanation'],
-                difficulty=row['difficulty']
-
-            ))
-        Question.objects.bulk_create(questions)
+        filename = os.path.basename(file_path)
+        header, ranges = plan_byte_ranges(file_path, PARALLEL_CHUNK_BYTES,
+                                          skip_rows)
+        ranges = iter(ranges)
+        # процессы не должны наследовать открытые соединения к БД. Внутри
+        # транзакции соединение закрыть нельзя, процессы к БД не обращаются:
+        # они только разбирают файл и завершаются через os._exit
+        if not connection.in_atomic_block:
+            connections.close_all()
+        pool = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                   initargs=(settings.SETTINGS_MODULE,))
+        pending = deque()
+
+        def submit() -> None:
+            byte_range = next(ranges, None)
+            if byte_range is not None:
+                pending.append(pool.submit(
+                    parse_byte_range, file_path, header, *byte_range,
+                    columns, validate, filename))
+
+        try:
+            for _ in range(self.workers * 2):
+                submit()
+            offset = skip_rows
+            while pending:
+                valid, rejects, count = pending.popleft().result()
+                submit()
+                valid['row'] += offset
+                for reject in rejects:
+                    reject['row'] += offset
+                offset += count
+                yield valid, rejects, offset
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def write_rejects(self, rejects: list[dict], rejects_file: TextIO) -> None:
+        """
+        Пишет отклоненные строки в отчет по одной JSON-записи на строку.
+
+        :param rejects: записи об ошибках
+        :param rejects_file: файл отчета
+        """
+        for reject in rejects:
+            rejects_file.write(json.dumps(reject, ensure_ascii=False) + '\n')
+
+    def insert(self, model: type[Model], objects: list[Model],
+               rows: list[int], filename: str) -> tuple[int, list[dict]]:
+        """
+        Вставляет пачку одной транзакцией.
+
+        Если пачка не вставилась из-за ограничений БД, строки вставляются
+        по одной, чтобы в отчет попали только ошибочные. В режиме
+        --incremental строки с существующим id обновляются.
+
+        :param model: модель
+        :param objects: объекты для вставки
+        :param rows: номера строк объектов в файле
+        :param filename: имя файла для отчета
+        :return: количество вставленных строк и записи об ошибках
+        """
+        upsert = {}
+        if self.incremental:
+            upsert = {
+                'update_conflicts': True,
+                'unique_fields': ['id'],
+                'update_fields': [field.name
+                                  for field in model._meta.concrete_fields
+                                  if not field.primary_key],
+            }
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=self.batch_size,
+                                          **upsert)
+            return len(objects), []
+        except (IntegrityError, DataError):
+            pass
+        rejects = []
+        for obj, row in zip(objects, rows, strict=True):
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create([obj], **upsert)
+            except (IntegrityError, DataError) as error:
+                rejects.append({'file': filename, 'row': row, 'id': obj.pk,
+                                'error': str(error)})
+        return len(objects) - len(rejects), rejects
+
+    def write_categories(self, chunk: pd.DataFrame,
+                         filename: str) -> tuple[int, list[dict]]:
+        """
+        Записывает пачку категорий.
+
+        :param chunk: пачка проверенных строк
+        :param filename: имя файла для отчета
+        :return: количество вставленных строк и записи об ошибках
+        """
+        categories = [Category(**row) for row in chunk.drop(
+            columns='row').to_dict('records')]
+        result = self.insert(Category, categories, chunk['row'].tolist(),
+                             filename)
+        response_cache.invalidate('category', *chunk['id'].tolist())
+        return result
+
+    def write_quizzes(self, chunk: pd.DataFrame,
+                      filename: str) -> tuple[int, list[dict]]:
+        """
+        Записывает пачку квизов.
+
+        :param chunk: пачка проверенных строк
+        :param filename: имя файла для отчета
+        :return: количество вставленных строк и записи об ошибках
+        """
+        quizzes = [Quiz(**row) for row in chunk.drop(columns='row').to_dict(
+            'records')]
+        result = self.insert(Quiz, quizzes, chunk['row'].tolist(), filename)
+        sampler.invalidate(*chunk['id'].tolist())
+        response_cache.invalidate('quiz', *chunk['id'].tolist())
+        return result
+
+    def write_questions(self, chunk: pd.DataFrame,
+                        filename: str) -> tuple[int, list[dict]]:
+        """
+        Записывает пачку вопросов.
+
+        Квизы и категории проверяются одним запросом id__in на пачку.
+
+        :param chunk: пачка проверенных строк
+        :param filename: имя файла для отчета
+        :return: количество вставленных строк и записи об ошибках
+        """
+        rejects = []
+        for column, model in (('quiz_id', Quiz), ('category_id', Category)):
+            existing = set(model.objects.filter(
+                id__in=chunk[column].unique().tolist()
+            ).values_list('id', flat=True))
+            missing = ~chunk[column].isin(existing)
+            rejects += [
+                {'file': filename, 'row': row, 'id': pk,
+                 'error': f'{column}: объект {fk} не найден'}
+                for row, pk, fk in zip(chunk.loc[missing, 'row'].tolist(),
+                                       chunk.loc[missing, 'id'].tolist(),
+                                       chunk.loc[missing, column].tolist(),
+                                       strict=True)
+            ]
+            chunk = chunk.loc[~missing]
+
+        questions = [
+            Question(id=row['id'], quiz_id_id=row['quiz_id'],
+                     category_id_id=row['category_id'], text=row['text'],
+                     description=row['description'], options=row['options'],
+                     correct_answer=row['correct_answer'],
+                     explanation=row['explanation'],
+                     difficulty=row['difficulty'],
+                     import_hash=row['import_hash'])
+            for row in chunk.to_dict('records')
+        ]
+        written, write_rejects = self.insert(
+            Question, questions, chunk['row'].tolist(), filename)
+        answer_keys.invalidate(*chunk['id'].tolist())
+        sampler.invalidate(*chunk['quiz_id'].unique().tolist())
+        response_cache.invalidate('question', *chunk['id'].tolist())
+        return written, rejects + write_rejects
+
+    def reset_sequences(self) -> None:
+        """Сдвигает счетчики id после вставки строк с явными id"""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [Category, Quiz, Question])
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,282 @@
+import zlib
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from quiz.utils import COMPRESSION_ENCODINGS, COMPRESSION_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # brotli нужен только для Content-Encoding: br
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard нужен только для Content-Encoding: zstd
+    zstandard = None
+
+
+class GzipCompressor:
+    """Сжатие gzip из стандартной библиотеки"""
+
+    # уровень 6 - значение zlib по умолчанию
+    level = 6
+
+    def __init__(self) -> None:
+        """Создает поток сжатия"""
+        self.stream = zlib.compressobj(self.level, zlib.DEFLATED,
+                                       zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Сжимает кусок данных.
+
+        :param data: Данные
+        :return: Сжатые данные, которые уже можно отдать
+        """
+        return self.stream.compress(data)
+
+    def flush(self) -> bytes:
+        """
+        Дописывает все полученные данные, не закрывая поток.
+
+        :return: Сжатые данные
+        """
+        return self.stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """
+        Закрывает поток.
+
+        :return: Остаток сжатых данных
+        """
+        return self.stream.flush()
+
+    def compress_all(self, data: bytes) -> bytes:
+        """
+        Сжимает ответ целиком.
+
+        :param data: Тело ответа
+        :return: Сжатое тело
+        """
+        return self.compress(data) + self.finish()
+
+
+class BrotliCompressor(GzipCompressor):
+    """Сжатие brotli, нужен пакет brotli"""
+
+    # уровни выше 5 заметно медленнее и подходят только для статики
+    level = 5
+
+    def __init__(self) -> None:
+        """Создает поток сжатия"""
+        self.stream = brotli.Compressor(mode=brotli.MODE_TEXT,
+                                        quality=self.level)
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Сжимает кусок данных.
+
+        :param data: Данные
+        :return: Сжатые данные, которые уже можно отдать
+        """
+        return self.stream.process(data)
+
+    def flush(self) -> bytes:
+        """
+        Дописывает все полученные данные, не закрывая поток.
+
+        :return: Сжатые данные
+        """
+        return self.stream.flush()
+
+    def finish(self) -> bytes:
+        """
+        Закрывает поток.
+
+        :return: Остаток сжатых данных
+        """
+        return self.stream.finish()
+
+
+class ZstdCompressor(GzipCompressor):
+    """Сжатие zstd, нужен пакет zstandard"""
+
+    # уровень 3 - значение zstd по умолчанию
+    level = 3
+
+    def __init__(self) -> None:
+        """Создает поток сжатия"""
+        self.compressor = zstandard.ZstdCompressor(level=self.level)
+        self.stream = self.compressor.compressobj()
+
+    def flush(self) -> bytes:
+        """
+        Дописывает все полученные данные, не закрывая поток.
+
+        :return: Сжатые данные
+        """
+        return self.stream.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        """
+        Закрывает поток.
+
+        :return: Остаток сжатых данных
+        """
+        return self.stream.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+    def compress_all(self, data: bytes) -> bytes:
+        """
+        Сжимает ответ целиком, с размером данных в заголовке кадра.
+
+        :param data: Тело ответа
+        :return: Сжатое тело
+        """
+        return self.compressor.compress(data)
+
+
+COMPRESSORS = {
+    'gzip': GzipCompressor,
+    'br': BrotliCompressor,
+    'zstd': ZstdCompressor,
+}
+INSTALLED_COMPRESSORS = {
+    'gzip': True,
+    'br': brotli is not None,
+    'zstd': zstandard is not None,
+}
+
+
+def available_encodings() -> tuple[str, ...]:
+    """
+    Кодировки из настройки QUIZ_COMPRESSION_ENCODINGS, для которых есть пакет.
+
+    :return: Кодировки в порядке предпочтения сервера
+    """
+    encodings = getattr(settings, 'QUIZ_COMPRESSION_ENCODINGS',
+                        COMPRESSION_ENCODINGS)
+    return tuple(encoding for encoding in encodings
+                 if INSTALLED_COMPRESSORS.get(encoding))
+
+
+def accepted_weights(header: str) -> dict[str, float]:
+    """
+    Разбирает заголовок Accept-Encoding.
+
+    :param header: Значение заголовка
+    :return: Вес q для каждой кодировки
+    """
+    weights = {}
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    return weights
+
+
+def negotiate_encoding(header: str,
+                       encodings: tuple[str, ...]) -> str | None:
+    """
+    Выбирает кодировку ответа.
+
+    Побеждает наибольший вес q клиента, при равных весах - порядок
+    encodings. Кодировки с q=0 запрещены.
+
+    :param header: Значение заголовка Accept-Encoding
+    :param encodings: Кодировки сервера в порядке предпочтения
+    :return: Кодировка или None, если ответ отдается без сжатия
+    """
+    weights = accepted_weights(header)
+    default = weights.get('*', 0.0)
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, default)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress_sequence(compressor: GzipCompressor,
+                      chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Сжимает потоковый ответ по кускам.
+
+    После каждого куска поток сбрасывается, чтобы клиент получал данные
+    по мере выгрузки, а не в конце ответа.
+
+    :param compressor: Поток сжатия
+    :param chunks: Куски ответа
+    :return: Итератор сжатых кусков
+    """
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы gzip, brotli или zstd по заголовку Accept-Encoding.
+
+    Обычные ответы сжимаются, если они не меньше QUIZ_COMPRESSION_MIN_SIZE
+    байт и сжатие их уменьшает, потоковые - всегда. Сильный ETag
+    становится слабым, чтобы кэши не путали сжатый и несжатый ответ;
+    If-None-Match сравнивается слабым сравнением, и 304 продолжают работать.
+    """
+
+    def process_response(self, request: HttpRequest,
+                         response: HttpResponseBase) -> HttpResponseBase:
+        """
+        Сжимает ответ.
+
+        :param request: Запрос
+        :param response: Ответ
+        :return: Ответ
+        """
+        if response.has_header('Content-Encoding'):
+            return response
+        if response.streaming:
+            if response.is_async:
+                return response
+        elif len(response.content) < getattr(
+                settings, 'QUIZ_COMPRESSION_MIN_SIZE', COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate_encoding(
+            request.headers.get('Accept-Encoding', ''), available_encodings())
+        if encoding is None:
+            return response
+
+        compressor = COMPRESSORS[encoding]()
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                compressor, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            content = compressor.compress_all(response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.headers.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = f'W/{etag}'
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ('title',), 'verbose_name': 'категория', 'verbose_name_plural': 'категории'},
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['title', 'id'], name='quiz_title_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+from quiz.migrations._helpers import (install_postgres_search_index,
+                                      install_sqlite_fts,
+                                      uninstall_postgres_search_index,
+                                      uninstall_sqlite_fts)
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        install_sqlite_fts(schema_editor)
+    elif vendor == 'postgresql':
+        install_postgres_search_index(
+            schema_editor, apps.get_model('quiz', 'Question'))
+
+
+def uninstall_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        uninstall_sqlite_fts(schema_editor)
+    elif vendor == 'postgresql':
+        uninstall_postgres_search_index(
+            schema_editor, apps.get_model('quiz', 'Question'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_quiz_title_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+from quiz.migrations._helpers import (QUIZ_FTS_TABLE, install_sqlite_fts,
+                                      normalize_title, uninstall_sqlite_fts)
+
+QUIZ_TRGM_INDEX = 'quiz_title_normalized_trgm'
+
+
+def fill_title_normalized(apps, schema_editor):
+    Quiz = apps.get_model('quiz', 'Quiz')
+    quizzes = list(Quiz.objects.only('id', 'title'))
+    for quiz in quizzes:
+        quiz.title_normalized = normalize_title(quiz.title)
+    Quiz.objects.bulk_update(quizzes, ['title_normalized'], batch_size=500)
+
+
+def install_title_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        install_sqlite_fts(schema_editor, QUIZ_FTS_TABLE, 'quiz_quiz',
+                           ('title_normalized',))
+    elif vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {QUIZ_TRGM_INDEX} ON quiz_quiz '
+            'USING gin (title_normalized gin_trgm_ops)')
+
+
+def uninstall_title_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        uninstall_sqlite_fts(schema_editor, QUIZ_FTS_TABLE)
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {QUIZ_TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_question_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='title_normalized',
+            field=models.CharField(db_index=True, default='', editable=False,
+                                   max_length=200,
+                                   verbose_name='Имя квиза для поиска'),
+        ),
+        migrations.RunPython(fill_title_normalized, migrations.RunPython.noop),
+        migrations.RunPython(install_title_index, uninstall_title_index),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+from quiz.migrations._helpers import QUIZ_FTS_TABLE, install_sqlite_fts
+
+
+def reinstall_sqlite_fts(apps, schema_editor):
+    # SQLite пересоздает таблицы при добавлении поля и теряет триггеры FTS5
+    if schema_editor.connection.vendor == 'sqlite':
+        install_sqlite_fts(schema_editor)
+        install_sqlite_fts(schema_editor, QUIZ_FTS_TABLE, 'quiz_quiz',
+                           ('title_normalized',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_quiz_title_normalized'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_fts),
+        migrations.AddField(
+            model_name='category',
+            name='import_hash',
+            field=models.CharField(default='', editable=False, max_length=32,
+                                   verbose_name='Хэш строки импорта'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='import_hash',
+            field=models.CharField(default='', editable=False, max_length=32,
+                                   verbose_name='Хэш строки импорта'),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='import_hash',
+            field=models.CharField(default='', editable=False, max_length=32,
+                                   verbose_name='Хэш строки импорта'),
+        ),
+        migrations.RunPython(reinstall_sqlite_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+from quiz.migrations._helpers import (QUIZ_FTS_TABLE, install_sqlite_fts,
+                                      normalize_title)
+
+
+def fill_category_title_normalized(apps, schema_editor):
+    Category = apps.get_model('quiz', 'Category')
+    categories = list(Category.objects.only('id', 'title'))
+    for category in categories:
+        category.title_normalized = normalize_title(category.title)
+    Category.objects.bulk_update(categories, ['title_normalized'],
+                                 batch_size=500)
+
+
+def reinstall_quiz_fts(apps, schema_editor):
+    # SQLite пересоздает quiz_quiz при изменении поля и теряет триггеры FTS5
+    if schema_editor.connection.vendor == 'sqlite':
+        install_sqlite_fts(schema_editor, QUIZ_FTS_TABLE, 'quiz_quiz',
+                           ('title_normalized',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_import_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_quiz_fts),
+        migrations.AddField(
+            model_name='category',
+            name='title_normalized',
+            field=models.CharField(default='', editable=False, max_length=100,
+                                   verbose_name='Имя категории для проверки '
+                                                'уникальности'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_category_title_normalized,
+                             migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='title_normalized',
+            field=models.CharField(editable=False, max_length=100, unique=True,
+                                   verbose_name='Имя категории для проверки '
+                                                'уникальности'),
+        ),
+        migrations.AlterField(
+            model_name='quiz',
+            name='title_normalized',
+            field=models.CharField(editable=False, max_length=200, unique=True,
+                                   verbose_name='Имя квиза для поиска'),
+        ),
+        migrations.RunPython(reinstall_quiz_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+from quiz.migrations._helpers import QUIZ_FTS_TABLE, install_sqlite_fts
+
+
+def reinstall_sqlite_fts(apps, schema_editor):
+    # SQLite пересоздает таблицы при добавлении поля и теряет триггеры FTS5
+    if schema_editor.connection.vendor == 'sqlite':
+        install_sqlite_fts(schema_editor)
+        install_sqlite_fts(schema_editor, QUIZ_FTS_TABLE, 'quiz_quiz',
+                           ('title_normalized',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_unique_normalized_titles'),
+    ]
+
+    # существующие строки получают время применения миграции
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_fts),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True,
+                                       verbose_name='Время изменения'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True,
+                                       verbose_name='Время изменения'),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True,
+                                       verbose_name='Время изменения'),
+        ),
+        migrations.RunPython(reinstall_sqlite_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from quiz.migrations._helpers import QUIZ_FTS_TABLE, install_sqlite_fts
+
+
+def reinstall_sqlite_fts(apps, schema_editor):
+    # SQLite пересоздает таблицу вопросов при изменении полей и теряет
+    # триггеры FTS5
+    if schema_editor.connection.vendor == 'sqlite':
+        install_sqlite_fts(schema_editor)
+        install_sqlite_fts(schema_editor, QUIZ_FTS_TABLE, 'quiz_quiz',
+                           ('title_normalized',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0007_updated_at'),
+    ]
+
+    # составные индексы создаются раньше, чем удаляются индексы внешних
+    # ключей, которые они заменяют
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_fts),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['title', 'id'],
+                               name='category_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['quiz_id', 'difficulty', 'id'],
+                               name='question_quiz_diff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['category_id', 'difficulty', 'id'],
+                               name='question_category_diff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['quiz_id', 'id'],
+                               name='question_quiz_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['category_id', 'id'],
+                               name='question_category_idx'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='category_id',
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to='quiz.category', verbose_name='категория'),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='quiz_id',
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to='quiz.quiz', verbose_name='квиз'),
+        ),
+        migrations.RunPython(reinstall_sqlite_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from quiz.migrations._helpers import (install_postgres_trigram_indexes,
+                                      uninstall_postgres_trigram_indexes)
+
+
+def install_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        install_postgres_trigram_indexes(
+            schema_editor, apps.get_model('quiz', 'Question'))
+
+
+def uninstall_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        uninstall_postgres_trigram_indexes(
+            schema_editor, apps.get_model('quiz', 'Question'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_question_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_trigram_indexes,
+                             uninstall_trigram_indexes),
+    ]
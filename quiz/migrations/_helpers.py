@@ -0,0 +1,157 @@
+"""
+Функции и имена, которые используют миграции quiz.
+
+Это копии кода приложения на момент написания миграций. Миграции не
+импортируют quiz.services и quiz.utils: изменения в коде приложения не
+должны менять то, что делают уже примененные миграции при повторном
+запуске. Новая миграция, которой нужна другая версия функции, добавляет
+ее сюда под новым именем.
+"""
+import unicodedata
+
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models import Model
+
+SEARCH_FIELDS = ('text', 'description', 'explanation')
+FTS_TABLE = 'quiz_question_fts'
+QUIZ_FTS_TABLE = 'quiz_quiz_fts'
+SEARCH_CONFIG = 'russian'
+SEARCH_INDEX = 'question_search_idx'
+TRGM_INDEXES = {field: f'question_{field}_trgm_idx' for field in SEARCH_FIELDS}
+
+
+def normalize_title(title: str) -> str:
+    """
+    Приводит название к виду для поиска и сравнения.
+
+    :param title: Название
+    :return: Название в NFKC, без регистра, с одиночными пробелами и е вместо ё
+    """
+    title = unicodedata.normalize('NFKC', title).casefold().replace(
+        'ё', '\N{CYRILLIC SMALL LETTER IE}')
+    return ' '.join(title.split())
+
+
+def install_sqlite_fts(schema_editor: BaseDatabaseSchemaEditor,
+                       table: str = FTS_TABLE,
+                       content: str = 'quiz_question',
+                       columns: tuple[str, ...] = SEARCH_FIELDS) -> None:
+    """
+    Создает триграммную таблицу FTS5 и триггеры синхронизации с content.
+
+    SQLite удаляет триггеры вместе с таблицей, поэтому миграции,
+    пересоздающие content, должны вызывать функцию повторно.
+
+    :param schema_editor: Редактор схемы миграции
+    :param table: Имя таблицы FTS5
+    :param content: Таблица с индексируемыми данными
+    :param columns: Индексируемые столбцы
+    """
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    delete = (f"INSERT INTO {table}({table}, rowid, {names}) "
+              f"VALUES ('delete', old.id, {old_values});")
+    insert = (f'INSERT INTO {table}(rowid, {names}) '
+              f'VALUES (new.id, {new_values});')
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+        f"{names}, content='{content}', content_rowid='id', "
+        f"tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON '
+        f'{content} BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON '
+        f'{content} BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE ON '
+        f'{content} BEGIN {delete} {insert} END',
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall_sqlite_fts(schema_editor: BaseDatabaseSchemaEditor,
+                         table: str = FTS_TABLE) -> None:
+    """
+    Удаляет таблицу FTS5 и триггеры синхронизации.
+
+    :param schema_editor: Редактор схемы миграции
+    :param table: Имя таблицы FTS5
+    """
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_{suffix}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def search_index() -> object:
+    """
+    GIN-индекс по tsvector вопросов.
+
+    :return: Индекс для schema_editor
+    """
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG),
+                    name=SEARCH_INDEX)
+
+
+def install_postgres_search_index(schema_editor: BaseDatabaseSchemaEditor,
+                                  model: type[Model]) -> None:
+    """
+    Создает GIN-индекс по tsvector вопросов.
+
+    :param schema_editor: Редактор схемы миграции
+    :param model: Модель вопроса из состояния миграции
+    """
+    schema_editor.add_index(model, search_index())
+
+
+def uninstall_postgres_search_index(schema_editor: BaseDatabaseSchemaEditor,
+                                    model: type[Model]) -> None:
+    """
+    Удаляет GIN-индекс по tsvector вопросов.
+
+    :param schema_editor: Редактор схемы миграции
+    :param model: Модель вопроса из состояния миграции
+    """
+    schema_editor.remove_index(model, search_index())
+
+
+def trigram_indexes() -> list:
+    """
+    Триграммные GIN-индексы PostgreSQL по полям вопроса без регистра.
+
+    :return: Индексы для schema_editor
+    """
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.db.models.functions import Lower
+
+    return [GinIndex(OpClass(Lower(field), name='gin_trgm_ops'), name=name)
+            for field, name in TRGM_INDEXES.items()]
+
+
+def install_postgres_trigram_indexes(schema_editor: BaseDatabaseSchemaEditor,
+                                     model: type[Model]) -> None:
+    """
+    Создает триграммные индексы для поиска подстрокой в PostgreSQL.
+
+    :param schema_editor: Редактор схемы миграции
+    :param model: Модель вопроса из состояния миграции
+    """
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index in trigram_indexes():
+        schema_editor.add_index(model, index)
+
+
+def uninstall_postgres_trigram_indexes(
+        schema_editor: BaseDatabaseSchemaEditor,
+        model: type[Model]) -> None:
+    """
+    Удаляет триграммные индексы вопросов.
+
+    :param schema_editor: Редактор схемы миграции
+    :param model: Модель вопроса из состояния миграции
+    """
+    for index in trigram_indexes():
+        schema_editor.remove_index(model, index)
@@ -1,16 +1,41 @@
 from django.db import models
 
-from quiz.utils import (EXP_LEN, MAX_LEN, TEXT_LEN, TITLE_CAT_LEN,
-                        TITLE_QUIZ_LEN)
+from quiz.utils import EXP_LEN, HASH_LEN, MAX_LEN, TEXT_LEN, TITLE_CAT_LEN, TITLE_QUIZ_LEN, normalize_title
 
 
-class Category(models.Model):
+class NormalizedTitleMixin:
+    """Заполняет title_normalized при сохранении модели"""
+
+    def save(self, *args, **kwargs) -> None:
+        """Сохраняет объект вместе с нормализованным названием"""
+        self.title_normalized = normalize_title(self.title)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'title' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'title_normalized'}
+        super().save(*args, **kwargs)
+
+
+class Category(NormalizedTitleMixin, models.Model):
     """Модель категории вопросов"""
 
     title = models.CharField(
         max_length=TITLE_CAT_LEN,
         unique=True,
         verbose_name='Имя категории')
+    title_normalized = models.CharField(
+        max_length=TITLE_CAT_LEN,
+        unique=True,
+        editable=False,
+        verbose_name='Имя категории для проверки уникальности')
+    import_hash = models.CharField(
+        max_length=HASH_LEN,
+        default='',
+        editable=False,
+        verbose_name='Хэш строки импорта')
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Время изменения')
 
     class Meta:
         """
@@ -20,6 +45,10 @@ class Category(models.Model):
         ordering = ('title',)
         verbose_name = 'категория'
         verbose_name_plural = 'категории'
+        indexes = [
+            models.Index(fields=('title', 'id'),
+                         name='category_title_id_idx'),
+        ]
 
     def __str__(self):
         """
@@ -28,17 +57,31 @@ class Category(models.Model):
         return self.title[:MAX_LEN]
 
 
-class Quiz(models.Model):
+class Quiz(NormalizedTitleMixin, models.Model):
     """Модель квиза"""
 
     title = models.CharField(
         max_length=TITLE_QUIZ_LEN, null=False,
         verbose_name='Имя квиза')
+    title_normalized = models.CharField(
+        max_length=TITLE_QUIZ_LEN,
+        unique=True,
+        editable=False,
+        verbose_name='Имя квиза для поиска')
     description = models.TextField(
         verbose_name='описание',
         max_length=TEXT_LEN,
         null=True,
         blank=True)
+    import_hash = models.CharField(
+        max_length=HASH_LEN,
+        default='',
+        editable=False,
+        verbose_name='Хэш строки импорта')
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Время изменения')
 
     class Meta:
         """
@@ -48,6 +91,9 @@ class Quiz(models.Model):
         verbose_name = 'квиз'
         verbose_name_plural = 'квизы'
         ordering = ['title']
+        indexes = [
+            models.Index(fields=('title', 'id'), name='quiz_title_id_idx'),
+        ]
 
     def __str__(self):
         """
@@ -67,14 +113,17 @@ class Difficulty(models.TextChoices):
 class Question(models.Model):
     """Модель вопроса"""
 
+    # отдельные индексы не нужны: столбцы открывают составные индексы
     quiz_id = models.ForeignKey(
         Quiz,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='квиз',
     )
     category_id = models.ForeignKey(
         Category,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='категория',
     )
     text = models.TextField(
@@ -96,6 +145,15 @@ class Question(models.Model):
         choices=Difficulty.choices,
         null=False
     )
+    import_hash = models.CharField(
+        max_length=HASH_LEN,
+        default='',
+        editable=False,
+        verbose_name='Хэш строки импорта')
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Время изменения')
 
     class Meta:
         """
@@ -105,6 +163,16 @@ class Question(models.Model):
         default_related_name = 'questions'
         verbose_name = 'вопрос'
         verbose_name_plural = 'вопросы'
+        # фильтры по квизу или категории, плюс сложность; выдача в порядке id
+        indexes = [
+            models.Index(fields=('quiz_id', 'difficulty', 'id'),
+                         name='question_quiz_diff_idx'),
+            models.Index(fields=('category_id', 'difficulty', 'id'),
+                         name='question_category_diff_idx'),
+            models.Index(fields=('quiz_id', 'id'), name='question_quiz_idx'),
+            models.Index(fields=('category_id', 'id'),
+                         name='question_category_idx'),
+        ]
 
     def __str__(self):
         """
@@ -0,0 +1,84 @@
+import json
+from typing import BinaryIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from quiz.renderers import ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson нужен только для ORJSONParser
+    orjson = None
+
+
+class NDJSONParser(BaseParser):
+    """Разбирает тело запроса NDJSON в список объектов"""
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream: BinaryIO | None, media_type: str | None = None,
+              parser_context: dict | None = None) -> list:
+        """
+        Читает тело построчно, по JSON-объекту на строку.
+
+        :param stream: Поток тела запроса
+        :param media_type: Тип содержимого
+        :param parser_context: Контекст разбора
+        :return: Список объектов, пустые строки пропускаются
+        :raises ParseError: Если строка не является JSON
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        items = []
+        if stream is None:
+            return items
+        for number, line in enumerate(stream, 1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as error:
+                raise ParseError(f'Строка {number}: {error}') from error
+        return items
+
+
+class ORJSONParser(JSONParser):
+    """Разбирает тело запроса JSON через orjson"""
+
+    renderer_class = ORJSONRenderer
+
+    def __init__(self) -> None:
+        """
+        Проверяет, что orjson установлен.
+
+        :raises ImproperlyConfigured: Если пакета orjson нет
+        """
+        if orjson is None:
+            raise ImproperlyConfigured('Для ORJSONParser нужен пакет orjson')
+        super().__init__()
+
+    def parse(self, stream: BinaryIO, media_type: str | None = None,
+              parser_context: dict | None = None) -> object:
+        """
+        Читает тело целиком и разбирает его.
+
+        :param stream: Поток тела запроса
+        :param media_type: Тип содержимого
+        :param parser_context: Контекст разбора
+        :return: Разобранные данные
+        :raises ParseError: Если тело не является JSON
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            # orjson читает только UTF-8, остальные кодировки декодируются
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as error:
+            raise ParseError(f'JSON parse error - {error}') from error
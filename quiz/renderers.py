@@ -0,0 +1,56 @@
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson нужен только для ORJSONRenderer
+    orjson = None
+
+# разделители строк, которые JSONRenderer экранирует для JavaScript
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON на orjson.
+
+    При настройках DRF по умолчанию (UNICODE_JSON и COMPACT_JSON) вывод
+    совпадает с JSONRenderer байт в байт. Типы, которых нет в orjson
+    (Decimal, ленивые строки, QuerySet, timedelta), преобразует JSONEncoder
+    DRF. Ответы с отступами и другие настройки формата отдает JSONRenderer.
+    В отличие от STRICT_JSON, NaN и бесконечность записываются как null.
+    """
+
+    def __init__(self) -> None:
+        """
+        Проверяет, что orjson установлен.
+
+        :raises ImproperlyConfigured: Если пакета orjson нет
+        """
+        if orjson is None:
+            raise ImproperlyConfigured('Для ORJSONRenderer нужен пакет orjson')
+        super().__init__()
+
+    def render(self, data: object, accepted_media_type: str | None = None,
+               renderer_context: dict | None = None) -> bytes:
+        """
+        Сериализует данные в JSON.
+
+        :param data: Данные ответа
+        :param accepted_media_type: Согласованный тип содержимого
+        :param renderer_context: Контекст рендеринга
+        :return: JSON в UTF-8
+        """
+        if data is None:
+            return b''
+        if (self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type or '',
+                                   renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        content = orjson.dumps(
+            data, default=self.encoder_class().default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in content:
+                content = content.replace(separator, escaped)
+        return content
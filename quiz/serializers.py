@@ -1,14 +1,115 @@
+from functools import cache
+
 from rest_framework import serializers
 
 from quiz.models import Category, Difficulty, Question, Quiz
-from quiz.services.category import CategoryService
-from quiz.services.quiz import QuizService
-from quiz.utils import TEXT_LEN, TITLE_CAT_LEN
+from quiz.utils import (EXP_LEN, MAX_BATCH_SIZE, MAX_BULK_SIZE, TEXT_LEN,
+                        TITLE_CAT_LEN)
+
+# to_representation этих полей отдает значение из .values() как есть
+PLAIN_FIELDS = (serializers.IntegerField, serializers.BigIntegerField,
+                serializers.CharField, serializers.ChoiceField,
+                serializers.JSONField, serializers.PrimaryKeyRelatedField)
+
+
+@cache
+def values_fields(
+        serializer_class: type[serializers.ModelSerializer],
+) -> tuple[str, ...] | None:
+    """
+    Поля сериализатора, если его вывод совпадает со словарями .values().
+
+    Тогда списки можно отдавать словарями из .values() без создания
+    объектов модели и вызова to_representation для каждого поля: JSON
+    получается тем же байт в байт.
+
+    :param serializer_class: Сериализатор модели
+    :return: Имена полей в порядке вывода или None, если быстрый путь
+        для сериализатора не подходит
+    """
+    names = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if (type(field) not in PLAIN_FIELDS or field.source != name
+                or getattr(field, 'pk_field', None) is not None
+                or getattr(field, 'coerce_to_string', False)
+                or getattr(field, 'binary', False)):
+            return None
+        names.append(name)
+    return tuple(names)
+
+
+@cache
+def output_fields(
+        serializer_class: type[serializers.Serializer]) -> tuple[str, ...]:
+    """
+    Поля, которые сериализатор отдает в ответе.
 
+    :param serializer_class: Сериализатор
+    :return: Имена полей в порядке вывода
+    """
+    return tuple(name for name, field in serializer_class().fields.items()
+                 if not field.write_only)
+
+
+def select_fields(serializer_class: type[serializers.Serializer],
+                  fields: str | None,
+                  exclude: str | None) -> tuple[str, ...] | None:
+    """
+    Поля ответа по параметрам ?fields= и ?exclude=.
+
+    :param serializer_class: Сериализатор
+    :param fields: Поля через запятую, которые нужно отдать
+    :param exclude: Поля через запятую, которые нужно убрать
+    :return: Имена полей в порядке вывода или None, если параметров нет
+    :raises ValueError: Если поле неизвестно или не осталось ни одного поля
+    """
+    if fields is None and exclude is None:
+        return None
+    names = output_fields(serializer_class)
+    requested = set(names) if fields is None else {
+        name.strip() for name in fields.split(',') if name.strip()}
+    excluded = {name.strip() for name in (exclude or '').split(',')
+                if name.strip()}
+    unknown = (requested | excluded) - set(names)
+    if unknown:
+        raise ValueError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    selected = tuple(name for name in names
+                     if name in requested and name not in excluded)
+    if not selected:
+        raise ValueError('Выберите хотя бы одно поле')
+    return selected
+
+
+class SparseFieldsMixin:
+    """
+    Сериализатор, который отдает только выбранные поля.
+
+    Поля передаются аргументом fields, например
+    QuestionSerializer(question, fields=('id', 'text')).
+    """
+
+    def __init__(self, *args: object,
+                 fields: tuple[str, ...] | None = None,
+                 **kwargs: object) -> None:
+        """
+        Убирает из сериализатора невыбранные поля.
 
-class CategorySerializer(serializers.ModelSerializer):
+        :param fields: Поля ответа или None для всех полей
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для категорий"""
 
+    # уникальность названия проверяет индекс БД, ошибку отдает представление
+    unique_title_message = 'Такая категория уже есть'
+
     title = serializers.CharField(max_length=TITLE_CAT_LEN, required=True)
 
     class Meta:
@@ -17,25 +118,10 @@ class CategorySerializer(serializers.ModelSerializer):
         """
 
         model = Category
-        fields = '__all__'
+        exclude = ('title_normalized', 'import_hash', 'updated_at')
 
-    def validate_title(self, value: str) -> str:
-        """
-        Docstring для validate_title
-
-        :param value: Название категории
-        :return: Название категории
-        """
-        service = CategoryService()
-        category = service.search_title(value)
-        if category.exists():
-            raise serializers.ValidationError(
-                ['Такая категория уже есть']
-            )
-        return value
 
-
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для вопросов"""
 
     text = serializers.CharField(required=True)
@@ -53,7 +139,7 @@ class QuestionSerializer(serializers.ModelSerializer):
         """
 
         model = Question
-        fields = '__all__'
+        exclude = ('import_hash', 'updated_at')
 
     def validate_options(self, value: list) -> list:
         """
@@ -91,9 +177,24 @@ class QuestionSerializer(serializers.ModelSerializer):
         return data
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuestionBulkSerializer(QuestionSerializer):
+    """
+    Сериализатор вопроса для массового создания.
+
+    Квиз и категория принимаются как числа, их существование проверяет
+    сервис одним запросом на всю пачку.
+    """
+
+    quiz_id = serializers.IntegerField(min_value=1)
+    category_id = serializers.IntegerField(min_value=1)
+
+
+class QuizSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для квизов"""
 
+    # уникальность названия проверяет индекс БД, ошибку отдает представление
+    unique_title_message = 'Такой квиз уже есть'
+
     title = serializers.CharField(required=True, max_length=TEXT_LEN)
     # не работает без явного указания required=False
     description = serializers.CharField(max_length=TEXT_LEN, required=False)
@@ -104,19 +205,72 @@ class QuizSerializer(serializers.ModelSerializer):
         """
 
         model = Quiz
-        fields = '__all__'
+        exclude = ('title_normalized', 'import_hash', 'updated_at')
+
 
-    def validate_title(self, value: str) -> str:
+class AnswerSerializer(serializers.Serializer):
+    """Сериализатор ответа на один вопрос"""
+
+    question_id = serializers.IntegerField(min_value=1)
+    answer = serializers.CharField(max_length=TEXT_LEN, allow_blank=True)
+
+
+class AnswerSheetSerializer(serializers.Serializer):
+    """Сериализатор набора ответов для пакетной проверки"""
+
+    answers = AnswerSerializer(
+        many=True, allow_empty=False, max_length=MAX_BATCH_SIZE)
+
+
+class QuestionSelectionSerializer(serializers.Serializer):
+    """Отбор вопросов для массовых операций по id и фильтрам"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False,
+        max_length=MAX_BULK_SIZE, required=False)
+    quiz = serializers.IntegerField(min_value=1, required=False)
+    category = serializers.IntegerField(min_value=1, required=False)
+    difficulty = serializers.ChoiceField(choices=Difficulty.choices,
+                                         required=False)
+
+    def validate(self, data: dict) -> dict:
         """
-        Docstring для validate_title
+        Запрещает операции над всеми вопросами без условий.
 
-        :param value: Название квиза
-        :return: Название квиза
+        :param data: словарь с полями
+        :return: словарь с полями
         """
-        service = QuizService()
-        quiz = service.search_quiz(value)
-        if quiz.exists():
-            raise serializers.ValidationError(
-                ['Такаой квиз уже есть']
-            )
-        return value
+        if not data.keys() & {'ids', 'quiz', 'category', 'difficulty'}:
+            raise serializers.ValidationError([
+                'Укажите ids или хотя бы один фильтр'
+            ])
+        return data
+
+
+class QuestionPatchSerializer(serializers.Serializer):
+    """Поля вопроса, которые можно менять массово"""
+
+    quiz_id = serializers.IntegerField(min_value=1, required=False)
+    category_id = serializers.IntegerField(min_value=1, required=False)
+    difficulty = serializers.ChoiceField(choices=Difficulty.choices,
+                                         required=False)
+    description = serializers.CharField(max_length=TEXT_LEN, required=False)
+    explanation = serializers.CharField(max_length=EXP_LEN, allow_null=True,
+                                        required=False)
+
+    def validate(self, data: dict) -> dict:
+        """
+        Docstring для validate
+
+        :param data: словарь с полями
+        :return: словарь с полями
+        """
+        if not data:
+            raise serializers.ValidationError(['Нет полей для обновления'])
+        return data
+
+
+class QuestionBulkUpdateSerializer(QuestionSelectionSerializer):
+    """Массовое обновление вопросов"""
+
+    set = QuestionPatchSerializer()
@@ -0,0 +1,227 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+
+from quiz.models import Question
+from quiz.utils import ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL
+
+
+class AnswerKeyCache:
+    """
+    Кэш правильных ответов по id вопроса.
+
+    Если в настройке QUIZ_ANSWER_CACHE указан алиас кэша Django, ответы
+    хранятся в нем и общие для всех процессов; по умолчанию так бывает,
+    когда QUIZ_CACHE_BACKEND - общий для процессов кэш. Ключ ответа
+    включает версию вопроса, которую инвалидация меняет: ответ,
+    прочитанный из БД до записи, сохраняется под старой версией и больше не
+    читается. Иначе ответы
+    хранятся в LRU внутри процесса. Записи другого процесса или import_csv
+    этот LRU не сбрасывают, поэтому ответ в нем живет не дольше
+    QUIZ_ANSWER_CACHE_TTL секунд. При промахе из БД читается только
+    столбец correct_answer.
+    """
+
+    def __init__(self) -> None:
+        """Создает пустой LRU"""
+        # ответ и момент time.monotonic(), после которого он устаревает
+        self._answers: OrderedDict[int, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        # растет при каждой инвалидации, чтобы не сохранить ответ, прочитанный до нее
+        self._generation = 0
+
+    @staticmethod
+    def _version_key(question_id: int) -> str:
+        """
+        Ключ версии ответа в кэше Django.
+
+        :param question_id: Идентификатор вопроса
+        :return: Ключ кэша
+        """
+        return f'question:{question_id}:answer'
+
+    def _keys(self, shared: BaseCache,
+              question_ids: list[int]) -> dict[int, str]:
+        """
+        Ключи ответов текущих версий в кэше Django.
+
+        Версию нужно прочитать до ответа из БД, иначе инвалидация между
+        чтением из БД и записью в кэш не заметна.
+
+        :param shared: Кэш ответов
+        :param question_ids: Идентификаторы вопросов
+        :return: Ключи по id
+        """
+        version_keys = {self._version_key(pk): pk for pk in question_ids}
+        versions = shared.get_many(version_keys)
+        missing = [key for key in version_keys if key not in versions]
+        if missing:
+            for key in missing:
+                shared.add(key, uuid.uuid4().hex)
+            versions.update(shared.get_many(missing))
+        return {pk: f'{key}:{versions[key]}'
+                for key, pk in version_keys.items() if key in versions}
+
+    @staticmethod
+    def _shared_cache() -> BaseCache | None:
+        """
+        Кэш Django для ответов, если он настроен.
+
+        :return: Кэш или None
+        """
+        alias = getattr(settings, 'QUIZ_ANSWER_CACHE', None)
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _expires() -> float:
+        """
+        Момент, до которого новый ответ в LRU считается актуальным.
+
+        :return: Значение time.monotonic()
+        """
+        return time.monotonic() + getattr(settings, 'QUIZ_ANSWER_CACHE_TTL',
+                                          ANSWER_CACHE_TTL)
+
+    def _lookup(self, question_id: int, now: float) -> str | None:
+        """
+        Достает ответ из LRU, устаревший ответ удаляется.
+
+        Вызывается под блокировкой.
+
+        :param question_id: Идентификатор вопроса
+        :param now: Текущее значение time.monotonic()
+        :return: Ответ или None
+        """
+        entry = self._answers.get(question_id)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._answers[question_id]
+            return None
+        self._answers.move_to_end(question_id)
+        return entry[0]
+
+    def _load(self, question_id: int) -> str:
+        """
+        Читает правильный ответ из БД.
+
+        :param question_id: Идентификатор вопроса
+        :return: Правильный ответ
+        :raises Question.DoesNotExist: Если вопроса нет
+        """
+        return Question.objects.filter(id=question_id).values_list(
+            'correct_answer', flat=True).get()
+
+    def _load_many(self, question_ids: list[int]) -> dict[int, str]:
+        """
+        Читает правильные ответы из БД одним запросом.
+
+        :param question_ids: Идентификаторы вопросов
+        :return: Ответы по id, отсутствующих вопросов в словаре нет
+        """
+        return dict(Question.objects.filter(id__in=question_ids).values_list(
+            'id', 'correct_answer'))
+
+    def get(self, question_id: int) -> str:
+        """
+        Возвращает правильный ответ на вопрос.
+
+        :param question_id: Идентификатор вопроса
+        :return: Правильный ответ
+        :raises Question.DoesNotExist: Если вопроса нет
+        """
+        shared = self._shared_cache()
+        if shared is not None:
+            key = self._keys(shared, [question_id]).get(question_id)
+            answer = shared.get(key) if key is not None else None
+            if answer is None:
+                answer = self._load(question_id)
+                if key is not None:
+                    shared.set(key, answer)
+            return answer
+
+        with self._lock:
+            answer = self._lookup(question_id, time.monotonic())
+            if answer is not None:
+                return answer
+            generation = self._generation
+        answer = self._load(question_id)
+        size = getattr(settings, 'QUIZ_ANSWER_CACHE_SIZE', ANSWER_CACHE_SIZE)
+        with self._lock:
+            if generation != self._generation:
+                return answer
+            self._answers[question_id] = (answer, self._expires())
+            self._answers.move_to_end(question_id)
+            while len(self._answers) > size:
+                self._answers.popitem(last=False)
+        return answer
+
+    def get_many(self, question_ids: list[int]) -> dict[int, str]:
+        """
+        Возвращает правильные ответы на несколько вопросов.
+
+        Промахи читаются из БД одним запросом id__in.
+
+        :param question_ids: Идентификаторы вопросов
+        :return: Ответы по id, отсутствующих вопросов в словаре нет
+        """
+        question_ids = list(dict.fromkeys(question_ids))
+        shared = self._shared_cache()
+        if shared is not None:
+            keys = self._keys(shared, question_ids)
+            pks = {key: pk for pk, key in keys.items()}
+            answers = {pks[key]: answer
+                       for key, answer in shared.get_many(pks).items()}
+        else:
+            now = time.monotonic()
+            with self._lock:
+                answers = {pk: answer for pk in question_ids
+                           if (answer := self._lookup(pk, now)) is not None}
+                generation = self._generation
+        missing = [pk for pk in question_ids if pk not in answers]
+        if not missing:
+            return answers
+        loaded = self._load_many(missing)
+        answers.update(loaded)
+        if shared is not None:
+            shared.set_many({keys[pk]: answer for pk, answer in loaded.items()
+                             if pk in keys})
+            return answers
+        size = getattr(settings, 'QUIZ_ANSWER_CACHE_SIZE', ANSWER_CACHE_SIZE)
+        with self._lock:
+            if generation == self._generation:
+                expires = self._expires()
+                self._answers.update((pk, (answer, expires))
+                                     for pk, answer in loaded.items())
+                while len(self._answers) > size:
+                    self._answers.popitem(last=False)
+        return answers
+
+    def invalidate(self, *question_ids: int) -> None:
+        """
+        Сбрасывает ответы после изменения или удаления вопросов.
+
+        :param question_ids: Идентификаторы вопросов
+        """
+        with self._lock:
+            self._generation += 1
+            for question_id in question_ids:
+                self._answers.pop(question_id, None)
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.set_many({self._version_key(pk): uuid.uuid4().hex
+                             for pk in question_ids})
+
+    def clear(self) -> None:
+        """Сбрасывает все ответы в LRU процесса"""
+        with self._lock:
+            self._generation += 1
+            self._answers.clear()
+
+
+answer_keys = AnswerKeyCache()
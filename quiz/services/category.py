@@ -1,6 +1,15 @@
+from django.db import transaction
+
 from quiz.dao import AbstractCategoryService
-from quiz.models import Category
-from quiz.services.utils import update_model
+from quiz.models import Category, Question
+from quiz.services.answers import answer_keys
+from quiz.services.responses import response_cache
+from quiz.services.sampling import sampler
+from quiz.services.utils import (Cursor, Page, constraint_guard, delete_rows,
+                                 does_not_exist, keyset_page, only_fields,
+                                 update_model, with_normalized_title)
+from quiz.services.writes import serialized_write
+from quiz.utils import PAGE_SIZE
 
 
 class CategoryService(AbstractCategoryService):
@@ -10,25 +19,46 @@ class CategoryService(AbstractCategoryService):
         """Метод для получения списка категорий"""
         return Category.objects.all()
 
-    def get_category(self, category_id: int) -> Category:
+    def list_categories_page(self, cursor: Cursor | None = None,
+                             limit: int = PAGE_SIZE,
+                             values: tuple[str, ...] | None = None) -> Page:
+        """
+        Возвращает страницу категорий в порядке (title, id).
+
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :param values: Поля для словарей вместо объектов модели.
+        :return: Страница категорий с курсорами и версией.
+        """
+        return keyset_page(Category.objects.all(), ('title', 'id'), cursor, limit,
+                           values, versioned=True)
+
+    def get_category(self, category_id: int,
+                     fields: tuple[str, ...] | None = None) -> Category:
         """
         Метод для получения категории по идентификатору.
 
         :param category_id: Идентификатор категории.
+        :param fields: Поля для загрузки или None для всех полей.
         :return: Категория из БД.
         """
-        return Category.objects.get(id=category_id)
+        return only_fields(Category.objects.all(), fields).get(id=category_id)
 
+    @serialized_write
     def create_category(self, title: str) -> Category:
         """
         Создает категорию вопросов.
 
         :param title: Название для категории.
         :return: Созданная категория.
+        :raises IntegrityError: Если категория с таким названием уже есть.
         """
-        category, _ = Category.objects.get_or_create(title=title)
+        with constraint_guard():
+            category = Category.objects.create(title=title)
+        response_cache.invalidate('category')
         return category
 
+    @serialized_write
     def update_category(self, category_id: int, data: dict) -> Category:
         """
         Обновляет категорию новыми данными.
@@ -36,16 +66,31 @@ class CategoryService(AbstractCategoryService):
         :param category_id: Идентификатор категории.
         :param data: Данные для обновления категории.
         :return: Обновленная категория.
+        :raises IntegrityError: Если категория с таким названием уже есть.
         """
-        return update_model(Category, category_id, data)
+        with constraint_guard():
+            category = update_model(Category, category_id,
+                                    with_normalized_title(data))
+        response_cache.invalidate('category', category_id)
+        return category
 
+    @serialized_write
     def delete_category(self, category_id: int) -> None:
         """
         Удаляет категорию.
 
         :param category_id: Идентификатор категории для удаления.
+        :raises Category.DoesNotExist: Если категории нет.
         """
-        Category.objects.get(id=category_id).delete()
+        with transaction.atomic():
+            questions = delete_rows(Question, 'category_id', category_id,
+                                    ('id', 'quiz_id'))
+            if not delete_rows(Category, 'id', category_id):
+                raise does_not_exist(Category)
+        answer_keys.invalidate(*(pk for pk, _ in questions))
+        sampler.invalidate(*{quiz_id for _, quiz_id in questions})
+        response_cache.invalidate('category', category_id)
+        response_cache.invalidate('question', *(pk for pk, _ in questions))
 
     def search_title(self, title: str) -> list[Category]:
         """
@@ -0,0 +1,198 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TextIO
+
+from django.db.models import QuerySet
+from rest_framework.utils.encoders import JSONEncoder
+
+# поля вопроса в том же порядке, что и в QuestionSerializer
+QUESTION_FIELDS = ('id', 'text', 'description', 'options', 'correct_answer',
+                   'difficulty', 'explanation', 'quiz_id', 'category_id')
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+# расширение файла для каждого способа сжатия
+EXPORT_COMPRESSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+ID_COLUMNS = ('id', 'quiz_id', 'category_id')
+
+
+def dump_json(row: dict | list) -> str:
+    """
+    Сериализует строку так же, как JSONRenderer DRF.
+
+    :param row: Словарь с полями объекта или список значений
+    :return: Компактный JSON без экранирования юникода
+    """
+    return json.dumps(row, cls=JSONEncoder, ensure_ascii=False,
+                      separators=(',', ':'))
+
+
+def iter_chunks(rows: Iterable[dict],
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[list[str]]:
+    """
+    Сериализует строки в JSON и группирует их по chunk_size штук.
+
+    :param rows: Словари с полями объектов
+    :param chunk_size: Количество объектов в одной пачке
+    :return: Итератор пачек JSON-строк
+    """
+    lines = []
+    for row in rows:
+        lines.append(dump_json(row))
+        if len(lines) >= chunk_size:
+            yield lines
+            lines = []
+    if lines:
+        yield lines
+
+
+def iter_ndjson(rows: Iterable[dict],
+                chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Отдает строки в формате NDJSON пачками по chunk_size объектов.
+
+    :param rows: Словари с полями объектов
+    :param chunk_size: Количество объектов в одной пачке
+    :return: Итератор кусков ответа
+    """
+    for lines in iter_chunks(rows, chunk_size):
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_json_array(rows: Iterable[dict],
+                    chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Отдает строки как JSON-массив, записывая его по частям.
+
+    :param rows: Словари с полями объектов
+    :param chunk_size: Количество объектов в одной пачке
+    :return: Итератор кусков ответа
+    """
+    yield '['
+    separator = ''
+    for lines in iter_chunks(rows, chunk_size):
+        yield separator + ','.join(lines)
+        separator = ','
+    yield ']'
+
+
+def iter_value_chunks(queryset: QuerySet, columns: tuple[str, ...],
+                      chunk_size: int = EXPORT_CHUNK_SIZE,
+                      ) -> Iterator[list[tuple]]:
+    """
+    Читает таблицу пачками кортежей в порядке id без создания моделей.
+
+    :param queryset: Выборка объектов
+    :param columns: Выгружаемые поля
+    :param chunk_size: Количество строк в одной пачке
+    :return: Итератор пачек кортежей
+    """
+    rows = queryset.order_by('id').values_list(*columns).iterator(chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def format_options(options: list) -> str:
+    """
+    Записывает варианты ответа в формате CSV для import_csv.
+
+    :param options: Варианты ответа
+    :return: Строка вида "['a','b']"
+    """
+    return '[{}]'.format(','.join(repr(option) for option in options))
+
+
+def open_export(path: str, compression: str | None = None) -> TextIO:
+    """
+    Открывает файл выгрузки на запись, при необходимости со сжатием.
+
+    :param path: Путь к файлу
+    :param compression: Способ сжатия из EXPORT_COMPRESSIONS или None
+    :return: Текстовый файл
+    """
+    opener = {None: open, 'gzip': gzip.open, 'bz2': bz2.open,
+              'xz': lzma.open}[compression]
+    return opener(path, 'wt', encoding='utf-8', newline='')
+
+
+def write_csv(file: TextIO, columns: tuple[str, ...],
+              chunks: Iterable[list[tuple]]) -> int:
+    """
+    Пишет строки в CSV в том виде, в котором их читает import_csv.
+
+    :param file: Файл выгрузки
+    :param columns: Столбцы
+    :param chunks: Пачки кортежей
+    :return: Количество записанных строк
+    """
+    writer = csv.writer(file, lineterminator='\n')
+    writer.writerow(columns)
+    options = columns.index('options') if 'options' in columns else None
+    count = 0
+    for chunk in chunks:
+        rows = [['' if value is None else value for value in row]
+                for row in chunk]
+        if options is not None:
+            for row in rows:
+                row[options] = format_options(row[options])
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def write_jsonl(file: TextIO, columns: tuple[str, ...],
+                chunks: Iterable[list[tuple]]) -> int:
+    """
+    Пишет строки в JSONL, по объекту на строку.
+
+    :param file: Файл выгрузки
+    :param columns: Столбцы
+    :param chunks: Пачки кортежей
+    :return: Количество записанных строк
+    """
+    count = 0
+    for chunk in chunks:
+        file.write(''.join(dump_json(dict(zip(columns, row, strict=True)))
+                           + '\n' for row in chunk))
+        count += len(chunk)
+    return count
+
+
+def write_parquet(path: str, columns: tuple[str, ...],
+                  chunks: Iterable[list[tuple]],
+                  compression: str | None = None) -> int:
+    """
+    Пишет строки в Parquet, по группе строк на пачку.
+
+    Нужен пакет pyarrow. Варианты ответа хранятся в JSONField и могут быть
+    не только строками, поэтому столбец options пишется строкой JSON.
+
+    :param path: Путь к файлу
+    :param columns: Столбцы
+    :param chunks: Пачки кортежей
+    :param compression: Кодек сжатия Parquet или None
+    :return: Количество записанных строк
+    :raises ImportError: Если pyarrow не установлен
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        (column, pa.int64() if column in ID_COLUMNS else pa.string())
+        for column in columns
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema,
+                          compression=compression or 'none') as writer:
+        for chunk in chunks:
+            data = dict(zip(columns, zip(*chunk, strict=True), strict=True))
+            if 'options' in data:
+                data['options'] = [dump_json(options)
+                                   for options in data['options']]
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            count += len(chunk)
+    return count
@@ -0,0 +1,376 @@
+import ast
+import hashlib
+import io
+import json
+import os
+from collections.abc import Callable, Iterator
+
+import django
+import pandas as pd
+
+from quiz.models import Difficulty
+from quiz.utils import (EXP_LEN, HASH_LEN, TEXT_LEN, TITLE_CAT_LEN,
+                        TITLE_QUIZ_LEN, normalize_title)
+
+IMPORT_BATCH_SIZE = 5000
+# размер куска файла, который разбирает один процесс в режиме --workers
+PARALLEL_CHUNK_BYTES = 4 * 1024 * 1024
+CATEGORY_COLUMNS = ('id', 'title')
+QUIZ_COLUMNS = ('id', 'title', 'description')
+QUESTION_COLUMNS = ('id', 'quiz_id', 'category_id', 'text', 'description',
+                    'options', 'correct_answer', 'explanation', 'difficulty')
+
+
+def prepare_chunk(chunk: pd.DataFrame, columns: tuple[str, ...],
+                  skip_rows: int = 0) -> pd.DataFrame:
+    """
+    Оставляет нужные столбцы и добавляет номер строки.
+
+    В столбце row хранится номер строки данных, начиная с 1.
+
+    :param chunk: Пачка строк из CSV
+    :param columns: Ожидаемые столбцы
+    :param skip_rows: Сколько строк данных пропущено перед пачкой
+    :return: Пачка с нужными столбцами
+    :raises ValueError: Если в файле нет нужных столбцов
+    """
+    missing = set(columns) - set(chunk.columns)
+    if missing:
+        raise ValueError(f'Нет столбцов в файле: {sorted(missing)}')
+    chunk = chunk.loc[:, list(columns)].copy()
+    chunk.insert(0, 'row', chunk.index + 1 + skip_rows)
+    return chunk
+
+
+def read_chunks(file_path: str, columns: tuple[str, ...],
+                batch_size: int = IMPORT_BATCH_SIZE,
+                skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Читает CSV пачками, не загружая файл в память целиком.
+
+    Все значения читаются строками, пустые ячейки - пустыми строками.
+
+    :param file_path: Путь к файлу
+    :param columns: Ожидаемые столбцы
+    :param batch_size: Размер пачки
+    :param skip_rows: Сколько первых строк данных пропустить
+    :return: Итератор пачек
+    :raises ValueError: Если в файле нет нужных столбцов
+    """
+    reader = pd.read_csv(file_path, dtype=str, keep_default_na=False,
+                         chunksize=batch_size,
+                         skiprows=range(1, skip_rows + 1))
+    with reader:
+        for chunk in reader:
+            yield prepare_chunk(chunk, columns, skip_rows)
+
+
+def plan_byte_ranges(file_path: str, chunk_bytes: int = PARALLEL_CHUNK_BYTES,
+                     skip_rows: int = 0) -> tuple[bytes, list[tuple[int, int]]]:
+    """
+    Делит файл на куски по границам строк.
+
+    Предполагается, что каждая запись CSV занимает одну строку файла.
+
+    :param file_path: Путь к файлу
+    :param chunk_bytes: Примерный размер куска в байтах
+    :param skip_rows: Сколько первых строк данных пропустить
+    :return: Заголовок файла и список диапазонов (начало, конец)
+    """
+    ranges = []
+    with open(file_path, 'rb') as file:
+        header = file.readline()
+        for _ in range(skip_rows):
+            file.readline()
+        start = file.tell()
+        size = os.fstat(file.fileno()).st_size
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            if file.tell() < size:
+                file.readline()
+            end = file.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def init_worker(settings_module: str) -> None:
+    """
+    Настраивает Django в процессе-обработчике.
+
+    :param settings_module: Модуль настроек
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def parse_byte_range(file_path: str, header: bytes, start: int, end: int,
+                     columns: tuple[str, ...], validate: Callable,
+                     file_name: str) -> tuple[pd.DataFrame, list[dict], int]:
+    """
+    Разбирает и проверяет кусок файла в процессе-обработчике.
+
+    Номера строк считаются от начала куска, их сдвигает писатель.
+
+    :param file_path: Путь к файлу
+    :param header: Заголовок CSV
+    :param start: Начало куска в байтах
+    :param end: Конец куска в байтах
+    :param columns: Ожидаемые столбцы
+    :param validate: Проверка пачки
+    :param file_name: Имя файла для отчета
+    :return: Корректные строки, записи об ошибках и число строк в куске
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(header + data), dtype=str,
+                        keep_default_na=False)
+    valid, rejects = validate(prepare_chunk(chunk, columns), file_name)
+    return valid, rejects, len(chunk)
+
+
+def row_hashes(chunk: pd.DataFrame, columns: tuple[str, ...]) -> pd.Series:
+    """
+    Считает хэш содержимого каждой строки.
+
+    По хэшу повторный импорт пропускает строки, не изменившиеся с прошлой
+    загрузки.
+
+    :param chunk: Пачка проверенных строк
+    :param columns: Столбцы, которые пишутся в БД
+    :return: Столбец хэшей
+    """
+    return pd.Series(
+        [hashlib.blake2b(repr(values).encode(),
+                         digest_size=HASH_LEN // 2).hexdigest()
+         for values in zip(*(chunk[column].tolist() for column in columns),
+                           strict=True)],
+        index=chunk.index, dtype=object)
+
+
+class ImportCheckpoint:
+    """
+    Файл с прогрессом импорта для продолжения после сбоя.
+
+    Для каждого CSV хранится число строк данных в закоммиченных пачках.
+    Если файл изменился после сохранения, прогресс по нему сбрасывается.
+    """
+
+    def __init__(self, path: str | None) -> None:
+        """
+        Читает прогресс из файла.
+
+        :param path: Путь к файлу прогресса, None - прогресс не сохраняется
+        """
+        self.path = path
+        self.files = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                self.files = json.load(file)
+
+    @staticmethod
+    def _signature(file_path: str) -> list[int]:
+        """
+        Размер и время изменения CSV.
+
+        :param file_path: Путь к CSV
+        :return: Подпись файла
+        """
+        stat = os.stat(file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def rows_done(self, file_path: str) -> int:
+        """
+        Сколько строк файла уже загружено.
+
+        :param file_path: Путь к CSV
+        :return: Число строк данных
+        """
+        state = self.files.get(os.path.basename(file_path))
+        if state is None or state['file'] != self._signature(file_path):
+            return 0
+        return state['rows']
+
+    def save(self, file_path: str, rows: int) -> None:
+        """
+        Сохраняет прогресс после коммита пачки.
+
+        :param file_path: Путь к CSV
+        :param rows: Число загруженных строк данных
+        """
+        if not self.path:
+            return
+        self.files[os.path.basename(file_path)] = {
+            'file': self._signature(file_path), 'rows': rows}
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.files, file)
+        os.replace(temp_path, self.path)
+
+    def clear(self) -> None:
+        """Удаляет файл прогресса после успешного импорта"""
+        self.files = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def parse_options(raw: str) -> list | None:
+    """
+    Разбирает варианты ответа из записи вида "['a','b']".
+
+    :param raw: Строка из CSV
+    :return: Список вариантов или None, если строка не разбирается
+    """
+    try:
+        options = ast.literal_eval(raw.replace('""', '"'))
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return options if isinstance(options, list) else None
+
+
+class RowErrors:
+    """Накопитель ошибок по строкам пачки"""
+
+    def __init__(self, chunk: pd.DataFrame) -> None:
+        """
+        Создает пустой список ошибок для каждой строки.
+
+        :param chunk: Пачка строк
+        """
+        self.chunk = chunk
+        self.raw_ids = chunk['id'].copy()
+        self.errors = pd.Series('', index=chunk.index, dtype=object)
+
+    def add(self, mask: pd.Series, message: str) -> None:
+        """
+        Добавляет ошибку строкам, отмеченным в mask.
+
+        :param mask: Маска строк с ошибкой
+        :param message: Текст ошибки
+        """
+        mask = mask & (self.errors == '')
+        self.errors[mask] = message
+
+    def split(self, file_name: str) -> tuple[pd.DataFrame, list[dict]]:
+        """
+        Делит пачку на корректные строки и отклоненные.
+
+        :param file_name: Имя файла для отчета
+        :return: Корректные строки и записи об ошибках
+        """
+        bad = self.errors != ''
+        rejects = [
+            {'file': file_name, 'row': int(row), 'id': pk, 'error': error}
+            for row, pk, error in zip(self.chunk.loc[bad, 'row'],
+                                      self.raw_ids[bad], self.errors[bad],
+                                      strict=True)
+        ]
+        return self.chunk.loc[~bad], rejects
+
+
+def _ids(column: pd.Series) -> pd.Series:
+    """
+    Переводит столбец идентификаторов в числа.
+
+    :param column: Столбец строк
+    :return: Столбец чисел, некорректные значения - NaN
+    """
+    return pd.to_numeric(column.str.strip(), errors='coerce')
+
+
+def _check_id(errors: RowErrors, chunk: pd.DataFrame, column: str) -> None:
+    """
+    Проверяет, что в столбце положительные целые числа.
+
+    :param errors: Накопитель ошибок
+    :param chunk: Пачка строк
+    :param column: Имя столбца
+    """
+    ids = _ids(chunk[column])
+    errors.add(ids.isna() | (ids < 1) | (ids % 1 != 0),
+               f'{column}: требуется положительное целое число')
+    chunk[column] = ids.fillna(0).astype('int64')
+
+
+def validate_categories(chunk: pd.DataFrame,
+                        file_name: str) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    Проверяет пачку категорий.
+
+    :param chunk: Пачка строк
+    :param file_name: Имя файла для отчета
+    :return: Корректные строки и записи об ошибках
+    """
+    errors = RowErrors(chunk)
+    _check_id(errors, chunk, 'id')
+    title = chunk['title'] = chunk['title'].str.strip()
+    errors.add(title == '', 'title: обязательное поле')
+    errors.add(title.str.len() > TITLE_CAT_LEN,
+               f'title: не больше {TITLE_CAT_LEN} символов')
+    chunk['title_normalized'] = title.map(normalize_title)
+    errors.add(chunk['title_normalized'].duplicated(), 'title: повтор в файле')
+    chunk['import_hash'] = row_hashes(chunk, ('title',))
+    return errors.split(file_name)
+
+
+def validate_quizzes(chunk: pd.DataFrame,
+                     file_name: str) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    Проверяет пачку квизов и добавляет нормализованное название.
+
+    :param chunk: Пачка строк
+    :param file_name: Имя файла для отчета
+    :return: Корректные строки и записи об ошибках
+    """
+    errors = RowErrors(chunk)
+    _check_id(errors, chunk, 'id')
+    errors.add(chunk['title'].str.strip() == '', 'title: обязательное поле')
+    errors.add(chunk['title'].str.len() > TITLE_QUIZ_LEN,
+               f'title: не больше {TITLE_QUIZ_LEN} символов')
+    errors.add(chunk['description'].str.len() > TEXT_LEN,
+               f'description: не больше {TEXT_LEN} символов')
+    chunk['title_normalized'] = chunk['title'].map(normalize_title)
+    errors.add(chunk['title_normalized'].duplicated(), 'title: повтор в файле')
+    chunk['description'] = chunk['description'].where(
+        chunk['description'] != '', None)
+    chunk['import_hash'] = row_hashes(chunk, ('title', 'description'))
+    return errors.split(file_name)
+
+
+def validate_questions(chunk: pd.DataFrame,
+                       file_name: str) -> tuple[pd.DataFrame, list[dict]]:
+    """
+    Проверяет пачку вопросов по правилам QuestionSerializer.
+
+    :param chunk: Пачка строк
+    :param file_name: Имя файла для отчета
+    :return: Корректные строки с разобранными options и записи об ошибках
+    """
+    errors = RowErrors(chunk)
+    for column in ('id', 'quiz_id', 'category_id'):
+        _check_id(errors, chunk, column)
+    for column in ('text', 'description', 'correct_answer'):
+        errors.add(chunk[column].str.strip() == '',
+                   f'{column}: обязательное поле')
+        errors.add(chunk[column].str.len() > TEXT_LEN,
+                   f'{column}: не больше {TEXT_LEN} символов')
+    errors.add(chunk['explanation'].str.len() > EXP_LEN,
+               f'explanation: не больше {EXP_LEN} символов')
+    errors.add(~chunk['difficulty'].isin(Difficulty.values),
+               f'difficulty: одно из {Difficulty.values}')
+
+    options = chunk['options'].map(parse_options)
+    errors.add(options.isna(), 'options: требуется список')
+    errors.add(options.map(lambda value: value is not None and len(value) <= 1),
+               'options: нехватает вариантов ответа')
+    errors.add(pd.Series([answer not in (value or ())
+                          for answer, value in zip(chunk['correct_answer'],
+                                                   options, strict=True)],
+                         index=chunk.index),
+               'correct_answer: должен быть одним из вариантов')
+    chunk['options'] = options
+    chunk['explanation'] = chunk['explanation'].where(
+        chunk['explanation'] != '', None)
+    chunk['import_hash'] = row_hashes(chunk, QUESTION_COLUMNS[1:])
+    return errors.split(file_name)
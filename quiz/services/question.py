@@ -1,8 +1,39 @@
-import random
+from collections.abc import Iterator
+
+from django.db import transaction
+from django.db.models import QuerySet
 
 from quiz.dao import AbstractQuestionService
-from quiz.models import Question, Quiz
-from quiz.services.utils import update_model
+from quiz.models import Category, Difficulty, Question, Quiz
+from quiz.services.answers import answer_keys
+from quiz.services.export import EXPORT_CHUNK_SIZE, QUESTION_FIELDS
+from quiz.services.responses import response_cache
+from quiz.services.sampling import sampler
+from quiz.services.search import get_search_backend
+from quiz.services.utils import (Cursor, Page, delete_returning, delete_rows,
+                                 does_not_exist, keyset_page, only_fields,
+                                 touch, update_model, update_returning)
+from quiz.services.writes import serialized_write
+from quiz.utils import MAX_BATCH_SIZE, PAGE_SIZE
+
+# поля связей в данных вопроса и их столбцы в модели
+FOREIGN_KEYS = {'quiz_id': 'quiz_id_id', 'category_id': 'category_id_id'}
+# порядки списка вопросов и ключи keyset-пагинации для них
+QUESTION_ORDERINGS = {'id': ('id',), '-id': ('-id',)}
+
+
+def ordering_keys(ordering: str) -> tuple[str, ...]:
+    """
+    Возвращает ключ keyset-пагинации для порядка списка вопросов.
+
+    :param ordering: Порядок из QUESTION_ORDERINGS.
+    :return: Поля ключа.
+    :raises ValueError: Если порядок неизвестен.
+    """
+    if ordering not in QUESTION_ORDERINGS:
+        raise ValueError(
+            f'Порядок должен быть одним из: {list(QUESTION_ORDERINGS)}')
+    return QUESTION_ORDERINGS[ordering]
 
 
 class QuestionService(AbstractQuestionService):
@@ -16,15 +47,43 @@ class QuestionService(AbstractQuestionService):
         """
         return Question.objects.all()
 
-    def get_question(self, question_id: int) -> Question:
+    def list_questions_page(self, cursor: Cursor | None = None,
+                            limit: int = PAGE_SIZE,
+                            values: tuple[str, ...] | None = None,
+                            quiz_id: int | None = None,
+                            category_id: int | None = None,
+                            difficulty: str | None = None,
+                            ordering: str = 'id') -> Page:
+        """
+        Возвращает страницу вопросов, отобранных по квизу, категории и сложности.
+
+        Фильтры и порядок по id обслуживает один составной индекс.
+
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :param values: Поля для словарей вместо объектов модели.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :param ordering: Порядок: id или -id.
+        :return: Страница вопросов с курсорами и версией.
+        :raises ValueError: Если сложность или порядок неизвестны.
+        """
+        return keyset_page(
+            self.filter_questions(quiz_id, category_id, difficulty),
+            ordering_keys(ordering), cursor, limit, values, versioned=True)
+
+    def get_question(self, question_id: int,
+                     fields: tuple[str, ...] | None = None) -> Question:
         """
         Возвращает вопрос по его идентификатору.
 
         :param question_id: Идентификатор вопроса.
+        :param fields: Поля для загрузки или None для всех полей.
         :return: Вопрос из БД.
         """
 
-        return Question.objects.get(id=question_id)
+        return only_fields(Question.objects.all(), fields).get(id=question_id)
 
     def get_questions_by_text(self, text: str) -> list[Question]:
         """
@@ -33,7 +92,20 @@ class QuestionService(AbstractQuestionService):
         :param text: Текст вопроса.
         :return: Вопрос из БД.
         """
-        return Question.objects.filter(text__icontains=text)
+        return get_search_backend(text).search(text, None, None).items
+
+    def get_questions_by_text_page(self, text: str,
+                                   cursor: Cursor | None = None,
+                                   limit: int = PAGE_SIZE) -> Page:
+        """
+        Ищет вопросы по тексту, описанию и объяснению.
+
+        :param text: Строка поиска.
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :return: Страница вопросов, самые релевантные первыми.
+        """
+        return get_search_backend(text).search(text, cursor, limit)
 
     def get_questions_for_quiz(self, quiz_id: int) -> list[Question]:
         """
@@ -44,6 +116,50 @@ class QuestionService(AbstractQuestionService):
         """
         return Quiz.objects.get(id=quiz_id).questions.all()
 
+    def filter_questions(self, quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> QuerySet:
+        """
+        Возвращает вопросы, отобранные по квизу, категории и сложности.
+
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Выборка вопросов.
+        :raises ValueError: Если сложность неизвестна.
+        """
+        filters = {}
+        if quiz_id is not None:
+            filters['quiz_id'] = quiz_id
+        if category_id is not None:
+            filters['category_id'] = category_id
+        if difficulty is not None:
+            if difficulty not in Difficulty.values:
+                raise ValueError(
+                    f'Сложность должна быть одной из: {Difficulty.values}')
+            filters['difficulty'] = difficulty
+        return Question.objects.filter(**filters)
+
+    def iter_question_rows(self, quiz_id: int | None = None,
+                           category_id: int | None = None,
+                           difficulty: str | None = None,
+                           chunk_size: int = EXPORT_CHUNK_SIZE,
+                           ) -> Iterator[dict]:
+        """
+        Построчно отдает вопросы словарями, не загружая всю таблицу.
+
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :param chunk_size: Сколько строк читать из БД за раз.
+        :return: Итератор словарей с полями вопроса.
+        :raises ValueError: Если сложность неизвестна.
+        """
+        queryset = self.filter_questions(quiz_id, category_id, difficulty)
+        return queryset.order_by('id').values(*QUESTION_FIELDS).iterator(
+            chunk_size=chunk_size)
+
+    @serialized_write
     def create_question(self, quiz_id: int, data: dict) -> Question:
         """
         Создает новый вопрос.
@@ -52,26 +168,171 @@ class QuestionService(AbstractQuestionService):
         :param data: Данные из запроса для создания вопроса.
         :return: Созданный вопрос.
         """
-        return Quiz.objects.get(id=quiz_id).questions.create(**data)
+        question = Question.objects.create(quiz_id_id=quiz_id, **data)
+        sampler.invalidate(quiz_id)
+        response_cache.invalidate('question')
+        return question
+
+    @serialized_write
+    def create_questions(self, items: list[dict],
+                         ) -> tuple[list[Question], dict[int, list[str]]]:
+        """
+        Создает несколько вопросов одной транзакцией.
+
+        Квизы и категории проверяются одним запросом id__in на модель,
+        элементы с несуществующими объектами не создаются.
+
+        :param items: Проверенные данные вопросов с quiz_id и category_id.
+        :return: Созданные вопросы в порядке items и поля с
+            несуществующими объектами по номеру элемента.
+        """
+        missing = {}
+        for field, model in zip(FOREIGN_KEYS, (Quiz, Category), strict=True):
+            existing = set(model.objects.filter(
+                id__in={item[field] for item in items}
+            ).values_list('id', flat=True))
+            for index, item in enumerate(items):
+                if item[field] not in existing:
+                    missing.setdefault(index, []).append(field)
+
+        questions = [
+            Question(**{FOREIGN_KEYS.get(field, field): value
+                        for field, value in item.items()})
+            for index, item in enumerate(items) if index not in missing
+        ]
+        if questions:
+            with transaction.atomic():
+                Question.objects.bulk_create(questions,
+                                             batch_size=MAX_BATCH_SIZE)
+            sampler.invalidate(*{question.quiz_id_id
+                                 for question in questions})
+            response_cache.invalidate('question')
+        return questions, missing
+
+    def select_questions(self, ids: list[int] | None = None,
+                         quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> QuerySet:
+        """
+        Возвращает вопросы, отобранные по id и фильтрам.
+
+        :param ids: Идентификаторы вопросов.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Выборка вопросов.
+        :raises ValueError: Если сложность неизвестна.
+        """
+        queryset = self.filter_questions(quiz_id, category_id, difficulty)
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        return queryset
+
+    @serialized_write
+    def update_questions(self, data: dict, ids: list[int] | None = None,
+                         quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> int:
+        """
+        Обновляет вопросы, отобранные по id и фильтрам, одним UPDATE.
+
+        При переносе в другой квиз сначала читаются id вопросов и квизы,
+        из которых они переносятся, чтобы сбросить их списки в sampler.
+
+        :param data: Новые значения полей.
+        :param ids: Идентификаторы вопросов.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Количество обновленных вопросов.
+        :raises ValueError: Если сложность неизвестна.
+        :raises Quiz.DoesNotExist: Если квиза из data нет.
+        :raises Category.DoesNotExist: Если категории из data нет.
+        """
+        queryset = self.select_questions(ids, quiz_id, category_id,
+                                         difficulty)
+        for field, model in zip(FOREIGN_KEYS, (Quiz, Category), strict=True):
+            if field in data and not model.objects.filter(
+                    id=data[field]).exists():
+                raise does_not_exist(model)
+        data = touch(Question, {FOREIGN_KEYS.get(field, field): value
+                                for field, value in data.items()})
+        if 'quiz_id_id' not in data:
+            rows = update_returning(queryset, data)
+        else:
+            with transaction.atomic():
+                rows = list(queryset.order_by().values_list('id', 'quiz_id'))
+                queryset.update(**data)
+            if rows:
+                sampler.invalidate(data['quiz_id_id'],
+                                   *{quiz for _, quiz in rows})
+        response_cache.invalidate('question', *(row[0] for row in rows))
+        return len(rows)
 
+    @serialized_write
+    def delete_questions(self, ids: list[int] | None = None,
+                         quiz_id: int | None = None,
+                         category_id: int | None = None,
+                         difficulty: str | None = None) -> int:
+        """
+        Удаляет вопросы, отобранные по id и фильтрам, одним DELETE.
+
+        :param ids: Идентификаторы вопросов.
+        :param quiz_id: Идентификатор квиза.
+        :param category_id: Идентификатор категории.
+        :param difficulty: Сложность вопроса.
+        :return: Количество удаленных вопросов.
+        :raises ValueError: Если сложность неизвестна.
+        """
+        rows = delete_returning(
+            self.select_questions(ids, quiz_id, category_id, difficulty),
+            ('id', 'quiz_id'))
+        answer_keys.invalidate(*(pk for pk, _ in rows))
+        sampler.invalidate(*{quiz for _, quiz in rows})
+        response_cache.invalidate('question', *(pk for pk, _ in rows))
+        return len(rows)
+
+    @serialized_write
     def update_question(self, question_id: int, data: dict) -> Question:
         """
         Обновляет существующий вопрос.
 
+        При переносе в другой квиз сначала читается квиз, из которого
+        вопрос переносится, чтобы сбросить его список в sampler.
+
         :param question_id: Идентификатор вопроса.
         :param data: Данные для обновления вопроса.
         :return: Обновленный вопрос.
         """
 
-        return update_model(Question, question_id, data)
+        if 'quiz_id' not in data and 'quiz_id_id' not in data:
+            question = update_model(Question, question_id, data)
+            quiz_ids = {question.quiz_id_id}
+        else:
+            with transaction.atomic():
+                previous = Question.objects.filter(
+                    id=question_id).values_list('quiz_id', flat=True).first()
+                question = update_model(Question, question_id, data)
+            quiz_ids = {previous, question.quiz_id_id}
+        answer_keys.invalidate(question_id)
+        sampler.invalidate(*quiz_ids)
+        response_cache.invalidate('question', question_id)
+        return question
 
+    @serialized_write
     def delete_question(self, question_id: int) -> None:
         """
         Удаляет вопрос по его идентификатору.
 
         :param question_id: Идентификатор вопроса для удаления.
+        :raises Question.DoesNotExist: Если вопроса нет.
         """
-        return Question.objects.get(id=question_id).delete()
+        rows = delete_rows(Question, 'id', question_id, ('quiz_id',))
+        if not rows:
+            raise does_not_exist(Question)
+        answer_keys.invalidate(question_id)
+        sampler.invalidate(rows[0][0])
+        response_cache.invalidate('question', question_id)
 
     def check_answer(self, question_id: int, answer: str) -> bool:
         """
@@ -81,7 +342,20 @@ class QuestionService(AbstractQuestionService):
         :param answer: Ответ пользователя.
         :return: True, если ответ правильный, False - в противном случае.
         """
-        return Question.objects.get(id=question_id).correct_answer == answer
+        return answer_keys.get(question_id) == answer
+
+    def check_answers(self,
+                      answers: list[tuple[int, str]]) -> list[bool | None]:
+        """
+        Проверяет ответы на несколько вопросов одним запросом.
+
+        :param answers: Пары (идентификатор вопроса, ответ пользователя).
+        :return: Результат для каждой пары: True, False или None,
+            если вопроса нет.
+        """
+        correct = answer_keys.get_many([pk for pk, _ in answers])
+        return [correct[pk] == answer if pk in correct else None
+                for pk, answer in answers]
 
     def random_question_from_quiz(self, quiz_id: int) -> Question:
         """
@@ -89,5 +363,6 @@ class QuestionService(AbstractQuestionService):
 
         :param quiz_id: Идентификатор квиза.
         :return: Случайный вопрос из квиза.
+        :raises Question.DoesNotExist: Если в квизе нет вопросов.
         """
-        return random.choice(Quiz.objects.get(id=quiz_id).questions.all())
+        return sampler.pick(quiz_id)
@@ -1,6 +1,16 @@
+from django.db import transaction
+
 from quiz.dao import AbstractQuizService
-from quiz.models import Quiz
-from quiz.services.utils import update_model
+from quiz.models import Question, Quiz
+from quiz.services.answers import answer_keys
+from quiz.services.responses import response_cache
+from quiz.services.sampling import sampler
+from quiz.services.search import TITLE_SEARCH_SUBSTRING, filter_by_title
+from quiz.services.utils import (Cursor, Page, constraint_guard, delete_rows,
+                                 does_not_exist, keyset_page, only_fields,
+                                 update_model, with_normalized_title)
+from quiz.services.writes import serialized_write
+from quiz.utils import PAGE_SIZE, normalize_title
 
 
 class QuizService(AbstractQuizService):
@@ -10,33 +20,57 @@ class QuizService(AbstractQuizService):
         """Возвращает список всех квизов."""
         return Quiz.objects.all()
 
-    def get_quiz(self, quiz_id: int) -> Quiz:
+    def list_quizzes_page(self, cursor: Cursor | None = None,
+                          limit: int = PAGE_SIZE,
+                          values: tuple[str, ...] | None = None) -> Page:
+        """
+        Возвращает страницу квизов в порядке (title, id).
+
+        :param cursor: Позиция начала страницы.
+        :param limit: Размер страницы.
+        :param values: Поля для словарей вместо объектов модели.
+        :return: Страница квизов с курсорами и версией.
+        """
+        return keyset_page(Quiz.objects.all(), ('title', 'id'), cursor, limit,
+                           values, versioned=True)
+
+    def get_quiz(self, quiz_id: int,
+                 fields: tuple[str, ...] | None = None) -> Quiz:
         """
         Возвращает квиз по его идентификатору.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля для загрузки или None для всех полей.
         :return: Квиз из БД.
         """
-        return Quiz.objects.get(id=quiz_id)
+        return only_fields(Quiz.objects.all(), fields).get(id=quiz_id)
 
-    def get_quizes_by_title(self, title: str) -> list[Quiz]:
+    def get_quizes_by_title(self, title: str,
+                            mode: str = TITLE_SEARCH_SUBSTRING) -> list[Quiz]:
         """
         Возвращает список квизов по названию.
 
         :param title: Название квиза.
+        :param mode: Режим поиска: substring или prefix.
         :return: Список квизов с подходящими названиями.
         """
-        return Quiz.objects.filter(title__contains=title)
+        return filter_by_title(Quiz.objects.all(), normalize_title(title), mode)
 
+    @serialized_write
     def create_quiz(self, data: dict) -> Quiz:
         """
         Создает новый квиз.
 
         :param data: Данные из запроса для создания квиза.
         :return: Созданный квиз.
+        :raises IntegrityError: Если квиз с таким названием уже есть.
         """
-        return Quiz.objects.create(**data)
+        with constraint_guard():
+            quiz = Quiz.objects.create(**data)
+        response_cache.invalidate('quiz')
+        return quiz
 
+    @serialized_write
     def update_quiz(self, quiz_id: int, data: dict) -> Quiz:
         """
         Обновляет существующий квиз.
@@ -44,16 +78,29 @@ class QuizService(AbstractQuizService):
         :param quiz_id: Идентификатор квиза.
         :param data: Данные для обновления квиза.
         :return: Обновленный квиз.
+        :raises IntegrityError: Если квиз с таким названием уже есть.
         """
-        return update_model(Quiz, quiz_id, data)
+        with constraint_guard():
+            quiz = update_model(Quiz, quiz_id, with_normalized_title(data))
+        response_cache.invalidate('quiz', quiz_id)
+        return quiz
 
+    @serialized_write
     def delete_quiz(self, quiz_id: int) -> None:
         """
         Удаляет квиз по его идентификатору.
 
         :param quiz_id: Идентификатор квиза для удаления.
+        :raises Quiz.DoesNotExist: Если квиза нет.
         """
-        Quiz.objects.get(id=quiz_id).delete()
+        with transaction.atomic():
+            questions = delete_rows(Question, 'quiz_id', quiz_id)
+            if not delete_rows(Quiz, 'id', quiz_id):
+                raise does_not_exist(Quiz)
+        answer_keys.invalidate(*(pk for pk, in questions))
+        sampler.invalidate(quiz_id)
+        response_cache.invalidate('quiz', quiz_id)
+        response_cache.invalidate('question', *(pk for pk, in questions))
 
     def search_quiz(self, title: str) -> list[Quiz]:
         """
@@ -62,4 +109,4 @@ class QuizService(AbstractQuizService):
         :param title: Название квиза
         :return: queryset с 1 объектом
         """
-        return Quiz.objects.filter(title__icontains=title)
+        return self.get_quizes_by_title(title)
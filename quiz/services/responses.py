@@ -0,0 +1,94 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+
+
+class ResponseCache:
+    """
+    Кэш готовых ответов API на чтение.
+
+    Ответы хранятся в кэше Django из настройки QUIZ_RESPONSE_CACHE. В ключ
+    ответа входит поколение его области: списков ресурса (например,
+    question) или одного объекта (question:5). Запись через сервис или
+    import_csv меняет поколение затронутых областей, и старые ответы больше
+    не читаются. Поколение читается до построения ответа, поэтому ответ,
+    построенный одновременно с записью, сохраняется под устаревшим ключом.
+    """
+
+    @staticmethod
+    def _cache() -> BaseCache | None:
+        """
+        Кэш Django для ответов, если он настроен.
+
+        :return: Кэш или None
+        """
+        alias = getattr(settings, 'QUIZ_RESPONSE_CACHE', None)
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _generation_key(scope: str) -> str:
+        """
+        Ключ поколения области в кэше.
+
+        :param scope: Область
+        :return: Ключ кэша
+        """
+        return f'response:{scope}:generation'
+
+    def key(self, scope: str, name: str) -> str | None:
+        """
+        Возвращает ключ ответа с текущим поколением области.
+
+        :param scope: Область, которую сбрасывают записи
+        :param name: Имя ответа внутри области, например путь запроса
+        :return: Ключ кэша или None, если кэш выключен
+        """
+        cache = self._cache()
+        if cache is None:
+            return None
+        generation_key = self._generation_key(scope)
+        generation = cache.get(generation_key)
+        if generation is None:
+            cache.add(generation_key, uuid.uuid4().hex)
+            generation = cache.get(generation_key)
+        return f'response:{scope}:{generation}:{name}'
+
+    def get(self, key: str) -> object | None:
+        """
+        Возвращает сохраненный ответ.
+
+        :param key: Ключ из key()
+        :return: Ответ или None
+        """
+        return self._cache().get(key)
+
+    def set(self, key: str, value: object) -> None:
+        """
+        Сохраняет ответ.
+
+        Срок жизни берется из TIMEOUT кэша и нужен только для того, чтобы
+        вытеснять ответы устаревших поколений.
+
+        :param key: Ключ из key()
+        :param value: Ответ
+        """
+        self._cache().set(key, value)
+
+    def invalidate(self, resource: str, *ids: int) -> None:
+        """
+        Сбрасывает списки ресурса и ответы по отдельным объектам.
+
+        :param resource: Ресурс: category, quiz или question
+        :param ids: Идентификаторы измененных объектов
+        """
+        cache = self._cache()
+        if cache is None:
+            return
+        scopes = [resource, *(f'{resource}:{pk}' for pk in ids)]
+        cache.set_many({self._generation_key(scope): uuid.uuid4().hex
+                        for scope in scopes})
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from quiz.models import Question
+from quiz.services.utils import is_shared_cache
+from quiz.utils import SAMPLER_CACHE_SIZE, SAMPLER_TTL
+
+
+class QuestionSampler:
+    """
+    Выбор случайного вопроса квиза без загрузки всех вопросов.
+
+    Если кэш Django общий для процессов, в нем хранится версия списка id
+    вопросов каждого квиза и сам список этой версии, в процессе - его
+    копия. Запись вопроса меняет версию, и при следующем обращении список
+    перечитывается одним запросом по индексу. С кэшем в памяти процесса
+    (locmem) записи других процессов и import_csv версию не меняют,
+    поэтому копия в процессе живет не дольше QUIZ_SAMPLER_TTL секунд.
+    Копий не больше QUIZ_SAMPLER_CACHE_SIZE, вытесняются давно не
+    использованные.
+    """
+
+    def __init__(self) -> None:
+        """Создает пустое хранилище списков id"""
+        # версия (None без общего кэша), id вопросов и момент
+        # time.monotonic(), после которого список устаревает
+        self._ids: OrderedDict[
+            int, tuple[str | None, tuple[int, ...], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version_key(quiz_id: int) -> str:
+        """
+        Ключ версии списка вопросов квиза в кэше.
+
+        :param quiz_id: Идентификатор квиза
+        :return: Ключ кэша
+        """
+        return f'quiz:{quiz_id}:question_ids'
+
+    def _version(self, quiz_id: int) -> str:
+        """
+        Возвращает текущую версию списка вопросов квиза.
+
+        :param quiz_id: Идентификатор квиза
+        :return: Версия
+        """
+        key = self._version_key(quiz_id)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex)
+            version = cache.get(key)
+        return version
+
+    def question_ids(self, quiz_id: int) -> tuple[int, ...]:
+        """
+        Возвращает id вопросов квиза, перечитывая их при смене версии.
+
+        :param quiz_id: Идентификатор квиза
+        :return: Кортеж id вопросов
+        """
+        shared = is_shared_cache()
+        version = self._version(quiz_id) if shared else None
+        now = time.monotonic()
+        with self._lock:
+            cached = self._ids.get(quiz_id)
+            if (cached is not None and cached[0] == version
+                    and cached[2] > now):
+                self._ids.move_to_end(quiz_id)
+                return cached[1]
+        pool_key = f'{self._version_key(quiz_id)}:{version}'
+        ids = cache.get(pool_key) if shared else None
+        if ids is None:
+            ids = tuple(
+                Question.objects.filter(quiz_id=quiz_id)
+                .order_by('id').values_list('id', flat=True)
+            )
+            if shared:
+                cache.set(pool_key, ids)
+        ttl = getattr(settings, 'QUIZ_SAMPLER_TTL', SAMPLER_TTL)
+        size = getattr(settings, 'QUIZ_SAMPLER_CACHE_SIZE', SAMPLER_CACHE_SIZE)
+        with self._lock:
+            self._ids[quiz_id] = (version, ids, now + ttl)
+            self._ids.move_to_end(quiz_id)
+            while len(self._ids) > size:
+                self._ids.popitem(last=False)
+        return ids
+
+    def invalidate(self, *quiz_ids: int) -> None:
+        """
+        Сбрасывает списки вопросов квизов после записи.
+
+        :param quiz_ids: Идентификаторы квизов
+        """
+        shared = is_shared_cache()
+        for quiz_id in quiz_ids:
+            if shared:
+                cache.set(self._version_key(quiz_id), uuid.uuid4().hex)
+            with self._lock:
+                self._ids.pop(quiz_id, None)
+
+    def clear(self) -> None:
+        """Сбрасывает все списки id в процессе"""
+        with self._lock:
+            self._ids.clear()
+
+    def pick(self, quiz_id: int) -> Question:
+        """
+        Возвращает случайный вопрос квиза.
+
+        :param quiz_id: Идентификатор квиза
+        :return: Случайный вопрос
+        :raises Question.DoesNotExist: Если в квизе нет вопросов
+        """
+        for _ in range(2):
+            ids = self.question_ids(quiz_id)
+            if not ids:
+                break
+            question = Question.objects.filter(
+                id=random.choice(ids), quiz_id=quiz_id).first()
+            if question is not None:
+                return question
+            # вопрос удалили или перенесли мимо сервиса - список устарел
+            self.invalidate(quiz_id)
+        raise Question.DoesNotExist('Квиз пуст или не существует')
+
+
+sampler = QuestionSampler()
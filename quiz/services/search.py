@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+
+from django.db import connection
+from django.db.models import FloatField, Func, Q, QuerySet, TextField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.db.models.lookups import Contains
+
+from quiz.models import Question
+from quiz.services.utils import Cursor, Page, keyset_page
+from quiz.sqlite import SQLITE_CASEFOLD
+
+SEARCH_FIELDS = ('text', 'description', 'explanation')
+FTS_TABLE = 'quiz_question_fts'
+QUIZ_FTS_TABLE = 'quiz_quiz_fts'
+SEARCH_CONFIG = 'russian'
+# триграммный токенизатор FTS5 не находит строки короче трех символов
+MIN_FTS_QUERY_LEN = 3
+TITLE_SEARCH_SUBSTRING = 'substring'
+TITLE_SEARCH_PREFIX = 'prefix'
+TITLE_SEARCH_MODES = (TITLE_SEARCH_SUBSTRING, TITLE_SEARCH_PREFIX)
+# верхняя граница диапазона для поиска по префиксу в SQLite, где строки
+# сравниваются по кодам символов
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+
+def fts_phrase(text: str) -> str:
+    """
+    Экранирует строку поиска как фразу FTS5.
+
+    :param text: Строка поиска
+    :return: Выражение для MATCH
+    """
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+class QuestionSearchBackend(ABC):
+    """Полнотекстовый поиск вопросов с ранжированием"""
+
+    @abstractmethod
+    def search(self, text: str, cursor: Cursor | None,
+               limit: int | None) -> Page:
+        """
+        Ищет вопросы по тексту, описанию и объяснению.
+
+        :param text: Строка поиска
+        :param cursor: Позиция начала страницы
+        :param limit: Размер страницы, None - все результаты
+        :return: Страница вопросов, самые релевантные первыми
+        """
+
+
+class Casefold(Func):
+    """Строка без регистра: в SQLite через quiz_casefold, иначе LOWER"""
+
+    function = 'LOWER'
+    output_field = TextField()
+
+    def as_sqlite(self, compiler: object, connection: object,
+                  **extra_context) -> tuple[str, list]:
+        """
+        Строит SQL для SQLite, где LOWER меняет регистр только у ASCII.
+
+        :param compiler: Компилятор запроса
+        :param connection: Соединение
+        :return: SQL и параметры
+        """
+        return self.as_sql(compiler, connection, function=SQLITE_CASEFOLD,
+                           **extra_context)
+
+
+class FallbackQuestionSearch(QuestionSearchBackend):
+    """Поиск подстрокой без индекса для коротких запросов"""
+
+    def search(self, text: str, cursor: Cursor | None,
+               limit: int | None) -> Page:
+        """
+        Ищет вопросы, содержащие строку в одном из полей.
+
+        Регистр не учитывается в любом алфавите.
+
+        :param text: Строка поиска
+        :param cursor: Позиция начала страницы
+        :param limit: Размер страницы, None - все результаты
+        :return: Страница вопросов в порядке id
+        """
+        queryset = Question.objects.filter(substring_condition(text))
+        if limit is None:
+            return Page(list(queryset.order_by('id')), None, None)
+        return keyset_page(queryset, ('id',), cursor, limit)
+
+
+class SqliteQuestionSearch(QuestionSearchBackend):
+    """Поиск по триграммному индексу FTS5"""
+
+    def search(self, text: str, cursor: Cursor | None,
+               limit: int | None) -> Page:
+        """
+        Ищет вопросы через FTS5 и сортирует их по bm25.
+
+        :param text: Строка поиска
+        :param cursor: Позиция (rank, id) начала страницы
+        :param limit: Размер страницы, None - все результаты
+        :return: Страница вопросов, самые релевантные первыми
+        """
+        backwards = cursor is not None and cursor.backwards
+        sql = f'SELECT rank, rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        params = [fts_phrase(text)]
+        if cursor is not None:
+            if len(cursor.position) != 2:
+                raise ValueError('Некорректный курсор')
+            lookup = '<' if backwards else '>'
+            sql += f' AND (rank {lookup} %s OR (rank = %s AND rowid {lookup} %s))'
+            rank, pk = cursor.position
+            params += [rank, rank, pk]
+        direction = 'DESC' if backwards else 'ASC'
+        sql += f' ORDER BY rank {direction}, rowid {direction}'
+        if limit is not None:
+            sql += ' LIMIT %s'
+            params.append(limit + 1)
+        with connection.cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            rows = db_cursor.fetchall()
+        has_more = limit is not None and len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+        questions = Question.objects.in_bulk([pk for _, pk in rows])
+        items = [questions[pk] for _, pk in rows if pk in questions]
+        if not rows or limit is None:
+            return Page(items, None, None)
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else cursor is not None
+        return Page(
+            items,
+            Cursor(tuple(rows[-1])) if has_next else None,
+            Cursor(tuple(rows[0]), backwards=True) if has_previous else None,
+        )
+
+
+class PostgresQuestionSearch(QuestionSearchBackend):
+    """Поиск по GIN-индексам tsvector и pg_trgm"""
+
+    def search(self, text: str, cursor: Cursor | None,
+               limit: int | None) -> Page:
+        """
+        Ищет вопросы через tsvector и сортирует их по ts_rank.
+
+        Как и триграммный FTS5 в SQLite, поиск находит и часть слова:
+        вопросы с подстрокой ищутся по триграммным индексам и идут после
+        совпадений по словам, у которых ранг выше нуля.
+
+        :param text: Строка поиска
+        :param cursor: Позиция (rank, id) начала страницы
+        :param limit: Размер страницы, None - все результаты
+        :return: Страница вопросов, самые релевантные первыми
+        """
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        vector = search_vector()
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        # отрицательный ранг: лучшие совпадения идут по возрастанию ключа
+        queryset = Question.objects.annotate(
+            search=vector,
+            rank=Cast(SearchRank(vector, query), FloatField()) * -1,
+        ).filter(Q(search=query) | substring_condition(text))
+        if limit is None:
+            return Page(list(queryset.order_by('rank', 'id')), None, None)
+        return keyset_page(queryset, ('rank', 'id'), cursor, limit)
+
+
+def substring_condition(text: str) -> Q:
+    """
+    Условие поиска подстроки без учета регистра в полях вопроса.
+
+    :param text: Строка поиска
+    :return: Условие для filter
+    """
+    needle = text.casefold()
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(Contains(Casefold(field), needle))
+    return condition
+
+
+def search_vector() -> Func:
+    """
+    Выражение tsvector, по которому строится GIN-индекс в PostgreSQL.
+
+    Должно совпадать с выражением индекса из миграции 0003, иначе
+    PostgreSQL не использует индекс.
+
+    :return: Выражение SearchVector
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector(*SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def get_search_backend(text: str) -> QuestionSearchBackend:
+    """
+    Выбирает реализацию поиска под текущую БД и длину запроса.
+
+    :param text: Строка поиска
+    :return: Реализация поиска
+    """
+    if connection.vendor == 'postgresql':
+        return PostgresQuestionSearch()
+    if connection.vendor == 'sqlite' and len(text) >= MIN_FTS_QUERY_LEN:
+        return SqliteQuestionSearch()
+    return FallbackQuestionSearch()
+
+
+def filter_by_title(queryset: QuerySet, title: str,
+                    mode: str = TITLE_SEARCH_SUBSTRING) -> QuerySet:
+    """
+    Фильтрует квизы по нормализованному названию через индекс.
+
+    Префикс ищется по B-tree индексу: в SQLite диапазоном, в PostgreSQL
+    через LIKE 'префикс%' по индексу varchar_pattern_ops, который Django
+    создает для уникального поля. Порядок строк в индексе с pattern_ops не
+    зависит от правила сортировки БД. Подстрока ищется по триграммному
+    индексу (FTS5 в SQLite, pg_trgm в PostgreSQL).
+
+    :param queryset: Выборка квизов
+    :param title: Нормализованная строка поиска
+    :param mode: Режим поиска: substring или prefix
+    :return: Отфильтрованная выборка
+    :raises ValueError: Если режим поиска неизвестен
+    """
+    if mode == TITLE_SEARCH_PREFIX:
+        if connection.vendor == 'sqlite':
+            return queryset.filter(
+                title_normalized__gte=title,
+                title_normalized__lt=title + PREFIX_UPPER_BOUND)
+        return queryset.filter(title_normalized__startswith=title)
+    if mode != TITLE_SEARCH_SUBSTRING:
+        raise ValueError(f'Режим поиска должен быть одним из: {TITLE_SEARCH_MODES}')
+    if connection.vendor == 'sqlite' and len(title) >= MIN_FTS_QUERY_LEN:
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {QUIZ_FTS_TABLE} '
+            f'WHERE {QUIZ_FTS_TABLE} MATCH %s', [fts_phrase(title)]))
+    return queryset.filter(title_normalized__contains=title)
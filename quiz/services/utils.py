@@ -1,14 +1,440 @@
-from django.db.models import Model
+import base64
+import hashlib
+import json
+from contextlib import AbstractContextManager, nullcontext
+from datetime import datetime
+from typing import NamedTuple
 
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.db.models import Field, Model, Q, QuerySet
+from django.db.models.sql import DeleteQuery, UpdateQuery
+from django.utils import timezone
 
-def update_model(model: Model, pk: int, data: dict) -> Model:
+from quiz.utils import normalize_title
+
+# поля строк, по которым строится версия страницы
+PAGE_VERSION_FIELDS = ('id', 'updated_at')
+
+
+class Cursor(NamedTuple):
+    """Позиция в выборке для keyset-пагинации"""
+
+    position: tuple
+    backwards: bool = False
+
+    def encode(self) -> str:
+        """
+        Кодирует курсор в непрозрачную строку для клиента.
+
+        :return: Строка курсора
+        """
+        raw = json.dumps([list(self.position), self.backwards],
+                         ensure_ascii=False, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, token: str) -> 'Cursor':
+        """
+        Восстанавливает курсор из строки клиента.
+
+        :param token: Строка курсора
+        :return: Курсор
+        :raises ValueError: Если строка не является курсором
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            position, backwards = json.loads(raw)
+        except (TypeError, ValueError) as error:
+            raise ValueError('Некорректный курсор') from error
+        if (not isinstance(position, list)
+                or not isinstance(backwards, bool)
+                or not all(isinstance(value, (str, int, float)) for value in position)):
+            raise ValueError('Некорректный курсор')
+        return cls(tuple(position), backwards)
+
+
+class Version(NamedTuple):
+    """Версия объекта или выборки для условных GET-запросов"""
+
+    etag: str
+    last_modified: datetime | None
+
+
+class Page(NamedTuple):
+    """Страница выборки с курсорами соседних страниц"""
+
+    items: list
+    next: Cursor | None
+    previous: Cursor | None
+    # версия страницы для условных GET-запросов или None
+    version: Version | None = None
+
+
+def item_position(item: Model | dict, keys: tuple[str, ...]) -> tuple:
+    """
+    Значения ключа сортировки у объекта модели или словаря из .values().
+
+    :param item: Объект или словарь
+    :param keys: Поля ключа
+    :return: Позиция в выборке
+    """
+    if isinstance(item, dict):
+        return tuple(item[key] for key in keys)
+    return tuple(getattr(item, key) for key in keys)
+
+
+def drop_fields(items: list[dict], fields: list[str]) -> None:
+    """
+    Удаляет из словарей служебные поля.
+
+    :param items: Словари из .values()
+    :param fields: Поля для удаления
+    """
+    if not fields:
+        return
+    for item in items:
+        for field in fields:
+            del item[field]
+
+
+def keyset_condition(keys: tuple[str, ...], position: tuple,
+                     backwards: bool) -> Q:
+    """
+    Условие для строк после позиции курсора в порядке ключа.
+
+    :param keys: Поля ключа, убывающие с префиксом -
+    :param position: Значения ключа в позиции курсора
+    :param backwards: Нужны строки до позиции, а не после
+    :return: Условие для filter
+    """
+    names = [key.lstrip('-') for key in keys]
+    condition = Q()
+    for index, key in enumerate(keys):
+        lookup = 'lt' if backwards != key.startswith('-') else 'gt'
+        equal = dict(zip(names[:index], position[:index], strict=True))
+        condition |= Q(**equal, **{f'{names[index]}__{lookup}': position[index]})
+    return condition
+
+
+def keyset_page(queryset: QuerySet, keys: tuple[str, ...],
+                cursor: Cursor | None, limit: int,
+                values: tuple[str, ...] | None = None,
+                versioned: bool = False) -> Page:
     """
-    Docstring для update_model
+    Возвращает страницу выборки по индексируемому ключу без OFFSET.
+
+    :param queryset: Исходная выборка
+    :param keys: Поля ключа сортировки, последним должен идти id; поле
+        с префиксом - сортируется по убыванию
+    :param cursor: Позиция, с которой начинается страница
+    :param limit: Размер страницы
+    :param values: Поля для словарей из .values() вместо объектов модели
+    :param versioned: Построить версию страницы по id и updated_at строк
+    :return: Страница с курсорами
+    :raises ValueError: Если курсор не подходит к ключу
+    """
+    names = tuple(key.lstrip('-') for key in keys)
+    backwards = cursor is not None and cursor.backwards
+    if cursor is not None:
+        if len(cursor.position) != len(keys):
+            raise ValueError('Некорректный курсор')
+        queryset = queryset.filter(
+            keyset_condition(keys, cursor.position, backwards))
+    ordering = [f'-{name}' if backwards != key.startswith('-') else name
+                for key, name in zip(keys, names, strict=True)]
+    queryset = queryset.order_by(*ordering)
+    extra = (*names, *(PAGE_VERSION_FIELDS if versioned else ()))
+    if values is not None:
+        queryset = queryset.values(*dict.fromkeys((*values, *extra)))
+    items = list(queryset[:limit + 1])
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backwards:
+        items.reverse()
+    page = Page(items, None, None)
+    if items:
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else cursor is not None
+        page = Page(
+            items,
+            Cursor(item_position(items[-1], names)) if has_next else None,
+            Cursor(item_position(items[0], names), backwards=True)
+            if has_previous else None,
+        )
+    if versioned:
+        page = page._replace(version=page_version(queryset.model, page))
+    if values is not None:
+        # поля ключа и версии, которые не просили, нужны только для
+        # курсоров и ETag
+        drop_fields(items, [name for name in dict.fromkeys(extra)
+                            if name not in values])
+    return page
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Строит сильный ETag из частей версии.
+
+    :param parts: Значения, от которых зависит представление
+    :return: ETag в кавычках
+    """
+    raw = ':'.join(str(part) for part in parts)
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def only_fields(queryset: QuerySet,
+                fields: tuple[str, ...] | None) -> QuerySet:
+    """
+    Загружает из БД только нужные поля объектов.
+
+    Первичный ключ и updated_at загружаются всегда: по ним строится версия
+    объекта.
+
+    :param queryset: Выборка
+    :param fields: Поля модели или None для всех полей
+    :return: Выборка
+    """
+    if fields is None:
+        return queryset
+    return queryset.only(*fields, 'updated_at')
+
+
+def object_version(obj: Model) -> Version:
+    """
+    Версия объекта по времени его изменения.
+
+    :param obj: Объект модели с полем updated_at
+    :return: Версия объекта
+    """
+    return Version(make_etag(obj._meta.label, obj.pk, obj.updated_at.isoformat()),
+                   obj.updated_at)
+
+
+def page_version(model: type[Model], page: Page) -> Version:
+    """
+    Версия страницы по строкам, которые в нее попали.
+
+    Страница читается тем же запросом по индексу, что и для ответа, а не
+    агрегатом по всей выборке. Изменение строки меняет ее updated_at,
+    удаление или вставка меняют набор id или курсоры соседних страниц.
+    Last-Modified у страницы нет: удаление строки не меняет время
+    изменения оставшихся, и ответ на If-Modified-Since был бы устаревшим.
+
+    :param model: Модель строк страницы
+    :param page: Страница с полями id и updated_at у строк
+    :return: Версия страницы
+    """
+    rows = [(pk, updated_at.isoformat()) for pk, updated_at
+            in (item_position(item, PAGE_VERSION_FIELDS)
+                for item in page.items)]
+    return Version(
+        make_etag(model._meta.label, rows,
+                  page.next.encode() if page.next else '',
+                  page.previous.encode() if page.previous else ''),
+        None)
+
+
+def is_shared_cache(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """
+    Проверяет, видят ли записи в кэш другие процессы.
+
+    :param alias: Алиас кэша из CACHES
+    :return: False для кэша в памяти процесса (locmem) и пустого (dummy)
+    """
+    return not isinstance(caches[alias], LocMemCache | DummyCache)
+
+
+def touch(model: type[Model], data: dict) -> dict:
+    """
+    Добавляет в данные для UPDATE время изменения.
+
+    QuerySet.update не заполняет поля с auto_now, поэтому их значение
+    передается явно.
+
+    :param model: Модель
+    :param data: Данные для обновления
+    :return: Данные с новым временем изменения
+    """
+    now = timezone.now()
+    return {**data, **{field.name: now for field in model._meta.concrete_fields
+                       if getattr(field, 'auto_now', False)}}
+
+
+def with_normalized_title(data: dict) -> dict:
+    """
+    Добавляет в данные для UPDATE нормализованное название.
+
+    :param data: Данные для обновления
+    :return: Данные с title_normalized, если меняется title
+    """
+    if 'title' not in data:
+        return data
+    return {**data, 'title_normalized': normalize_title(data['title'])}
+
+
+def constraint_guard() -> AbstractContextManager:
+    """
+    Savepoint вокруг записи, которая может нарушить ограничение БД.
+
+    Вне транзакции запрос и так атомарен и лишний BEGIN не нужен, а внутри
+    нее savepoint позволяет продолжить транзакцию после IntegrityError.
+
+    :return: Контекстный менеджер
+    """
+    if connection.in_atomic_block:
+        return transaction.atomic()
+    return nullcontext()
+
+
+def supports_returning() -> bool:
+    """
+    Умеет ли БД возвращать строки из UPDATE и DELETE.
+
+    RETURNING есть в PostgreSQL и в SQLite начиная с 3.35.
+
+    :return: True, если RETURNING поддерживается
+    """
+    return (connection.vendor in ('postgresql', 'sqlite')
+            and connection.features.can_return_columns_from_insert)
+
+
+def fetch_returning(sql: str, params: tuple | list,
+                    fields: list[Field]) -> list[tuple]:
+    """
+    Выполняет запрос с RETURNING и приводит значения к типам полей.
+
+    :param sql: UPDATE или DELETE без RETURNING
+    :param params: Параметры запроса
+    :param fields: Поля, значения которых нужно вернуть
+    :return: Строки с python-значениями полей
+    """
+    columns = ', '.join(connection.ops.quote_name(field.column)
+                        for field in fields)
+    converters = []
+    for field in fields:
+        column = field.get_col(field.model._meta.db_table)
+        converters.append((column,
+                           connection.ops.get_db_converters(column)
+                           + column.get_db_converters(connection)))
+    with connection.cursor() as cursor:
+        cursor.execute(f'{sql} RETURNING {columns}', params)
+        rows = cursor.fetchall()
+    result = []
+    for row in rows:
+        values = []
+        for value, (column, field_converters) in zip(row, converters,
+                                                     strict=True):
+            for converter in field_converters:
+                value = converter(value, column, connection)
+            values.append(value)
+        result.append(tuple(values))
+    return result
+
+
+def does_not_exist(model: type[Model]) -> Exception:
+    """
+    Ошибка отсутствия объекта в том же виде, что и у QuerySet.get.
+
+    :param model: Модель
+    :return: Исключение DoesNotExist модели
+    """
+    return model.DoesNotExist(
+        f'{model._meta.object_name} matching query does not exist.')
+
+
+def update_model(model: type[Model], pk: int, data: dict) -> Model:
+    """
+    Обновляет объект и возвращает его новое состояние.
+
+    Если БД поддерживает RETURNING, это один запрос UPDATE ... RETURNING.
 
     :param model: Модель
     :param pk: id объекта
     :param data: Данные для обновления
-    :return: Модель
+    :return: Обновленный объект
+    :raises model.DoesNotExist: Если объекта нет
+    """
+    queryset = model.objects.filter(id=pk)
+    if not data:
+        return queryset.get()
+    data = touch(model, data)
+    if not supports_returning():
+        if not queryset.update(**data):
+            raise does_not_exist(model)
+        return queryset.get()
+
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(data)
+    sql, params = query.get_compiler(connection.alias).as_sql()
+    fields = list(model._meta.concrete_fields)
+    rows = fetch_returning(sql, params, fields)
+    if not rows:
+        raise does_not_exist(model)
+    return model.from_db(connection.alias,
+                         [field.attname for field in fields], rows[0])
+
+
+def update_returning(queryset: QuerySet, data: dict,
+                     returning: tuple[str, ...] = ('id',)) -> list[tuple]:
+    """
+    Обновляет строки выборки и возвращает значения полей из них.
+
+    Если БД поддерживает RETURNING, это один запрос UPDATE ... RETURNING.
+
+    :param queryset: Выборка по одной таблице
+    :param data: Данные для обновления
+    :param returning: Поля, значения которых нужно вернуть
+    :return: Значения returning для обновленных строк
+    """
+    if not supports_returning():
+        with transaction.atomic():
+            rows = list(queryset.values_list(*returning))
+            queryset.update(**data)
+        return rows
+    query = queryset.query.chain(UpdateQuery)
+    query.add_update_values(data)
+    sql, params = query.get_compiler(connection.alias).as_sql()
+    meta = queryset.model._meta
+    return fetch_returning(sql, params,
+                           [meta.get_field(name) for name in returning])
+
+
+def delete_returning(queryset: QuerySet,
+                     returning: tuple[str, ...] = ('id',)) -> list[tuple]:
+    """
+    Удаляет строки выборки без загрузки объектов.
+
+    Удаление не учитывает каскады Django: связанные строки нужно удалить
+    до вызова. Если БД поддерживает RETURNING, это один запрос
+    DELETE ... RETURNING.
+
+    :param queryset: Выборка по одной таблице
+    :param returning: Поля, значения которых нужно вернуть
+    :return: Значения returning для удаленных строк
+    """
+    if not supports_returning():
+        rows = list(queryset.values_list(*returning))
+        queryset._raw_delete(connection.alias)
+        return rows
+    query = queryset.query.chain(DeleteQuery)
+    sql, params = query.get_compiler(connection.alias).as_sql()
+    meta = queryset.model._meta
+    return fetch_returning(sql, params,
+                           [meta.get_field(name) for name in returning])
+
+
+def delete_rows(model: type[Model], field: str, value: object,
+                returning: tuple[str, ...] = ('id',)) -> list[tuple]:
+    """
+    Удаляет строки, у которых field равно value.
+
+    :param model: Модель
+    :param field: Поле для условия
+    :param value: Значение поля
+    :param returning: Поля, значения которых нужно вернуть
+    :return: Значения returning для удаленных строк
     """
-    model.objects.filter(id=pk).update(**data)
-    return model.objects.get(id=pk)
+    return delete_returning(model.objects.filter(**{field: value}), returning)
@@ -0,0 +1,87 @@
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, connections
+
+
+class WriteQueue:
+    """
+    Очередь записей в SQLite из одного потока.
+
+    SQLite пропускает одного писателя за раз, и при большом числе потоков
+    записи ждут друг друга на блокировке БД. С настройкой
+    QUIZ_SQLITE_WRITE_QUEUE записи сервисов выполняются по очереди в
+    отдельном потоке с одним соединением, а потоки запросов ждут результат.
+    Чтение идет в потоках запросов как обычно и в режиме WAL не ждет
+    записи. Запись внутри открытой транзакции выполняется на месте: она
+    должна попасть в эту транзакцию.
+    """
+
+    def __init__(self) -> None:
+        """Создает очередь без потока, поток запускается при первой записи"""
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _mark_writer(self) -> None:
+        """Помечает поток записи, чтобы вложенные записи шли на месте"""
+        self._local.writer = True
+
+    def enabled(self) -> bool:
+        """
+        Проверяет, нужно ли отправлять запись в очередь.
+
+        :return: True, если очередь включена и запись можно выполнить в
+            потоке записи
+        """
+        return (getattr(settings, 'QUIZ_SQLITE_WRITE_QUEUE', False)
+                and connection.vendor == 'sqlite'
+                and not connection.in_atomic_block
+                and not getattr(self._local, 'writer', False))
+
+    def run(self, func: Callable, *args, **kwargs) -> object:
+        """
+        Выполняет запись в потоке записи и ждет результат.
+
+        :param func: Функция записи
+        :return: Результат функции
+        :raises Exception: Исключение функции
+        """
+        if not self.enabled():
+            return func(*args, **kwargs)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='quiz-sqlite-writer',
+                    initializer=self._mark_writer)
+            executor = self._executor
+        return executor.submit(func, *args, **kwargs).result()
+
+    def close(self) -> None:
+        """Закрывает соединение потока записи и останавливает поток"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.submit(connections.close_all).result()
+            executor.shutdown()
+
+
+write_queue = WriteQueue()
+
+
+def serialized_write(method: Callable) -> Callable:
+    """
+    Декоратор метода сервиса, который пишет в БД через write_queue.
+
+    :param method: Метод записи
+    :return: Метод, который выполняется в потоке записи
+    """
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs) -> object:
+        return write_queue.run(method, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from quiz.utils import SQLITE_PRAGMAS
+
+# имя функции SQLite для Casefold из quiz.services.search
+SQLITE_CASEFOLD = 'quiz_casefold'
+
+
+def casefold(value: str | None) -> str | None:
+    """
+    Приводит строку к виду без регистра для любого алфавита.
+
+    :param value: Строка из БД
+    :return: Строка без регистра или None
+    """
+    return value.casefold() if value is not None else None
+
+
+def apply_pragmas(sender: type, connection: BaseDatabaseWrapper,
+                  **kwargs) -> None:
+    """
+    Настраивает новое соединение SQLite PRAGMA из QUIZ_SQLITE_PRAGMAS.
+
+    WAL позволяет читать во время записи, synchronous=NORMAL в режиме WAL
+    не теряет целостность БД и синхронизирует диск только при контрольной
+    точке, busy_timeout заставляет запись ждать блокировку, а не сразу
+    падать с database is locked. Журнал WAL сохраняется в файле БД, в
+    памяти SQLite оставляет режим memory.
+
+    :param sender: Класс соединения
+    :param connection: Соединение
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'QUIZ_SQLITE_PRAGMAS', SQLITE_PRAGMAS)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def register_functions(sender: type, connection: BaseDatabaseWrapper,
+                       **kwargs) -> None:
+    """
+    Регистрирует в новом соединении SQLite функции Python.
+
+    LOWER и LIKE в SQLite меняют регистр только у ASCII, поэтому поиск без
+    регистра по кириллице идет через quiz_casefold.
+
+    :param sender: Класс соединения
+    :param connection: Соединение
+    """
+    if connection.vendor != 'sqlite':
+        return
+    connection.connection.create_function(SQLITE_CASEFOLD, 1, casefold,
+                                          deterministic=True)
@@ -1,9 +1,13 @@
 from django.urls import path
 
 from quiz.views.category import CategoryDetailAPIView, CategoryListAPIView
-from quiz.views.question import (QuestionByTextAPIView,
+from quiz.views.question import (QuestionBulkAPIView,
+                                 QuestionByTextAPIView,
                                  QuestionCheckAnswerAPIView,
-                                 QuestionDetailAPIView, QuestionListAPIView)
+                                 QuestionCheckAnswersAPIView,
+                                 QuestionDetailAPIView,
+                                 QuestionExportAPIView, QuestionListAPIView,
+                                 QuizQuestionListAPIView)
 from quiz.views.quiz import (QuizByTitleAPIView, QuizDetailAPIView,
                              QuizListAPIView, QuizRandomQuestionAPIView)
 
@@ -26,6 +30,15 @@ urlpatterns = [
     path('questions/<int:id>/check/',
          QuestionCheckAnswerAPIView.as_view(),
          name='question-check-answer'),
+    path('questions/check/',
+         QuestionCheckAnswersAPIView.as_view(),
+         name='question-check-answers'),
+    path('questions/bulk/',
+         QuestionBulkAPIView.as_view(),
+         name='question-bulk'),
+    path('questions/export/',
+         QuestionExportAPIView.as_view(),
+         name='question-export'),
     path('quizzes/', QuizListAPIView.as_view(), name='quiz-list'),
     path('quizzes/<int:pk>/', QuizDetailAPIView.as_view(), name='quiz-detail'),
 
@@ -34,6 +47,9 @@ urlpatterns = [
          QuizByTitleAPIView.as_view(),
          name='quiz-by-title'),
 
+    path('quizzes/<int:pk>/questions/',
+         QuizQuestionListAPIView.as_view(),
+         name='quiz-questions'),
     path('quizzes/<int:id>/random_question/',
          QuizRandomQuestionAPIView.as_view(),
          name='quiz-random-question'),
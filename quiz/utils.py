@@ -1,5 +1,38 @@
+import unicodedata
+
 TITLE_CAT_LEN = 100
 TITLE_QUIZ_LEN = 200
 TEXT_LEN = 500
 EXP_LEN = 250
 MAX_LEN = 30
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+ANSWER_CACHE_SIZE = 10000
+ANSWER_CACHE_TTL = 5
+SAMPLER_CACHE_SIZE = 1000
+SAMPLER_TTL = 5
+MAX_BATCH_SIZE = 1000
+MAX_BULK_SIZE = 10000
+HASH_LEN = 32
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_ENCODINGS = ('zstd', 'br', 'gzip')
+# busy_timeout ставится первым, чтобы смена журнала ждала блокировку
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 2 ** 20,
+    'cache_size': -64 * 2 ** 10,
+}
+
+
+def normalize_title(title: str) -> str:
+    """
+    Приводит название к виду для поиска и сравнения.
+
+    :param title: Название
+    :return: Название в NFKC, без регистра, с одиночными пробелами и е вместо ё
+    """
+    title = unicodedata.normalize('NFKC', title).casefold().replace(
+        'ё', '\N{CYRILLIC SMALL LETTER IE}')
+    return ' '.join(title.split())
@@ -1,3 +1,6 @@
+from collections.abc import Callable
+
+from django.db import IntegrityError
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.request import Request
@@ -7,6 +10,11 @@ from rest_framework.views import APIView
 from quiz.models import Category
 from quiz.serializers import CategorySerializer
 from quiz.services.category import CategoryService
+from quiz.services.utils import Version, object_version
+from quiz.views.utils import (FIELDS_PARAMETERS, PAGE_PARAMETERS,
+                              cached_response, fields_params, page_fields,
+                              page_params, paginated_response, represent,
+                              unique_title_response)
 
 
 class CategoryListAPIView(APIView):
@@ -24,6 +32,7 @@ class CategoryListAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить список всех категорий',
+        manual_parameters=[*PAGE_PARAMETERS, *FIELDS_PARAMETERS],
         responses={
             200: CategorySerializer(many=True),
             400: 'Bad Request'
@@ -38,9 +47,28 @@ class CategoryListAPIView(APIView):
         :return: Ответ
         :rtype: Response
         """
-        categories = self.service.list_categories()
-        serializer = self.serializer_class(categories, many=True)
-        return Response(serializer.data)
+        try:
+            cursor, limit = page_params(request)
+            selected = fields_params(request, self.serializer_class)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fields = page_fields(self.serializer_class, selected)
+
+        def load() -> tuple[Version, Callable[[], Response]]:
+            page = self.service.list_categories_page(
+                cursor=cursor, limit=limit, values=fields)
+            return page.version, lambda: paginated_response(
+                request, page,
+                represent(self.serializer_class, page.items, fields,
+                          selected))
+
+        try:
+            return cached_response(request, 'category', load)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_auto_schema(
         operation_description='Создать новую категорию',
@@ -61,8 +89,11 @@ class CategoryListAPIView(APIView):
         """
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            data = self.service.create_category(
-                serializer.validated_data['title'])
+            try:
+                data = self.service.create_category(
+                    serializer.validated_data['title'])
+            except IntegrityError:
+                return unique_title_response(self.serializer_class)
             res = self.serializer_class(data)
             return Response(res.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -84,6 +115,7 @@ class CategoryDetailAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить категорию',
+        manual_parameters=FIELDS_PARAMETERS,
         responses={
             200: CategorySerializer,
             404: 'Not found'
@@ -101,9 +133,19 @@ class CategoryDetailAPIView(APIView):
         :rtype: Response
         """
         try:
-            categories = self.service.get_category(category_id=pk)
-            serializer = self.serializer_class(categories)
-            return Response(serializer.data)
+            fields = fields_params(request, self.serializer_class)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def load() -> tuple[Version, Callable[[], Response]]:
+            categories = self.service.get_category(category_id=pk,
+                                                   fields=fields)
+            return object_version(categories), lambda: Response(
+                self.serializer_class(categories, fields=fields).data)
+
+        try:
+            return cached_response(request, f'category:{pk}', load)
         except Category.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -138,6 +180,8 @@ class CategoryDetailAPIView(APIView):
                             status=status.HTTP_400_BAD_REQUEST)
         except Category.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        except IntegrityError:
+            return unique_title_response(self.serializer_class)
 
     @swagger_auto_schema(
         operation_description='Удалить категорию',
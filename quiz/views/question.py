@@ -1,17 +1,71 @@
+from collections.abc import Callable
+
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import status
+from rest_framework import serializers, status
+from rest_framework.parsers import BaseParser, JSONParser
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from quiz.models import Question
-from quiz.serializers import QuestionSerializer
-from quiz.services.question import QuestionService
+from quiz.models import Category, Difficulty, Question, Quiz
+from quiz.parsers import NDJSONParser
+from quiz.serializers import (AnswerSheetSerializer, QuestionBulkSerializer,
+                              QuestionBulkUpdateSerializer,
+                              QuestionSelectionSerializer, QuestionSerializer)
+from quiz.services.export import iter_json_array, iter_ndjson
+from quiz.services.question import (QUESTION_ORDERINGS, QuestionService,
+                                    ordering_keys)
+from quiz.services.quiz import QuizService
+from quiz.services.utils import Version, object_version
+from quiz.utils import MAX_BULK_SIZE
+from quiz.views.utils import (FIELDS_PARAMETERS, PAGE_PARAMETERS,
+                              cached_response, fields_params, int_param,
+                              page_fields, page_params, paginated_response,
+                              represent)
+
+EXPORT_OUTPUTS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson; charset=utf-8'),
+    'json': (iter_json_array, 'application/json; charset=utf-8'),
+}
+FILTER_PARAMETERS = [
+    openapi.Parameter('quiz', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description='Идентификатор квиза'),
+    openapi.Parameter('category', openapi.IN_QUERY,
+                      type=openapi.TYPE_INTEGER,
+                      description='Идентификатор категории'),
+    openapi.Parameter('difficulty', openapi.IN_QUERY,
+                      type=openapi.TYPE_STRING,
+                      enum=list(Difficulty.values),
+                      description='Сложность'),
+]
+
+ORDERING_PARAMETER = openapi.Parameter(
+    'ordering', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    enum=list(QUESTION_ORDERINGS), default='id',
+    description='Порядок вопросов по id')
 
 
-class QuestionListAPIView(APIView):
+def question_filters(request: Request) -> dict:
     """
-    Docstring для QuestionListAPIView
+    Достает фильтры вопросов из параметров запроса.
+
+    :param request: Запрос
+    :return: Аргументы quiz_id, category_id и difficulty для сервиса
+    :raises ValueError: Если квиз или категория не являются числом
+    """
+    return {
+        'quiz_id': int_param(request, 'quiz'),
+        'category_id': int_param(request, 'category'),
+        'difficulty': request.query_params.get('difficulty'),
+    }
+
+
+class QuestionPageAPIView(APIView):
+    """
+    Общая часть списков вопросов с фильтрами, порядком и пагинацией
     """
 
     def __init__(self) -> None:
@@ -20,10 +74,61 @@ class QuestionListAPIView(APIView):
         """
         super().__init__()
         self.service = QuestionService()
+        self.quiz_service = QuizService()
         self.serializer_class = QuestionSerializer
 
+    def page_response(self, request: Request,
+                      quiz_id: int | None = None) -> Response:
+        """
+        Отдает страницу вопросов, отобранных по параметрам запроса.
+
+        :param request: Запрос
+        :param quiz_id: Квиз из пути; если его нет, ответ 404
+        :return: Ответ
+        """
+        try:
+            cursor, limit = page_params(request)
+            selected = fields_params(request, self.serializer_class)
+            filters = question_filters(request)
+            ordering = request.query_params.get('ordering', 'id')
+            # неизвестный порядок - ошибка 400 раньше проверки квиза на 404
+            ordering_keys(ordering)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if quiz_id is not None:
+            filters['quiz_id'] = quiz_id
+        fields = page_fields(self.serializer_class, selected)
+
+        def load() -> tuple[Version, Callable[[], Response]]:
+            if quiz_id is not None:
+                self.quiz_service.get_quiz(quiz_id=quiz_id, fields=('id',))
+            page = self.service.list_questions_page(
+                cursor=cursor, limit=limit, values=fields,
+                ordering=ordering, **filters)
+            return page.version, lambda: paginated_response(
+                request, page,
+                represent(self.serializer_class, page.items, fields,
+                          selected))
+
+        try:
+            return cached_response(request, 'question', load)
+        except Quiz.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+
+class QuestionListAPIView(QuestionPageAPIView):
+    """
+    Docstring для QuestionListAPIView
+    """
+
     @swagger_auto_schema(
-        operation_description='Получить список всех вопросов',
+        operation_description='Получить список вопросов',
+        manual_parameters=[*PAGE_PARAMETERS, *FIELDS_PARAMETERS,
+                           *FILTER_PARAMETERS, ORDERING_PARAMETER],
         responses={
             200: QuestionSerializer(many=True),
             400: 'Bad Request'
@@ -38,9 +143,7 @@ class QuestionListAPIView(APIView):
         :return: Ответ
         :rtype: Response
         """
-        questions = self.service.list_questions()
-        serializer = self.serializer_class(questions, many=True)
-        return Response(serializer.data)
+        return self.page_response(request)
 
     @swagger_auto_schema(
         operation_description='Создать новый вопрос',
@@ -70,6 +173,35 @@ class QuestionListAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class QuizQuestionListAPIView(QuestionPageAPIView):
+    """
+    Вопросы квиза
+    """
+
+    @swagger_auto_schema(
+        operation_description='Получить вопросы квиза',
+        manual_parameters=[*PAGE_PARAMETERS, *FIELDS_PARAMETERS,
+                           *FILTER_PARAMETERS[1:], ORDERING_PARAMETER],
+        responses={
+            200: QuestionSerializer(many=True),
+            400: 'Bad Request',
+            404: 'Not found'
+        }
+    )
+    def get(self, request: Request, pk: int) -> Response:
+        """
+        Вопросы квиза с фильтрами по категории и сложности
+
+        :param request: Запрос
+        :type request: Request
+        :param pk: Id квиза
+        :type pk: int
+        :return: Ответ
+        :rtype: Response
+        """
+        return self.page_response(request, quiz_id=pk)
+
+
 class QuestionDetailAPIView(APIView):
     """
     Docstring для QuestionDetailAPIView
@@ -86,6 +218,7 @@ class QuestionDetailAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить вопрос',
+        manual_parameters=FIELDS_PARAMETERS,
         responses={
             200: QuestionSerializer,
             404: 'Not found'
@@ -103,9 +236,18 @@ class QuestionDetailAPIView(APIView):
         :rtype: Response
         """
         try:
-            question = self.service.get_question(question_id=pk)
-            serializer = self.serializer_class(question)
-            return Response(serializer.data)
+            fields = fields_params(request, self.serializer_class)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def load() -> tuple[Version, Callable[[], Response]]:
+            question = self.service.get_question(question_id=pk, fields=fields)
+            return object_version(question), lambda: Response(
+                self.serializer_class(question, fields=fields).data)
+
+        try:
+            return cached_response(request, f'question:{pk}', load)
         except Question.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -183,6 +325,7 @@ class QuestionByTextAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить вопрос по тексту',
+        manual_parameters=PAGE_PARAMETERS,
         responses={
             200: QuestionSerializer(many=True),
             400: 'Bad Request'
@@ -199,9 +342,18 @@ class QuestionByTextAPIView(APIView):
         :return: Ответ
         :rtype: Response
         """
-        question = self.service.get_questions_by_text(text)
-        serializer = self.serializer_class(question, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build() -> Response:
+            try:
+                cursor, limit = page_params(request)
+                page = self.service.get_questions_by_text_page(
+                    text, cursor=cursor, limit=limit)
+            except ValueError as error:
+                return Response({'detail': str(error)},
+                                status=status.HTTP_400_BAD_REQUEST)
+            serializer = self.serializer_class(page.items, many=True)
+            return paginated_response(request, page, serializer.data)
+
+        return cached_response(request, 'question', lambda: (None, build))
 
 
 class QuestionCheckAnswerAPIView(APIView):
@@ -239,3 +391,253 @@ class QuestionCheckAnswerAPIView(APIView):
                             status=status.HTTP_200_OK)
         except Question.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+
+
+class QuestionCheckAnswersAPIView(APIView):
+    """
+    Пакетная проверка ответов
+    """
+
+    def __init__(self) -> None:
+        """
+        Docstring для __init__
+
+        """
+        super().__init__()
+        self.service = QuestionService()
+        self.serializer_class = AnswerSheetSerializer
+
+    @swagger_auto_schema(
+        operation_description='Проверка нескольких ответов',
+        request_body=AnswerSheetSerializer,
+        responses={
+            200: 'Результаты и количество правильных ответов',
+            400: 'Bad Request'
+        }
+    )
+    def post(self, request: Request) -> Response:
+        """
+        Проверка нескольких ответов одним запросом
+
+        :param request: Запрос
+        :type request: Request
+        :return: Ответ
+        :rtype: Response
+        """
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+        answers = [(item['question_id'], item['answer'])
+                   for item in serializer.validated_data['answers']]
+        checked = self.service.check_answers(answers)
+        results = [{'question_id': question_id, 'answer': is_correct}
+                   for (question_id, _), is_correct in zip(answers, checked,
+                                                           strict=True)]
+        return Response({'results': results,
+                         'score': checked.count(True),
+                         'total': len(checked)},
+                        status=status.HTTP_200_OK)
+
+
+class QuestionBulkAPIView(APIView):
+    """
+    Массовые создание, обновление и удаление вопросов
+    """
+
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def get_parsers(self) -> list[BaseParser]:
+        """
+        Парсеры JSON из настроек DRF, например ORJSONParser, и NDJSON.
+
+        :return: Парсеры тела запроса
+        """
+        json_parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES
+                        if issubclass(parser, JSONParser)]
+        return [*(json_parsers or [JSONParser()]), NDJSONParser()]
+
+    def __init__(self) -> None:
+        """
+        Docstring для __init__
+
+        """
+        super().__init__()
+        self.service = QuestionService()
+        self.serializer_class = QuestionBulkSerializer
+
+    @swagger_auto_schema(
+        operation_description=('Создать несколько вопросов: JSON-массив или '
+                               'NDJSON (application/x-ndjson)'),
+        request_body=QuestionBulkSerializer(many=True),
+        responses={
+            201: 'Созданные вопросы и ошибки по элементам',
+            400: 'Bad Request'
+        }
+    )
+    def post(self, request: Request) -> Response:
+        """
+        Создание вопросов одной транзакцией
+
+        Некорректные элементы не создаются, ошибки возвращаются с номером
+        элемента в запросе.
+
+        :param request: Запрос
+        :type request: Request
+        :return: Ответ
+        :rtype: Response
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Требуется непустой список вопросов'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BULK_SIZE:
+            return Response(
+                {'detail': f'Максимум {MAX_BULK_SIZE} вопросов за запрос'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        # один сериализатор на все элементы, как в ListSerializer
+        child = self.serializer_class()
+        valid, indexes, errors = [], [], []
+        for index, item in enumerate(items):
+            try:
+                valid.append(child.run_validation(item))
+            except serializers.ValidationError as error:
+                errors.append({'index': index,
+                               'errors': serializers.as_serializer_error(error)})
+            else:
+                indexes.append(index)
+
+        created, missing = self.service.create_questions(valid)
+        message = str(serializers.PrimaryKeyRelatedField.default_error_messages[
+            'does_not_exist'])
+        for position, fields in missing.items():
+            errors.append({
+                'index': indexes[position],
+                'errors': {field: [message.format(
+                    pk_value=valid[position][field])] for field in fields},
+            })
+        errors.sort(key=lambda error: error['index'])
+        created_indexes = [index for position, index in enumerate(indexes)
+                           if position not in missing]
+        body = {
+            'created': [{'index': index, 'id': question.id}
+                        for index, question in zip(created_indexes, created,
+                                                   strict=True)],
+            'errors': errors,
+        }
+        return Response(body, status=status.HTTP_201_CREATED if created
+                        else status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        operation_description=('Изменить поля вопросов, отобранных по ids '
+                               'и фильтрам quiz, category, difficulty'),
+        request_body=QuestionBulkUpdateSerializer,
+        responses={
+            200: 'Количество обновленных вопросов',
+            400: 'Bad Request'
+        }
+    )
+    def patch(self, request: Request) -> Response:
+        """
+        Обновление вопросов одним UPDATE
+
+        :param request: Запрос
+        :type request: Request
+        :return: Ответ
+        :rtype: Response
+        """
+        serializer = QuestionBulkUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        try:
+            updated = self.service.update_questions(
+                data['set'], ids=data.get('ids'), quiz_id=data.get('quiz'),
+                category_id=data.get('category'),
+                difficulty=data.get('difficulty'))
+        except (Quiz.DoesNotExist, Category.DoesNotExist) as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated})
+
+    @swagger_auto_schema(
+        operation_description=('Удалить вопросы, отобранные по ids '
+                               'и фильтрам quiz, category, difficulty'),
+        request_body=QuestionSelectionSerializer,
+        responses={
+            200: 'Количество удаленных вопросов',
+            400: 'Bad Request'
+        }
+    )
+    def delete(self, request: Request) -> Response:
+        """
+        Удаление вопросов одним DELETE
+
+        :param request: Запрос
+        :type request: Request
+        :return: Ответ
+        :rtype: Response
+        """
+        serializer = QuestionSelectionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors,
+                            status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        deleted = self.service.delete_questions(
+            ids=data.get('ids'), quiz_id=data.get('quiz'),
+            category_id=data.get('category'),
+            difficulty=data.get('difficulty'))
+        return Response({'deleted': deleted})
+
+
+class QuestionExportAPIView(APIView):
+    """
+    Потоковая выгрузка вопросов
+    """
+
+    def __init__(self) -> None:
+        """
+        Docstring для __init__
+
+        """
+        super().__init__()
+        self.service = QuestionService()
+
+    @swagger_auto_schema(
+        operation_description='Выгрузить вопросы в NDJSON или JSON',
+        manual_parameters=[
+            *FILTER_PARAMETERS,
+            openapi.Parameter('output', openapi.IN_QUERY,
+                              type=openapi.TYPE_STRING,
+                              enum=list(EXPORT_OUTPUTS), default='ndjson',
+                              description='Формат выгрузки'),
+        ],
+        responses={
+            200: 'Поток вопросов',
+            400: 'Bad Request'
+        }
+    )
+    def get(self, request: Request) -> StreamingHttpResponse | Response:
+        """
+        Выгрузка вопросов без загрузки всей таблицы в память
+
+        :param request: Запрос
+        :type request: Request
+        :return: Потоковый ответ
+        :rtype: StreamingHttpResponse
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_OUTPUTS:
+            return Response(
+                {'detail': f'Формат должен быть одним из: {list(EXPORT_OUTPUTS)}'},
+                status=status.HTTP_400_BAD_REQUEST)
+        try:
+            rows = self.service.iter_question_rows(
+                **question_filters(request))
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        render, content_type = EXPORT_OUTPUTS[output]
+        return StreamingHttpResponse(render(rows), content_type=content_type)
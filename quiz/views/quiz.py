@@ -1,13 +1,28 @@
+from collections.abc import Callable
+
+from django.db import IntegrityError
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from quiz.models import Quiz
+from quiz.models import Question, Quiz
 from quiz.serializers import QuestionSerializer, QuizSerializer
 from quiz.services.question import QuestionService
 from quiz.services.quiz import QuizService
+from quiz.services.search import TITLE_SEARCH_MODES, TITLE_SEARCH_SUBSTRING
+from quiz.services.utils import Version, object_version
+from quiz.views.utils import (FIELDS_PARAMETERS, PAGE_PARAMETERS,
+                              cached_response, fields_params, page_fields,
+                              page_params, paginated_response, represent,
+                              unique_title_response)
+
+TITLE_MODE_PARAMETER = openapi.Parameter(
+    'mode', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    enum=list(TITLE_SEARCH_MODES), default=TITLE_SEARCH_SUBSTRING,
+    description='Поиск по подстроке или по началу названия')
 
 
 class QuizListAPIView(APIView):
@@ -25,6 +40,7 @@ class QuizListAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить список всех квизов',
+        manual_parameters=[*PAGE_PARAMETERS, *FIELDS_PARAMETERS],
         responses={
             200: QuizSerializer(many=True),
             400: 'Bad Request'
@@ -39,9 +55,28 @@ class QuizListAPIView(APIView):
         :return: Ответ
         :rtype: Response
         """
-        quizs = self.service.list_quizzes()
-        serializer = self.serializer_class(quizs, many=True)
-        return Response(serializer.data)
+        try:
+            cursor, limit = page_params(request)
+            selected = fields_params(request, self.serializer_class)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fields = page_fields(self.serializer_class, selected)
+
+        def load() -> tuple[Version, Callable[[], Response]]:
+            page = self.service.list_quizzes_page(
+                cursor=cursor, limit=limit, values=fields)
+            return page.version, lambda: paginated_response(
+                request, page,
+                represent(self.serializer_class, page.items, fields,
+                          selected))
+
+        try:
+            return cached_response(request, 'quiz', load)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
 
     @swagger_auto_schema(
         operation_description='Создать новый квиз',
@@ -62,7 +97,10 @@ class QuizListAPIView(APIView):
         """
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            data = self.service.create_quiz(serializer.validated_data)
+            try:
+                data = self.service.create_quiz(serializer.validated_data)
+            except IntegrityError:
+                return unique_title_response(self.serializer_class)
             res = self.serializer_class(data)
             return Response(res.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -84,6 +122,7 @@ class QuizDetailAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить квиз',
+        manual_parameters=FIELDS_PARAMETERS,
         responses={
             200: QuizSerializer,
             400: 'Bad Request',
@@ -102,9 +141,18 @@ class QuizDetailAPIView(APIView):
         :rtype: Response
         """
         try:
-            quiz = self.service.get_quiz(quiz_id=pk)
-            serializer = self.serializer_class(quiz)
-            return Response(serializer.data)
+            fields = fields_params(request, self.serializer_class)
+        except ValueError as error:
+            return Response({'detail': str(error)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def load() -> tuple[Version, Callable[[], Response]]:
+            quiz = self.service.get_quiz(quiz_id=pk, fields=fields)
+            return object_version(quiz), lambda: Response(
+                self.serializer_class(quiz, fields=fields).data)
+
+        try:
+            return cached_response(request, f'quiz:{pk}', load)
         except Quiz.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -139,6 +187,8 @@ class QuizDetailAPIView(APIView):
                             status=status.HTTP_400_BAD_REQUEST)
         except Quiz.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        except IntegrityError:
+            return unique_title_response(self.serializer_class)
 
     @swagger_auto_schema(
         operation_description='Удалить квиз',
@@ -181,6 +231,7 @@ class QuizByTitleAPIView(APIView):
 
     @swagger_auto_schema(
         operation_description='Получить квиз по названию',
+        manual_parameters=[TITLE_MODE_PARAMETER],
         responses={
             200: QuizSerializer(many=True),
             400: 'Bad Request'
@@ -197,9 +248,18 @@ class QuizByTitleAPIView(APIView):
         :return: Ответ
         :rtype: Response
         """
-        quiz = self.service.get_quizes_by_title(title)
-        serializer = self.serializer_class(quiz, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build() -> Response:
+            try:
+                quiz = self.service.get_quizes_by_title(
+                    title, mode=request.query_params.get('mode', TITLE_SEARCH_SUBSTRING))
+                serializer = self.serializer_class(quiz, many=True)
+                data = serializer.data
+            except ValueError as error:
+                return Response({'detail': str(error)},
+                                status=status.HTTP_400_BAD_REQUEST)
+            return Response(data, status=status.HTTP_200_OK)
+
+        return cached_response(request, 'quiz', lambda: (None, build))
 
 
 class QuizRandomQuestionAPIView(APIView):
@@ -217,9 +277,9 @@ class QuizRandomQuestionAPIView(APIView):
         self.serializer_class = QuestionSerializer
 
     @swagger_auto_schema(
-        operation_description='Получить квиз по названию',
+        operation_description='Получить случайный вопрос квиза',
         responses={
-            200: QuizSerializer(many=True),
+            200: QuestionSerializer,
             404: 'Not found'
         }
     )
@@ -234,5 +294,5 @@ class QuizRandomQuestionAPIView(APIView):
                 quiz_id=id)
             serializer = self.serializer_class(question)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        except Quiz.DoesNotExist:
+        except Question.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
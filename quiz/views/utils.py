@@ -0,0 +1,216 @@
+from collections.abc import Callable
+
+from django.conf import settings
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from drf_yasg import openapi
+from rest_framework import serializers, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from quiz.serializers import select_fields, values_fields
+from quiz.services.responses import response_cache
+from quiz.services.utils import Cursor, Page, Version
+from quiz.utils import MAX_PAGE_SIZE, PAGE_SIZE
+
+PAGE_PARAMETERS = [
+    openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Позиция соседней страницы'),
+    openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                      description='Размер страницы'),
+]
+FIELDS_PARAMETERS = [
+    openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Поля ответа через запятую'),
+    openapi.Parameter('exclude', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                      description='Поля, которые нужно убрать из ответа'),
+]
+
+
+def page_params(request: Request) -> tuple[Cursor | None, int]:
+    """
+    Достает курсор и размер страницы из параметров запроса.
+
+    :param request: Запрос
+    :return: Курсор и размер страницы
+    :raises ValueError: Если параметры некорректны
+    """
+    token = request.query_params.get('cursor')
+    cursor = Cursor.decode(token) if token else None
+    max_limit = getattr(settings, 'QUIZ_MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+    limit = request.query_params.get('limit')
+    if limit is None:
+        return cursor, min(getattr(settings, 'QUIZ_PAGE_SIZE', PAGE_SIZE), max_limit)
+    if not limit.isdigit() or int(limit) < 1:
+        raise ValueError('Размер страницы должен быть положительным числом')
+    limit = int(limit)
+    return cursor, min(limit, max_limit)
+
+
+def int_param(request: Request, name: str) -> int | None:
+    """
+    Достает необязательный целочисленный параметр запроса.
+
+    :param request: Запрос
+    :param name: Имя параметра
+    :return: Значение или None, если параметра нет
+    :raises ValueError: Если значение не является числом
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    if not value.isdigit():
+        raise ValueError(f'Параметр {name} должен быть числом')
+    return int(value)
+
+
+def fields_params(request: Request,
+                  serializer_class: type[serializers.Serializer]
+                  ) -> tuple[str, ...] | None:
+    """
+    Достает поля ответа из параметров fields и exclude.
+
+    :param request: Запрос
+    :param serializer_class: Сериализатор ответа
+    :return: Поля ответа или None, если нужны все поля
+    :raises ValueError: Если поле неизвестно или не выбрано ни одного поля
+    """
+    return select_fields(serializer_class, request.query_params.get('fields'),
+                         request.query_params.get('exclude'))
+
+
+def page_fields(serializer_class: type[serializers.Serializer],
+                selected: tuple[str, ...] | None) -> tuple[str, ...] | None:
+    """
+    Поля словарей .values() для страницы списка.
+
+    Если сериализатор можно заменить словарями, из БД читаются только
+    выбранные поля.
+
+    :param serializer_class: Сериализатор объектов
+    :param selected: Поля ответа или None для всех полей
+    :return: Поля словарей или None, если на странице нужны объекты
+    """
+    fields = values_fields(serializer_class)
+    if fields is None or selected is None:
+        return fields
+    return selected
+
+
+def paginated_response(request: Request, page: Page, data: list) -> Response:
+    """
+    Отдает страницу списком, а ссылки на соседние страницы в заголовке Link.
+
+    :param request: Запрос
+    :param page: Страница выборки
+    :param data: Сериализованные объекты страницы
+    :return: Ответ
+    """
+    url = remove_query_param(request.build_absolute_uri(), 'cursor')
+    links = [
+        f'<{replace_query_param(url, "cursor", cursor.encode())}>; rel="{rel}"'
+        for rel, cursor in (('next', page.next), ('prev', page.previous))
+        if cursor is not None
+    ]
+    headers = {'Link': ', '.join(links)} if links else None
+    return Response(data, headers=headers)
+
+
+def represent(serializer_class: type[serializers.Serializer], items: list,
+              fields: tuple[str, ...] | None,
+              selected: tuple[str, ...] | None = None) -> list:
+    """
+    Данные страницы для ответа.
+
+    :param serializer_class: Сериализатор объектов
+    :param items: Объекты модели или словари из .values()
+    :param fields: Поля словарей или None, если на странице объекты
+    :param selected: Поля ответа для объектов или None для всех полей
+    :return: Список для тела ответа
+    """
+    if fields is not None:
+        return items
+    return serializer_class(items, many=True, fields=selected).data
+
+
+def conditional_response(request: Request, version: Version,
+                         build: Callable[[], Response]) -> HttpResponseBase:
+    """
+    Отвечает 304, если у клиента актуальная версия, иначе строит ответ.
+
+    If-None-Match и If-Modified-Since проверяются по правилам Django
+    до сериализации, ETag и Last-Modified (если он есть у версии)
+    добавляются к обоим ответам.
+
+    :param request: Запрос
+    :param version: Текущая версия объекта или выборки
+    :param build: Функция, которая строит полный ответ
+    :return: Ответ
+    """
+    last_modified = (int(version.last_modified.timestamp())
+                     if version.last_modified else None)
+    response = get_conditional_response(request, etag=version.etag,
+                                        last_modified=last_modified)
+    if response is None:
+        response = build()
+    if response.status_code in (status.HTTP_200_OK,
+                                status.HTTP_304_NOT_MODIFIED):
+        response.headers['ETag'] = version.etag
+        if last_modified is not None:
+            response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def cached_response(
+        request: Request, scope: str,
+        load: Callable[[], tuple[Version | None, Callable[[], Response]]]
+) -> HttpResponseBase:
+    """
+    Отдает ответ из кэша ответов или строит его и сохраняет.
+
+    При попадании в кэш БД не читается: версия для условного GET хранится
+    вместе с данными ответа.
+
+    :param request: Запрос
+    :param scope: Область кэша, которую сбрасывают записи
+    :param load: Функция, которая возвращает версию данных (или None для
+        ответов без ETag) и функцию построения полного ответа
+    :return: Ответ
+    """
+    key = response_cache.key(scope, request.get_full_path())
+    entry = response_cache.get(key) if key else None
+    if entry is not None:
+        version, data, headers = entry
+
+        def build() -> Response:
+            return Response(data, headers=headers)
+    else:
+        version, build_response = load()
+
+        def build() -> Response:
+            response = build_response()
+            if key and response.status_code == status.HTTP_200_OK:
+                headers = ({'Link': response.headers['Link']}
+                           if 'Link' in response.headers else None)
+                response_cache.set(key, (version, response.data, headers))
+            return response
+
+    if version is None:
+        return build()
+    return conditional_response(request, version, build)
+
+
+def unique_title_response(
+        serializer_class: type[serializers.Serializer]) -> Response:
+    """
+    Ответ 400 на нарушение уникальности названия в БД.
+
+    Тело совпадает с ошибкой валидации поля title.
+
+    :param serializer_class: Сериализатор с текстом ошибки
+    :return: Ответ
+    """
+    return Response({'title': [serializer_class.unique_title_message]},
+                    status=status.HTTP_400_BAD_REQUEST)
@@ -6,6 +6,9 @@ from quiz.services.question import QuestionService
 from quiz.services.quiz import QuizService
 from quiz.services.category import CategoryService
 from quiz.models import Category, Question, Quiz
+from django.core.cache import cache
+from quiz.services.answers import answer_keys
+from quiz.services.sampling import sampler
 
 
 @pytest.fixture
@@ -88,4 +91,22 @@ def question_response():
              'difficulty': 'easy'
              },
             content_type='application/json'
-        )
\ No newline at end of file
+        )
+
+
+@pytest.fixture(autouse=True)
+def clear_answer_keys():
+    """Сбрасывает кэш ответов между тестами"""
+    answer_keys.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_sampler():
+    """Сбрасывает списки id вопросов квизов между тестами"""
+    sampler.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Сбрасывает кэш Django между тестами: БД откатывается, а кэш нет"""
+    cache.clear()
@@ -0,0 +1,202 @@
+import gzip
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.urls import reverse
+
+from quiz.models import Category, Question, Quiz
+from quiz.services.importer import ImportCheckpoint
+
+DATA_DIR = settings.BASE_DIR / 'quiz' / 'static' / 'data'
+QUESTIONS_HEADER = ('id,quiz_id,category_id,text,description,options,'
+                    'correct_answer,explanation,difficulty\n')
+
+
+def write_dump(path: Path, questions: str) -> None:
+    """Пишет в каталог CSV с одним квизом, одной категорией и вопросами"""
+
+    (path / 'quizzes.csv').write_text(
+        'id,title,description\n1,Quiz,\n', encoding='utf-8')
+    (path / 'categories.csv').write_text(
+        'id,title\n1,Category\n', encoding='utf-8')
+    (path / 'questions.csv').write_text(QUESTIONS_HEADER + questions,
+                                        encoding='utf-8')
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+    def test_import_static_data(self) -> None:
+        """Тест загрузки CSV из репозитория"""
+
+        out = StringIO()
+        call_command('import_csv', str(DATA_DIR), batch_size=7, stdout=out)
+
+        assert Quiz.objects.count() == 10
+        assert Category.objects.count() == 15
+        assert Question.objects.count() == 20
+        assert 'questions.csv: загружено 20 строк' in out.getvalue()
+        assert Quiz.objects.get(id=1).title_normalized == 'основы python'
+
+    def test_rejects_report(self, tmp_path) -> None:
+        """Тест отчета об отклоненных строках"""
+
+        (tmp_path / 'quizzes.csv').write_text(
+            'id,title,description\n1,Quiz,\n', encoding='utf-8')
+        (tmp_path / 'categories.csv').write_text(
+            'id,title\n1,Category\nx,Broken\n', encoding='utf-8')
+        (tmp_path / 'questions.csv').write_text(
+            'id,quiz_id,category_id,text,description,options,'
+            'correct_answer,explanation,difficulty\n'
+            '1,1,1,Q,D,"[\'a\',\'b\']",a,,easy\n'
+            '2,1,1,Q,D,"[\'a\',\'b\']",c,,easy\n'
+            '3,5,1,Q,D,"[\'a\',\'b\']",a,,easy\n'
+            '4,1,1,Q,D,"[\'a\']",a,,hard\n',
+            encoding='utf-8')
+        rejects_path = tmp_path / 'rejects.jsonl'
+
+        call_command('import_csv', str(tmp_path), rejects=str(rejects_path),
+                     stdout=StringIO())
+
+        assert list(Question.objects.values_list('id', flat=True)) == [1]
+        rejects = [json.loads(line)
+                   for line in rejects_path.read_text().splitlines()]
+        assert [(reject['file'], reject['row']) for reject in rejects] == [
+            ('categories.csv', 2),
+            ('questions.csv', 2),
+            ('questions.csv', 4),
+            ('questions.csv', 3),
+        ]
+
+    def test_parallel_import(self, tmp_path, monkeypatch) -> None:
+        """Тест разбора файла в нескольких процессах"""
+
+        monkeypatch.setattr(
+            'quiz.management.commands.import_csv.PARALLEL_CHUNK_BYTES', 256)
+        lines = ['id,quiz_id,category_id,text,description,options,'
+                 'correct_answer,explanation,difficulty']
+        lines += [f'{pk},1,1,Q{pk},D,"[\'a\',\'b\']",a,,easy'
+                  for pk in range(1, 41)]
+        lines[25] = lines[25].replace(',easy', ',unknown')
+        (tmp_path / 'quizzes.csv').write_text(
+            'id,title,description\n1,Quiz,\n', encoding='utf-8')
+        (tmp_path / 'categories.csv').write_text(
+            'id,title\n1,Category\n', encoding='utf-8')
+        (tmp_path / 'questions.csv').write_text('\n'.join(lines) + '\n',
+                                                encoding='utf-8')
+        rejects_path = tmp_path / 'rejects.jsonl'
+
+        call_command('import_csv', str(tmp_path), workers=2,
+                     rejects=str(rejects_path), stdout=StringIO())
+
+        assert Question.objects.count() == 39
+        assert not Question.objects.filter(id=25).exists()
+        rejects = [json.loads(line)
+                   for line in rejects_path.read_text().splitlines()]
+        assert [(reject['row'], reject['id']) for reject in rejects] == [
+            (25, '25')]
+
+    def test_incremental_import(self, tmp_path, client) -> None:
+        """Тест повторного импорта с обновлением измененных строк"""
+
+        write_dump(tmp_path, '1,1,1,Q1,D,"[\'a\',\'b\']",a,,easy\n'
+                             '2,1,1,Q2,D,"[\'a\',\'b\']",a,,easy\n')
+        call_command('import_csv', str(tmp_path), stdout=StringIO())
+        # ответы API попадают в кэш и должны сброситься импортом
+        detail_url = reverse('question-detail', args=[2])
+        assert client.get(detail_url).json()['text'] == 'Q2'
+        assert len(client.get(reverse('question-list')).json()) == 2
+        write_dump(tmp_path, '1,1,1,Q1,D,"[\'a\',\'b\']",a,,easy\n'
+                             '2,1,1,New,D,"[\'a\',\'b\']",b,,hard\n'
+                             '3,1,1,Q3,D,"[\'a\',\'b\']",a,,easy\n')
+
+        out = StringIO()
+        call_command('import_csv', str(tmp_path), incremental=True,
+                     stdout=out)
+
+        assert Question.objects.get(id=2).text == 'New'
+        assert Question.objects.count() == 3
+        assert client.get(detail_url).json()['text'] == 'New'
+        assert len(client.get(reverse('question-list')).json()) == 3
+        assert 'questions.csv: загружено 2 строк' in out.getvalue()
+        assert 'без изменений 1' in out.getvalue()
+        assert 'quizzes.csv: загружено 0 строк' in out.getvalue()
+
+    def test_resume_from_checkpoint(self, tmp_path) -> None:
+        """Тест продолжения импорта с сохраненного прогресса"""
+
+        write_dump(tmp_path, '1,1,1,Q1,D,"[\'a\',\'b\']",a,,easy\n'
+                             '2,1,1,Q2,D,"[\'a\',\'b\']",a,,easy\n'
+                             '3,1,1,Q3,D,"[\'a\',\'b\']",a,,easy\n')
+        checkpoint_path = tmp_path / 'checkpoint.json'
+        ImportCheckpoint(str(checkpoint_path)).save(
+            str(tmp_path / 'questions.csv'), 2)
+
+        call_command('import_csv', str(tmp_path),
+                     checkpoint=str(checkpoint_path), stdout=StringIO())
+
+        assert list(Question.objects.values_list('id', flat=True)) == [3]
+        assert not checkpoint_path.exists()
+
+
+@pytest.mark.django_db
+class TestExportData:
+    def test_csv_round_trip(self, tmp_path) -> None:
+        """Тест выгрузки в CSV, который снова загружается import_csv"""
+
+        call_command('import_csv', str(DATA_DIR), stdout=StringIO())
+        # время изменения обновляется при повторной загрузке
+        fields = [field.attname for field in Question._meta.concrete_fields
+                  if field.name != 'updated_at']
+        expected = list(Question.objects.order_by('id').values(*fields))
+
+        call_command('export_data', str(tmp_path), chunk_size=7,
+                     stdout=StringIO())
+        Quiz.objects.all().delete()
+        Category.objects.all().delete()
+        call_command('import_csv', str(tmp_path), stdout=StringIO())
+
+        assert list(Question.objects.order_by('id').values(*fields)) == expected
+        assert Quiz.objects.count() == 10
+        assert Category.objects.count() == 15
+
+    def test_jsonl_gzip(self, tmp_path, question) -> None:
+        """Тест выгрузки в сжатый JSONL"""
+
+        call_command('export_data', str(tmp_path), output='jsonl',
+                     compress='gzip', stdout=StringIO())
+
+        with gzip.open(tmp_path / 'questions.jsonl.gz', 'rt') as file:
+            rows = [json.loads(line) for line in file]
+        assert [row['id'] for row in rows] == [question.id]
+        assert rows[0]['options'] == question.options
+
+    def test_parquet(self, tmp_path, question) -> None:
+        """Тест выгрузки в Parquet"""
+
+        parquet = pytest.importorskip('pyarrow.parquet')
+
+        call_command('export_data', str(tmp_path), output='parquet',
+                     stdout=StringIO())
+
+        table = parquet.read_table(tmp_path / 'questions.parquet')
+        assert table.column('id').to_pylist() == [question.id]
+        assert [json.loads(options) for options
+                in table.column('options').to_pylist()] == [question.options]
+
+    def test_parquet_non_string_options(self, tmp_path, question) -> None:
+        """Тест выгрузки в Parquet вариантов ответа не из строк"""
+
+        parquet = pytest.importorskip('pyarrow.parquet')
+        options = [1, 2.5, True, None, 'Да', ['a']]
+        Question.objects.filter(id=question.id).update(options=options)
+
+        call_command('export_data', str(tmp_path), output='parquet',
+                     stdout=StringIO())
+
+        table = parquet.read_table(tmp_path / 'questions.parquet')
+        assert [json.loads(value) for value
+                in table.column('options').to_pylist()] == [options]
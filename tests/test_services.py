@@ -1,8 +1,19 @@
 import pytest
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
 from quiz.models import Category, Question, Quiz
+from quiz.services.answers import answer_keys
 from quiz.services.category import CategoryService
-from quiz.services.question import QuestionService
+from quiz.services.question import QUESTION_ORDERINGS, QuestionService
 from quiz.services.quiz import QuizService
+from quiz.services.sampling import sampler
+from quiz.services.writes import write_queue
+from quiz.utils import ANSWER_CACHE_TTL, SAMPLER_TTL
 
 
 @pytest.mark.django_db
@@ -30,6 +41,14 @@ class TestCategoryService:
         self.service.delete_category(category.id)
         assert Category.objects.count() == 0
 
+    def test_delete_category_cascade(self, question) -> None:
+        """Тест удаления категории вместе с вопросами"""
+
+        self.service.delete_category(question.category_id.id)
+        assert Question.objects.count() == 0
+        with pytest.raises(Category.DoesNotExist):
+            self.service.delete_category(question.category_id.id)
+
 
 @pytest.mark.django_db
 class TestQuizService:
@@ -50,11 +69,29 @@ class TestQuizService:
         updated = self.service.update_quiz(quiz.id, {'title': 'New'})
         assert updated.title == 'New'
 
+    def test_get_quizes_by_title(self) -> None:
+        """Тест поиска квизов по нормализованному названию"""
+
+        quiz = self.service.create_quiz({'title': 'Основы  Python'})
+        assert list(self.service.get_quizes_by_title('ОСНОВЫ')) == [quiz]
+        assert list(self.service.get_quizes_by_title('ы p')) == [quiz]
+        assert list(self.service.get_quizes_by_title('основы python', 'prefix')) == [quiz]
+        assert not self.service.get_quizes_by_title('python', 'prefix').exists()
+
+        self.service.update_quiz(quiz.id, {'title': 'Алгебра'})
+        assert list(self.service.get_quizes_by_title('АЛГ', 'prefix')) == [quiz]
+        # символы шаблона LIKE в префиксе ищутся как обычные символы
+        assert not self.service.get_quizes_by_title('алг%', 'prefix').exists()
+        assert not self.service.get_quizes_by_title('алг_бра', 'prefix').exists()
+        assert not self.service.get_quizes_by_title('основы').exists()
+
     def test_delete_category(self, quiz) -> None:
         """Тест удаления квиза"""
 
         self.service.delete_quiz(quiz.id)
         assert Quiz.objects.count() == 0
+        with pytest.raises(Quiz.DoesNotExist):
+            self.service.delete_quiz(quiz.id)
 
 
 @pytest.mark.django_db
@@ -73,12 +110,308 @@ class TestQuestionService:
     def test_update_question(self, question) -> None:
         """Тест обновления вопроса"""
 
-        updated = self.service.update_question(question.id, {'text': 'New'})
+        with CaptureQueriesContext(connection) as queries:
+            updated = self.service.update_question(
+                question.id, {'text': 'New', 'options': ['1', '3']})
+        assert len(queries) == 1
         assert updated.text == 'New'
+        assert updated.options == ['1', '3']
+        assert updated.quiz_id_id == question.quiz_id_id
+        with pytest.raises(Question.DoesNotExist):
+            self.service.update_question(question.id + 1, {'text': 'New'})
 
     def test_delete_question(self, question) -> None:
         """Тест удаления вопроса"""
 
         assert question.text == 'text'
-        self.service.delete_question(question.id)
+        with CaptureQueriesContext(connection) as queries:
+            self.service.delete_question(question.id)
+        assert len(queries) == 1
         assert Question.objects.count() == 0
+        with pytest.raises(Question.DoesNotExist):
+            self.service.delete_question(question.id)
+
+    def test_list_questions_page(self, question) -> None:
+        """Тест постраничного получения вопросов"""
+
+        second = self.service.create_question(
+            question.quiz_id.id,
+            data={'category_id': question.category_id, 'text': 'text2',
+                  'description': 'description', 'options': ['1', '2'],
+                  'correct_answer': '1', 'difficulty': 'easy'})
+        page = self.service.list_questions_page(limit=1)
+        assert page.items == [question]
+        assert page.previous is None
+
+        page = self.service.list_questions_page(cursor=page.next, limit=1)
+        assert page.items == [second]
+        assert page.next is None
+
+        page = self.service.list_questions_page(cursor=page.previous, limit=1)
+        assert page.items == [question]
+
+    def test_random_question_from_quiz(self, question) -> None:
+        """Тест выбора случайного вопроса и пустого квиза"""
+
+        quiz_id = question.quiz_id.id
+        assert self.service.random_question_from_quiz(quiz_id) == question
+
+        self.service.delete_question(question.id)
+        with pytest.raises(Question.DoesNotExist):
+            self.service.random_question_from_quiz(quiz_id)
+
+    def test_get_questions_by_text(self, question) -> None:
+        """Тест полнотекстового поиска и синхронизации индекса"""
+
+        self.service.update_question(
+            question.id, {'description': 'Язык ПРОГРАММИРОВАНИЯ'})
+        assert self.service.get_questions_by_text('программ') == [question]
+
+        page = self.service.get_questions_by_text_page('explan', limit=1)
+        assert page.items == [question]
+        assert page.next is None
+
+        self.service.delete_question(question.id)
+        assert self.service.get_questions_by_text('программ') == []
+
+    def test_check_answer_cache(self, question, django_assert_num_queries) -> None:
+        """Тест кэша правильных ответов"""
+
+        assert self.service.check_answer(question.id, '1')
+        with django_assert_num_queries(0):
+            assert not self.service.check_answer(question.id, '2')
+
+        self.service.update_question(question.id, {'correct_answer': '2'})
+        assert self.service.check_answer(question.id, '2')
+
+        self.service.delete_question(question.id)
+        with pytest.raises(Question.DoesNotExist):
+            self.service.check_answer(question.id, '2')
+
+    def test_check_answer_cache_ttl(self, question, monkeypatch,
+                                    settings) -> None:
+        """Тест устаревания ответа, измененного другим процессом"""
+
+        settings.QUIZ_ANSWER_CACHE = None
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        assert self.service.check_answer(question.id, '1')
+        # запись мимо сервиса, как из другого процесса или import_csv
+        Question.objects.filter(id=question.id).update(correct_answer='2')
+        assert self.service.check_answer(question.id, '1')
+
+        monkeypatch.setattr(time, 'monotonic',
+                            lambda: now + ANSWER_CACHE_TTL)
+        assert self.service.check_answer(question.id, '2')
+        assert self.service.check_answers(
+            [(question.id, '2')]) == [True]
+
+    def test_check_answer_shared_cache_race(self, question, monkeypatch,
+                                            settings, tmp_path) -> None:
+        """Тест инвалидации между чтением ответа из БД и записью в кэш"""
+
+        settings.CACHES = {**settings.CACHES, 'answers': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path)}}
+        settings.QUIZ_ANSWER_CACHE = 'answers'
+        load, load_many = answer_keys._load, answer_keys._load_many
+
+        def update(answer: str) -> None:
+            Question.objects.filter(id=question.id).update(
+                correct_answer=answer)
+            answer_keys.invalidate(question.id)
+
+        def racing_load(question_id: int) -> str:
+            answer = load(question_id)
+            update('2')
+            return answer
+
+        def racing_load_many(question_ids: list[int]) -> dict[int, str]:
+            answers = load_many(question_ids)
+            update('3')
+            return answers
+
+        monkeypatch.setattr(answer_keys, '_load', racing_load)
+        monkeypatch.setattr(answer_keys, '_load_many', racing_load_many)
+        assert self.service.check_answer(question.id, '1')
+        assert self.service.check_answers([(question.id, '2')]) == [True]
+        monkeypatch.undo()
+        assert self.service.check_answer(question.id, '3')
+        assert self.service.check_answers([(question.id, '3')]) == [True]
+
+    def test_random_question_pool_ttl(self, question, monkeypatch,
+                                      settings) -> None:
+        """Тест срока жизни и размера списков id вопросов в процессе"""
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        settings.QUIZ_SAMPLER_CACHE_SIZE = 1
+        now = time.monotonic()
+        monkeypatch.setattr(time, 'monotonic', lambda: now)
+        quiz_id = question.quiz_id_id
+        assert sampler.question_ids(quiz_id) == (question.id,)
+        # вопрос создан мимо сервиса, как из другого процесса или import_csv
+        created = Question.objects.create(
+            quiz_id_id=quiz_id, category_id_id=question.category_id_id,
+            text='Новый', options=['1', '2'], correct_answer='1',
+            difficulty='easy')
+        assert sampler.question_ids(quiz_id) == (question.id,)
+
+        monkeypatch.setattr(time, 'monotonic', lambda: now + SAMPLER_TTL)
+        assert sampler.question_ids(quiz_id) == (question.id, created.id)
+
+        other = Quiz.objects.create(title='Другой')
+        assert sampler.question_ids(other.id) == ()
+        assert list(sampler._ids) == [other.id]
+
+    def test_random_question_after_move(self, question) -> None:
+        """Тест списков id обоих квизов после переноса вопроса"""
+
+        source = question.quiz_id_id
+        other = Quiz.objects.create(title='Другой')
+        assert sampler.question_ids(source) == (question.id,)
+        assert sampler.question_ids(other.id) == ()
+
+        self.service.update_question(question.id, {'quiz_id': other})
+        assert sampler.question_ids(source) == ()
+        assert sampler.question_ids(other.id) == (question.id,)
+        assert self.service.random_question_from_quiz(other.id) == question
+
+
+def query_plans(run: Callable[[], object]) -> list[tuple[str, list[str]]]:
+    """
+    Выполняет запросы и возвращает их планы EXPLAIN QUERY PLAN SQLite.
+
+    :param run: Функция с запросами сервиса
+    :return: SQL каждого запроса и строки его плана
+    """
+    with CaptureQueriesContext(connection) as queries:
+        run()
+    plans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            if query['sql'].startswith(('SELECT', 'UPDATE', 'DELETE')):
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plans.append((query['sql'],
+                              [row[3] for row in cursor.fetchall()]))
+    return plans
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='план разбирается в формате SQLite')
+class TestQueryPlans:
+    def test_filters_use_composite_indexes(self, question) -> None:
+        """Тест поиска по всем столбцам фильтра без сортировки в памяти"""
+
+        service = QuestionService()
+        for filters in ({'quiz_id': question.quiz_id_id, 'difficulty': 'easy'},
+                        {'category_id': question.category_id_id,
+                         'difficulty': 'easy'},
+                        {'quiz_id': question.quiz_id_id},
+                        {'category_id': question.category_id_id}):
+            columns = [Question._meta.get_field(name).column
+                       for name in filters]
+            plans = query_plans(
+                lambda filters=filters: list(
+                    service.iter_question_rows(**filters)))
+            plans += query_plans(
+                lambda filters=filters: service.update_questions(
+                    {'explanation': None}, **filters))
+            for ordering in QUESTION_ORDERINGS:
+                plans += query_plans(
+                    lambda filters=filters, ordering=ordering:
+                    service.list_questions_page(ordering=ordering, **filters))
+            for sql, plan in plans:
+                assert plan[0].startswith('SEARCH'), sql
+                assert all(f'{column}=?' in plan[0] for column in columns), plan
+                assert not any(line.startswith('USE TEMP B-TREE')
+                               for line in plan), plan
+
+    def test_reads_use_indexes(self, question) -> None:
+        """Тест чтения сервисов по индексам без сортировки в памяти"""
+
+        service = QuestionService()
+        quiz_id = question.quiz_id_id
+
+        def run() -> None:
+            for list_page in (CategoryService().list_categories_page,
+                              QuizService().list_quizzes_page,
+                              service.list_questions_page):
+                page = list_page(limit=1)
+                list_page(cursor=page.previous or page.next, limit=1)
+            list(service.get_questions_for_quiz(quiz_id))
+            service.random_question_from_quiz(quiz_id)
+            service.check_answers([(question.id, '1')])
+            list(service.select_questions(ids=[question.id],
+                                          quiz_id=quiz_id))
+
+        for sql, plan in query_plans(run):
+            assert not any(line.startswith('USE TEMP B-TREE')
+                           for line in plan), sql
+            assert not any(re.fullmatch(r'SCAN \w+', line)
+                           for line in plan) or 'WHERE' not in sql, sql
+
+    def test_writes_use_indexes(self, question) -> None:
+        """Тест массовых изменений и каскадного удаления по индексам"""
+
+        service = QuestionService()
+
+        def run() -> None:
+            service.update_questions({'difficulty': 'hard'},
+                                     quiz_id=question.quiz_id_id,
+                                     difficulty='easy')
+            service.delete_questions(category_id=question.category_id_id,
+                                     difficulty='hard')
+            CategoryService().delete_category(question.category_id_id)
+            QuizService().delete_quiz(question.quiz_id_id)
+
+        for sql, plan in query_plans(run):
+            assert not any(re.fullmatch(r'SCAN \w+', line)
+                           for line in plan), sql
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='настройки и очередь записи только для SQLite')
+class TestSqliteTuning:
+    @pytest.mark.django_db
+    def test_connection_pragmas(self) -> None:
+        """Тест PRAGMA нового соединения"""
+
+        with connection.cursor() as cursor:
+            values = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                      for name in ('synchronous', 'busy_timeout',
+                                   'cache_size')}
+        assert values == {'synchronous': 1, 'busy_timeout': 5000,
+                          'cache_size': -64 * 2 ** 10}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_write_queue(self, settings) -> None:
+        """Тест записей из нескольких потоков через один поток записи"""
+
+        settings.QUIZ_SQLITE_WRITE_QUEUE = True
+        service = CategoryService()
+
+        def create(index: int) -> int:
+            try:
+                category = service.create_category(f'Категория {index}')
+                service.update_category(category.id,
+                                        {'title': f'Тема {index}'})
+                return category.id
+            finally:
+                connections.close_all()
+
+        try:
+            writer = write_queue.run(threading.current_thread)
+            with transaction.atomic():
+                inline = write_queue.run(threading.current_thread)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                ids = list(executor.map(create, range(40)))
+        finally:
+            write_queue.close()
+
+        assert writer.name.startswith('quiz-sqlite-writer')
+        assert inline is threading.current_thread()
+        assert sorted(Category.objects.values_list('title', flat=True)) == (
+            sorted(f'Тема {index}' for index in range(40)))
+        assert len(set(ids)) == 40
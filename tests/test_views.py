@@ -1,6 +1,21 @@
+import gzip
+import json
 import pytest
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
 from http import HTTPStatus
+from uuid import UUID
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from quiz.models import Category, Question, Quiz
+from quiz.serializers import (CategorySerializer, QuestionSerializer,
+                              QuizSerializer, values_fields)
+from quiz.services.export import QUESTION_FIELDS
 
 
 @pytest.mark.django_db
@@ -64,6 +79,153 @@ class TestCategoryAPI:
         )
         assert response.status_code == HTTPStatus.BAD_REQUEST
 
+        response = client.post(
+            category_create_get_url,
+            {'title': ' HISTORY '},
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'title': ['Такая категория уже есть']}
+
+    def test_put_duplicate_category(self, client, category_create_get_url) -> None:
+        """Тест переименования категории в уже существующую"""
+
+        for title in ('History', 'Cars'):
+            response = client.post(category_create_get_url, {'title': title},
+                                   content_type='application/json')
+        url = reverse('category-detail', kwargs={'pk': response.json()['id']})
+
+        response = client.put(url, {'title': 'Cars'},
+                              content_type='application/json')
+        assert response.status_code == HTTPStatus.OK
+        response = client.put(url, {'title': 'history'},
+                              content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'title': ['Такая категория уже есть']}
+
+    def test_list_category_pagination(self, client, category_create_get_url) -> None:
+        """Тест курсорной пагинации списка категорий"""
+
+        for title in ('C', 'A', 'B'):
+            client.post(category_create_get_url, {'title': title},
+                        content_type='application/json')
+
+        response = client.get(category_create_get_url, {'limit': 2})
+        assert response.status_code == HTTPStatus.OK
+        assert [item['title'] for item in response.json()] == ['A', 'B']
+        next_url = response.headers['Link'].split('>')[0][1:]
+
+        response = client.get(next_url)
+        assert [item['title'] for item in response.json()] == ['C']
+        assert 'rel="next"' not in response.headers['Link']
+
+        response = client.get(category_create_get_url, {'cursor': 'broken'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = client.get(category_create_get_url, {'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_conditional_get_category(self, client, category_create_get_url,
+                                      settings) -> None:
+        """Тест ответов 304 по ETag и Last-Modified для категорий"""
+
+        settings.QUIZ_RESPONSE_CACHE = None
+        category = client.post(category_create_get_url, {'title': 'History'},
+                               content_type='application/json').json()
+        detail_url = reverse('category-detail', kwargs={'pk': category['id']})
+
+        response = client.get(detail_url)
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response.headers['ETag'] == etag
+        assert not response.content
+        response = client.get(detail_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        client.put(detail_url, {'title': 'Cars'}, content_type='application/json')
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers['ETag'] != etag
+
+        response = client.get(category_create_get_url)
+        list_etag = response.headers['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(category_create_get_url,
+                                  HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert len(queries) == 1
+
+        client.delete(detail_url)
+        response = client.get(category_create_get_url,
+                              HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == []
+
+    def test_conditional_get_category_page(self, client,
+                                           category_create_get_url,
+                                           settings) -> None:
+        """Тест ETag страницы списка по строкам этой страницы"""
+
+        settings.QUIZ_RESPONSE_CACHE = None
+        for title in ('Art', 'Biology'):
+            client.post(category_create_get_url, {'title': title},
+                        content_type='application/json')
+        second = Category.objects.get(title='Biology')
+        etag = client.get(category_create_get_url,
+                          {'limit': 1}).headers['ETag']
+
+        # строка другой страницы не меняет ETag первой
+        client.put(reverse('category-detail', kwargs={'pk': second.id}),
+                   {'title': 'Chemistry'}, content_type='application/json')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(category_create_get_url, {'limit': 1},
+                                  HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert len(queries) == 1
+        assert 'COUNT' not in queries[0]['sql'].upper()
+        assert 'LIMIT 2' in queries[0]['sql'].upper()
+
+        # без следующей страницы меняется курсор, а с ним ETag
+        client.delete(reverse('category-detail', kwargs={'pk': second.id}))
+        response = client.get(category_create_get_url, {'limit': 1},
+                              HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert 'Link' not in response.headers
+
+    def test_response_cache_category(self, client, category_create_get_url,
+                                     settings) -> None:
+        """Тест кэша ответов и его сброса при записи"""
+
+        settings.QUIZ_RESPONSE_CACHE = 'default'
+        category = client.post(category_create_get_url, {'title': 'History'},
+                               content_type='application/json').json()
+        detail_url = reverse('category-detail', kwargs={'pk': category['id']})
+        etag = client.get(detail_url).headers['ETag']
+        client.get(category_create_get_url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(detail_url)
+            assert response.json() == category
+            assert response.headers['ETag'] == etag
+            assert client.get(detail_url, HTTP_IF_NONE_MATCH=etag
+                              ).status_code == HTTPStatus.NOT_MODIFIED
+            assert len(client.get(category_create_get_url).json()) == 1
+        assert len(queries) == 0
+
+        client.put(detail_url, {'title': 'Cars'}, content_type='application/json')
+        assert client.get(detail_url).json()['title'] == 'Cars'
+        assert client.get(category_create_get_url).json()[0]['title'] == 'Cars'
+
+        client.post(category_create_get_url, {'title': 'Art'},
+                    content_type='application/json')
+        assert len(client.get(category_create_get_url).json()) == 2
+
+        client.delete(detail_url)
+        assert client.get(detail_url).status_code == HTTPStatus.NOT_FOUND
+        assert len(client.get(category_create_get_url).json()) == 1
+
     def test_title_len_category(self, client, category_create_get_url) -> None:
         """Тест с неправильными данными(длина поля title) категории"""
 
@@ -162,6 +324,21 @@ class TestQuizAPI:
         )
         assert response.status_code == HTTPStatus.BAD_REQUEST
 
+        response = client.post(
+            quiz_create_get_url,
+            {'title': 'FOOTBALL'},
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {'title': ['Такой квиз уже есть']}
+
+        response = client.post(
+            quiz_create_get_url,
+            {'title': 'Football club'},
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
     def test_title_desc_len_quiz(self, client, quiz_create_get_url) -> None:
         """Тест с неправильными данными(длина полей title и description) категории"""
 
@@ -206,6 +383,21 @@ class TestQuizAPI:
 
         assert response.status_code == HTTPStatus.NOT_FOUND
 
+    def test_random_question_empty_quiz(self, client, quiz_create_get_url) -> None:
+        """Тест случайного вопроса из квиза без вопросов"""
+
+        response = client.post(
+            quiz_create_get_url,
+            {'title': 'Empty'},
+            content_type='application/json'
+        )
+        quiz_random_url = reverse('quiz-random-question',
+                                  kwargs={'id': response.json()['id']})
+
+        response = client.get(quiz_random_url)
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
 
 @pytest.mark.django_db
 class TestQuestionAPI:
@@ -271,6 +463,293 @@ class TestQuestionAPI:
         assert response.status_code == HTTPStatus.OK
         assert response.json().get('answer') == False
 
+    def test_check_answers_endpoint(self,
+                                    client,
+                                    question_response,
+                                    django_assert_num_queries) -> None:
+        """Тест пакетной проверки ответов"""
+
+        question_id = question_response.json()['id']
+        check_url = reverse('question-check-answers')
+        with django_assert_num_queries(1):
+            response = client.post(
+                check_url,
+                {'answers': [{'question_id': question_id, 'answer': '1'},
+                             {'question_id': question_id, 'answer': '2'},
+                             {'question_id': 100, 'answer': '1'}]},
+                content_type='application/json'
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'results': [{'question_id': question_id, 'answer': True},
+                        {'question_id': question_id, 'answer': False},
+                        {'question_id': 100, 'answer': None}],
+            'score': 1,
+            'total': 3,
+        }
+
+        response = client.post(check_url, {'answers': []},
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_export_questions(self, client, question_response) -> None:
+        """Тест потоковой выгрузки вопросов"""
+
+        question = question_response.json()
+        export_url = reverse('question-export')
+
+        response = client.get(export_url, {'quiz': question['quiz_id'],
+                                           'difficulty': 'easy'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [question]
+
+        response = client.get(export_url, {'output': 'json',
+                                           'difficulty': 'hard'})
+        assert json.loads(b''.join(response.streaming_content)) == []
+
+        response = client.get(export_url, {'output': 'json'})
+        assert json.loads(b''.join(response.streaming_content)) == [question]
+
+        response = client.get(export_url, {'difficulty': 'impossible'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = client.get(export_url, {'output': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_bulk_create_questions(self, client, question_response) -> None:
+        """Тест массового создания вопросов с ошибками по элементам"""
+
+        question = question_response.json()
+        item = {key: question[key] for key in (
+            'quiz_id', 'category_id', 'text', 'description', 'options',
+            'correct_answer', 'explanation', 'difficulty')}
+        items = [
+            item,
+            {**item, 'correct_answer': '3'},
+            {**item, 'quiz_id': question['quiz_id'] + 100},
+            {**item, 'text': 'second'},
+        ]
+        url = reverse('question-bulk')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, items, content_type='application/json')
+        assert response.status_code == HTTPStatus.CREATED
+        body = response.json()
+        assert [created['index'] for created in body['created']] == [0, 3]
+        assert [error['index'] for error in body['errors']] == [1, 2]
+        assert list(body['errors'][1]['errors']) == ['quiz_id']
+        assert len(queries) <= 5
+
+        ndjson = '\n'.join(json.dumps(row) for row in items[:1] * 2)
+        response = client.post(url, ndjson,
+                               content_type='application/x-ndjson')
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(response.json()['created']) == 2
+
+        response = client.post(url, items[1:3], content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(url, item, content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_filter_and_order_questions(self, client,
+                                        question_response) -> None:
+        """Тест фильтров, порядка и пагинации списка вопросов"""
+
+        question = question_response.json()
+        other_quiz = client.post(reverse('quiz-list'), {'title': 'Другой'},
+                                 content_type='application/json').json()
+        item = {key: question[key] for key in (
+            'quiz_id', 'category_id', 'text', 'description', 'options',
+            'correct_answer', 'explanation', 'difficulty')}
+        created = client.post(reverse('question-bulk'), [
+            {**item, 'difficulty': 'hard'},
+            {**item, 'difficulty': 'hard', 'text': 'second'},
+            {**item, 'quiz_id': other_quiz['id']},
+        ], content_type='application/json').json()['created']
+        hard_ids = [row['id'] for row in created[:2]]
+        list_url = reverse('question-list')
+
+        response = client.get(list_url, {'quiz': question['quiz_id'],
+                                         'difficulty': 'easy'})
+        assert [row['id'] for row in response.json()] == [question['id']]
+        ids = [created[2]['id'], *hard_ids[::-1], question['id']]
+        response = client.get(list_url, {'category': question['category_id'],
+                                         'ordering': '-id', 'limit': 2})
+        assert [row['id'] for row in response.json()] == ids[:2]
+        next_url = response.headers['Link'].split('>')[0][1:]
+        response = client.get(next_url)
+        assert [row['id'] for row in response.json()] == ids[2:]
+        assert 'rel="next"' not in response.headers['Link']
+        prev_url = response.headers['Link'].split('>')[0][1:]
+        response = client.get(prev_url)
+        assert [row['id'] for row in response.json()] == ids[:2]
+
+        quiz_url = reverse('quiz-questions', args=[question['quiz_id']])
+        response = client.get(quiz_url, {'difficulty': 'hard',
+                                         'fields': 'id'})
+        assert response.json() == [{'id': pk} for pk in hard_ids]
+        response = client.get(quiz_url, {'quiz': other_quiz['id']})
+        assert len(response.json()) == 3
+
+        response = client.get(reverse('quiz-questions', args=[999]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        for params in ({'ordering': 'text'}, {'difficulty': 'impossible'},
+                       {'quiz': 'abc'}):
+            for url in (list_url, quiz_url):
+                response = client.get(url, params)
+                assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_bulk_update_delete_questions(self, client,
+                                          question_response) -> None:
+        """Тест массового обновления и удаления вопросов по фильтрам"""
+
+        question = question_response.json()
+        item = {key: question[key] for key in (
+            'quiz_id', 'category_id', 'text', 'description', 'options',
+            'correct_answer', 'explanation', 'difficulty')}
+        url = reverse('question-bulk')
+        response = client.post(url, [item, {**item, 'difficulty': 'hard'}],
+                               content_type='application/json')
+        ids = [created['id'] for created in response.json()['created']]
+        other_quiz = client.post(reverse('quiz-list'),
+                                 {'title': 'Other', 'description': 'd'},
+                                 content_type='application/json').json()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.patch(
+                url, {'quiz': question['quiz_id'], 'difficulty': 'easy',
+                      'set': {'difficulty': 'medium'}},
+                content_type='application/json')
+        assert response.json() == {'updated': 2}
+        assert len(queries) == 1
+
+        response = client.patch(
+            url, {'ids': ids, 'set': {'quiz_id': other_quiz['id']}},
+            content_type='application/json')
+        assert response.json() == {'updated': 2}
+        response = client.get(reverse('question-detail', args=[ids[1]]))
+        assert response.json()['quiz_id'] == other_quiz['id']
+        assert response.json()['difficulty'] == 'hard'
+
+        response = client.patch(url, {'ids': ids, 'set': {'quiz_id': 10**6}},
+                                content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.patch(url, {'set': {'difficulty': 'easy'}},
+                                content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.patch(url, {'ids': ids, 'set': {}},
+                                content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.delete(url, {'quiz': other_quiz['id']},
+                                     content_type='application/json')
+        assert response.json() == {'deleted': 2}
+        assert len(queries) == 1
+        response = client.delete(url, {}, content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(reverse('question-detail',
+                                      args=[question['id']]))
+        assert response.json()['difficulty'] == 'medium'
+
+    def test_conditional_get_question(self, client, question_response) -> None:
+        """Тест смены ETag вопроса после массового обновления"""
+
+        question = question_response.json()
+        detail_url = reverse('question-detail', args=[question['id']])
+        list_url = reverse('question-list')
+        etag = client.get(detail_url).headers['ETag']
+        list_etag = client.get(list_url).headers['ETag']
+        assert client.get(list_url, HTTP_IF_NONE_MATCH=list_etag
+                          ).status_code == HTTPStatus.NOT_MODIFIED
+
+        client.patch(reverse('question-bulk'),
+                     {'ids': [question['id']], 'set': {'difficulty': 'hard'}},
+                     content_type='application/json')
+        response = client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['difficulty'] == 'hard'
+        response = client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_list_without_last_modified(self, client, question_response,
+                                        question) -> None:
+        """Тест списка после удаления не последнего вопроса с If-Modified-Since"""
+
+        deleted = question_response.json()['id']
+        list_url = reverse('question-list')
+        response = client.get(list_url)
+        assert 'Last-Modified' not in response.headers
+        since = http_date((datetime.now(UTC) + timedelta(hours=1)).timestamp())
+
+        client.delete(reverse('question-detail', args=[deleted]))
+        response = client.get(list_url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.OK
+        assert [item['id'] for item in response.json()] == [question.id]
+
+    def test_list_values_match_serializer(self, client,
+                                          question_response) -> None:
+        """Тест совпадения списков из .values() с выводом сериализаторов"""
+
+        question = question_response.json()
+        client.post(reverse('quiz-list'), {'title': 'Без описания'},
+                    content_type='application/json')
+        client.patch(reverse('question-bulk'),
+                     {'ids': [question['id']], 'set': {'explanation': None}},
+                     content_type='application/json')
+        cases = (
+            ('category-list', Category, CategorySerializer),
+            ('quiz-list', Quiz, QuizSerializer),
+            ('question-list', Question, QuestionSerializer),
+        )
+        for url_name, model, serializer_class in cases:
+            assert values_fields(serializer_class) is not None
+            expected = JSONRenderer().render(serializer_class(
+                model.objects.order_by(*model._meta.ordering, 'id'),
+                many=True).data)
+            assert client.get(reverse(url_name)).content == expected
+        assert values_fields(QuestionSerializer) == QUESTION_FIELDS
+
+    def test_sparse_fields_question(self, client, question_response) -> None:
+        """Тест ?fields= и ?exclude= с выборкой только нужных столбцов"""
+
+        question = question_response.json()
+        list_url = reverse('question-list')
+        detail_url = reverse('question-detail', args=[question['id']])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(list_url, {'fields': 'text,id,options'})
+        assert response.json() == [{key: question[key]
+                                    for key in ('id', 'text', 'options')}]
+        assert 'explanation' not in queries[-1]['sql']
+
+        response = client.get(list_url, {'fields': 'text', 'limit': 1})
+        assert response.json() == [{'text': question['text']}]
+        assert 'Link' not in response.headers
+
+        response = client.get(
+            list_url, {'exclude': 'description,explanation,options'})
+        assert set(response.json()[0]) == {
+            'id', 'text', 'correct_answer', 'difficulty', 'quiz_id',
+            'category_id'}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(detail_url,
+                                  {'fields': 'id,quiz_id,difficulty'})
+        assert response.json() == {key: question[key] for key in (
+            'id', 'quiz_id', 'difficulty')}
+        assert len(queries) == 1
+        assert 'explanation' not in queries[0]['sql']
+        assert 'ETag' in response.headers
+
+        for params in ({'fields': 'id,answer'}, {'exclude': 'password'},
+                       {'fields': ''}):
+            for url in (list_url, detail_url):
+                response = client.get(url, params)
+                assert response.status_code == HTTPStatus.BAD_REQUEST
+
     def test_search_questions_by_text(self,
                                      client,
                                      category_create_get_url,
@@ -315,6 +794,12 @@ class TestQuestionAPI:
         assert len(results) >= 1
         assert 'екст' in results[0]['text']
 
+        # короткий запрос ищется подстрокой без учета регистра кириллицы
+        for text in ('Т', 'ОП'):
+            response = client.get(reverse('question-by-text',
+                                          kwargs={'text': text}))
+            assert [item['text'] for item in response.json()] == ['текст']
+
     def test_search_quiz_by_title(self, client, quiz_create_get_url) -> None:
         """Тест поиска квизов по названию"""
         response = client.post(
@@ -330,6 +815,12 @@ class TestQuestionAPI:
         assert len(results) >= 1
         assert 'Search' in results[0]['title']
 
+        response = client.get(search_url, {'mode': 'prefix'})
+        assert len(response.json()) == 1
+
+        response = client.get(search_url, {'mode': 'regex'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
     def test_question_with_minimal_options(self, client):
         """Тест: вопрос с минимальным количеством вариантов """
         response = client.post(
@@ -452,4 +943,102 @@ class TestQuestionAPI:
 
         response = client.delete(list_put_delete_url,
                                 content_type='application/json')
-        assert response.status_code == HTTPStatus.NOT_FOUND
\ No newline at end of file
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+class TestORJSON:
+    def test_renderer_matches_json_renderer(self) -> None:
+        """Тест совпадения вывода ORJSONRenderer с JSONRenderer"""
+
+        pytest.importorskip('orjson')
+        from quiz.renderers import ORJSONRenderer
+
+        payload = {
+            'text': 'Что такое Python?\u2028',
+            'options': ['Язык', {'вложенный': [1, 2.5, None, True]}],
+            'created': datetime(2026, 1, 2, 3, 4, 5, 6000, tzinfo=UTC),
+            'naive': datetime(2026, 1, 2, 3, 4, 5),
+            'day': date(2026, 1, 2),
+            'price': Decimal('1.10'),
+            'lazy': gettext_lazy('Not found.'),
+            'uuid': UUID(int=1),
+            'duration': timedelta(seconds=90),
+            1: 'ключ-число',
+        }
+        for media_type in (None, 'application/json; indent=4'):
+            assert (ORJSONRenderer().render(payload, media_type)
+                    == JSONRenderer().render(payload, media_type))
+        assert ORJSONRenderer().render(None) == b''
+
+    @pytest.mark.django_db
+    def test_parser_in_bulk_create(self, client, question_response,
+                                   settings) -> None:
+        """Тест ORJSONParser из настроек DRF в массовом создании"""
+
+        pytest.importorskip('orjson')
+        settings.REST_FRAMEWORK = {
+            'DEFAULT_PARSER_CLASSES': ['quiz.parsers.ORJSONParser'],
+        }
+        question = question_response.json()
+        item = {key: question[key] for key in (
+            'quiz_id', 'category_id', 'text', 'description', 'options',
+            'correct_answer', 'explanation', 'difficulty')}
+
+        response = client.post(reverse('question-bulk'), [item],
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.CREATED
+        response = client.post(reverse('question-bulk'), '[{',
+                               content_type='application/json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json()['detail'].startswith('JSON parse error')
+
+
+@pytest.mark.django_db
+class TestCompression:
+    @pytest.mark.parametrize('encoding, module', [
+        ('gzip', 'gzip'), ('br', 'brotli'), ('zstd', 'zstandard')])
+    def test_compressed_list(self, client, question_response, settings,
+                             encoding, module) -> None:
+        """Тест сжатия списка выбранной клиентом кодировкой"""
+
+        decompress = pytest.importorskip(module).decompress
+        settings.QUIZ_COMPRESSION_MIN_SIZE = 100
+        list_url = reverse('question-list')
+        plain = client.get(list_url)
+        assert 'Content-Encoding' not in plain.headers
+
+        response = client.get(
+            list_url, HTTP_ACCEPT_ENCODING=f'gzip;q=0.5, {encoding}')
+        assert response.headers['Content-Encoding'] == encoding
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert decompress(response.content) == plain.content
+        assert response.headers['ETag'] == f'W/{plain.headers["ETag"]}'
+        response = client.get(list_url, HTTP_ACCEPT_ENCODING=encoding,
+                              HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_negotiation_and_threshold(self, client, question_response,
+                                       settings) -> None:
+        """Тест отказа от сжатия по весам клиента и по размеру ответа"""
+
+        settings.QUIZ_COMPRESSION_MIN_SIZE = 100
+        list_url = reverse('question-list')
+        for header in ('identity', 'gzip;q=0, identity', '*;q=0'):
+            response = client.get(list_url, HTTP_ACCEPT_ENCODING=header)
+            assert 'Content-Encoding' not in response.headers
+        response = client.get(list_url, HTTP_ACCEPT_ENCODING='*')
+        assert 'Content-Encoding' in response.headers
+
+        settings.QUIZ_COMPRESSION_MIN_SIZE = 10000
+        response = client.get(list_url, HTTP_ACCEPT_ENCODING='gzip')
+        assert 'Content-Encoding' not in response.headers
+
+    def test_compressed_export(self, client, question_response) -> None:
+        """Тест сжатия потоковой выгрузки"""
+
+        question = question_response.json()
+        response = client.get(reverse('question-export'),
+                              HTTP_ACCEPT_ENCODING='gzip')
+        assert response.headers['Content-Encoding'] == 'gzip'
+        content = gzip.decompress(b''.join(response.streaming_content))
+        assert json.loads(content) == question